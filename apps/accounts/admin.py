@@ -1,6 +1,5 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User
 
@@ -28,4 +27,28 @@ class UserAdmin(BaseUserAdmin):
                 )
             },
         ),
-    )
\ No newline at end of file
+    )
+
+    # Suppression d'un propriétaire dont les biens ont été réservés : compte
+    # et biens désactivés (User.delete), l'historique des réservations reste
+    def get_deleted_objects(self, objs, request):
+        deletable = [obj for obj in objs if not obj.has_booked_listings()]
+        deleted_objects, model_count, perms_needed, protected = super().get_deleted_objects(deletable, request)
+        deactivated = [obj for obj in objs if obj not in deletable]
+        if deactivated:
+            deleted_objects = [
+                *deleted_objects,
+                *(f"{obj} (désactivé : ses biens ont des réservations)" for obj in deactivated),
+            ]
+        return deleted_objects, model_count, perms_needed, protected
+
+    def delete_model(self, request, obj):
+        if obj.has_booked_listings():
+            obj.deactivate()
+            self.message_user(request, f"{obj} désactivé : ses biens ont des réservations", messages.WARNING)
+            return
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.delete_model(request, obj)
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_moov_money_number_user_mtn_money_number_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='déclinaisons de la photo'),
+        ),
+    ]
@@ -33,6 +33,13 @@ class User(AbstractUser):
         blank=True,
         null=True
     )
+    # Déclinaisons WebP/JPEG par largeur (apps.core.images)
+    avatar_variants = models.JSONField(
+        'déclinaisons de la photo',
+        default=dict,
+        blank=True,
+        editable=False
+    )
     
     # Vérification d'identité
     is_verified = models.BooleanField('compte vérifié', default=False)
@@ -87,6 +94,7 @@ class User(AbstractUser):
 
         
     created_at = models.DateTimeField('date de création', auto_now_add=True)
+    updated_at = models.DateTimeField('dernière modification', auto_now=True)
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
@@ -125,6 +133,34 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
     
+    def save(self, *args, **kwargs):
+        from apps.core.images import sync_variants
+        sync_variants(self, 'avatar', 'avatar_variants')
+        super().save(*args, **kwargs)
+    
+    def has_booked_listings(self):
+        """Un de ses biens a des réservations (protégées, voir Booking.vehicle / residence)"""
+        from apps.bookings.models import Booking
+        return Booking.objects.filter(listing_owner=self).exists()
+    
+    def deactivate(self):
+        """Compte et biens désactivés : l'historique des réservations reste intact"""
+        self.is_active = False
+        self.save(update_fields=['is_active', 'updated_at'])
+        # save() par bien : updated_at et invalidation des caches de réponses
+        for listings in (self.residences.filter(is_active=True), self.vehicles.filter(is_active=True)):
+            for listing in listings:
+                listing.is_active = False
+                listing.save(update_fields=['is_active', 'updated_at'])
+    
+    def delete(self, *args, **kwargs):
+        # Propriétaire dont les biens ont été réservés : désactivé plutôt que
+        # supprimé (la suppression des biens lèverait ProtectedError)
+        if self.has_booked_listings():
+            self.deactivate()
+            return 0, {}
+        return super().delete(*args, **kwargs)
+    
     class Meta:
         verbose_name = 'utilisateur'
         verbose_name_plural = 'utilisateurs'
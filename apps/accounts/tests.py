@@ -1,3 +1,43 @@
 from django.test import TestCase
 
-# Create your tests here.
+from apps.bookings.models import Booking
+from apps.bookings.tests import make_booking, make_residence, make_user
+
+from .models import User
+
+
+class OwnerDeletionTests(TestCase):
+    """Un propriétaire dont les biens ont été réservés est désactivé, pas supprimé"""
+
+    def setUp(self):
+        self.owner = make_user('owner', 'proprietaire')
+        self.residence = make_residence(self.owner)
+        make_booking(make_user('client'), self.residence)
+
+    def assert_deactivated(self):
+        self.owner.refresh_from_db()
+        self.residence.refresh_from_db()
+        self.assertFalse(self.owner.is_active)
+        self.assertFalse(self.residence.is_active)
+        self.assertEqual(Booking.objects.filter(residence=self.residence).count(), 1)
+
+    def test_delete(self):
+        self.owner.delete()
+        self.assert_deactivated()
+
+    def test_admin_delete(self):
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret', first_name='A', last_name='D',
+        )
+        self.client.force_login(admin)
+
+        response = self.client.post(f'/admin/accounts/user/{self.owner.pk}/delete/', {'post': 'yes'})
+
+        self.assertEqual(response.status_code, 302)
+        self.assert_deactivated()
+
+    def test_owner_without_bookings_is_deleted(self):
+        other = make_user('other', 'proprietaire')
+        make_residence(other)
+        other.delete()
+        self.assertFalse(User.objects.filter(pk=other.pk).exists())
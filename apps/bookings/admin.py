@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from django.contrib import admin
-from .models import Booking, BookingReview, Favorite
+from .models import Booking, BookingReview, Favorite, OccupiedDate, OwnerStats, PricingRule
 
 
 @admin.register(Booking)
@@ -20,3 +20,24 @@ class BookingAdmin(admin.ModelAdmin):
 
 admin.site.register(BookingReview)
 admin.site.register(Favorite)
+
+
+@admin.register(OccupiedDate)
+class OccupiedDateAdmin(admin.ModelAdmin):
+    list_display = ("date", "content_type", "object_id", "booking")
+    list_filter = ("content_type",)
+    raw_id_fields = ("booking",)
+
+
+@admin.register(OwnerStats)
+class OwnerStatsAdmin(admin.ModelAdmin):
+    list_display = ("owner", "listing_type", "total_bookings", "pending", "confirmed", "revenue", "payments_received")
+    list_filter = ("listing_type",)
+    raw_id_fields = ("owner",)
+
+
+@admin.register(PricingRule)
+class PricingRuleAdmin(admin.ModelAdmin):
+    list_display = ("name", "kind", "adjustment_percent", "start_date", "end_date", "min_nights", "is_active")
+    list_filter = ("kind", "is_active")
+    raw_id_fields = ("vehicle", "residence")
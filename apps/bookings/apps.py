@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, pre_delete
 
 
 class BookingsConfig(AppConfig):
     name = 'apps.bookings'
+
+    def ready(self):
+        from .triggers import install_overlap_triggers
+        post_migrate.connect(install_overlap_triggers, sender=self)
+
+        from .stats import booking_post_delete, booking_pre_delete
+        booking = self.get_model('Booking')
+        pre_delete.connect(booking_pre_delete, sender=booking, dispatch_uid='owner-stats:booking')
+        post_delete.connect(booking_post_delete, sender=booking, dispatch_uid='owner-stats:booking')
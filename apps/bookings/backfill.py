@@ -0,0 +1,77 @@
+# apps/bookings/backfill.py
+"""
+Backfill des clés étrangères vehicle / residence des réservations et favoris
+(depuis content_type / object_id) et du propriétaire du bien (listing_owner).
+
+Les UPDATE portent sur des plages de clés primaires : chacun reste court et,
+hors transaction englobante, est validé aussitôt (utilisable en ligne).
+Utilisé par `manage.py backfill_booking_listings` et par les migrations 0007
+et 0013, qui passent leurs modèles historiques.
+"""
+
+from django.db.models import F, Max, OuterRef, Subquery
+
+
+LISTING_FIELDS = {'vehicle': ('vehicles', 'vehicle'), 'residence': ('residences', 'residence')}
+
+
+def _id_ranges(model, batch_size):
+    max_id = model._default_manager.aggregate(max_id=Max('id'))['max_id'] or 0
+    for low in range(0, max_id + 1, batch_size):
+        yield {'id__gte': low, 'id__lt': low + batch_size}
+
+
+def backfill_listing_fields(model, content_type_model, get_model, batch_size=5000):
+    """
+    Renseigne vehicle / residence de `model` (Booking ou Favorite).
+
+    Args:
+        get_model: fonction (app_label, model_name) -> modèle (apps.get_model)
+
+    Returns:
+        dict: {champ: nombre de lignes renseignées}
+    """
+    updated = {}
+    for field, (app_label, model_name) in LISTING_FIELDS.items():
+        content_type = content_type_model._default_manager.filter(app_label=app_label, model=model_name).first()
+        updated[field] = 0
+        if content_type is None:
+            continue
+        listings = get_model(app_label, model_name)._default_manager.values('id')
+        for id_range in _id_ranges(model, batch_size):
+            updated[field] += model._default_manager.filter(
+                content_type=content_type,
+                object_id__in=listings,
+                **id_range,
+                **{f'{field}__isnull': True},
+            ).update(**{f'{field}_id': F('object_id')})
+    return updated
+
+
+def backfill_listing_owner(booking_model, get_model, batch_size=5000):
+    """
+    Renseigne listing_owner des réservations dont le bien est connu.
+
+    Returns:
+        dict: {champ du bien: nombre de lignes renseignées}
+    """
+    updated = {}
+    for field, (app_label, model_name) in LISTING_FIELDS.items():
+        owner = Subquery(
+            get_model(app_label, model_name)._default_manager.filter(
+                pk=OuterRef(f'{field}_id')
+            ).values('owner_id')[:1]
+        )
+        updated[field] = 0
+        for id_range in _id_ranges(booking_model, batch_size):
+            updated[field] += booking_model._default_manager.filter(
+                listing_owner__isnull=True,
+                **id_range,
+                **{f'{field}__isnull': False},
+            ).update(listing_owner_id=owner)
+    return updated
+
+
+def orphans(model):
+    """Lignes dont le bien n'existe plus (ni vehicle ni residence renseignés)"""
+    return model._default_manager.filter(vehicle__isnull=True, residence__isnull=True)
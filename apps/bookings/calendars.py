@@ -0,0 +1,112 @@
+# apps/bookings/calendars.py
+"""
+Calendrier public des dates indisponibles d'un bien.
+
+Les plages sont fusionnées ([début, fin) au format ISO) et, sur demande,
+encodées en masque de bits par mois. Les réponses sont mises en cache par
+bien ; Booking.save() invalide le cache via invalidate_calendar(). Le cache
+doit être partagé entre workers (CACHE_BACKEND file ou redis) : avec locmem,
+seul le processus qui a enregistré la réservation est invalidé.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Booking
+
+
+CALENDAR_CACHE_TIMEOUT = getattr(settings, 'BOOKING_CALENDAR_CACHE_TIMEOUT', 300)
+MAX_DAYS_AHEAD = 365
+
+
+def _version_key(content_type_id, object_id):
+    return f"booking-calendar-version:{content_type_id}:{object_id}"
+
+
+def invalidate_calendar(content_type_id, object_id):
+    """Invalide toutes les variantes en cache du calendrier d'un bien"""
+    key = _version_key(content_type_id, object_id)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Clé expulsée entre add() et incr()
+        cache.set(key, 1, None)
+
+
+def month_bitmasks(ranges):
+    """
+    Encode des plages [début, fin) en masques par mois :
+    {"2026-02": entier dont le bit n-1 vaut 1 si le jour n est indisponible}
+    """
+    months = {}
+    for start, end in ranges:
+        day = start
+        while day < end:
+            month = f"{day.year:04d}-{day.month:02d}"
+            months[month] = months.get(month, 0) | (1 << (day.day - 1))
+            day += timedelta(days=1)
+    return months
+
+
+def build_calendar(obj, days_ahead=90, bitmask=False):
+    today = timezone.now().date()
+    ranges = Booking.get_unavailable_ranges(obj, days_ahead=days_ahead)
+
+    payload = {
+        "start": today.isoformat(),
+        "end": (today + timedelta(days=days_ahead)).isoformat(),
+        "ranges": [[start.isoformat(), end.isoformat()] for start, end in ranges],
+    }
+    if bitmask:
+        payload["months"] = month_bitmasks(ranges)
+
+    return payload
+
+
+def calendar_response(request, obj):
+    """
+    Réponse du calendrier avec cache et validation ETag / If-None-Match.
+
+    Query params:
+        days: horizon en jours (défaut 90, max 365)
+        bitmask: 1 pour ajouter les masques par mois
+    """
+    try:
+        days_ahead = int(request.query_params.get('days', 90))
+    except ValueError:
+        return Response({"error": "Paramètre days invalide"}, status=status.HTTP_400_BAD_REQUEST)
+    days_ahead = max(1, min(days_ahead, MAX_DAYS_AHEAD))
+    bitmask = request.query_params.get('bitmask') in ('1', 'true')
+
+    content_type = ContentType.objects.get_for_model(obj.__class__)
+    version = cache.get(_version_key(content_type.id, obj.pk), 0)
+    today = timezone.now().date()
+    key = f"booking-calendar:{content_type.id}:{obj.pk}:{version}:{today}:{days_ahead}:{int(bitmask)}"
+
+    cached = cache.get(key)
+    if cached is None:
+        payload = build_calendar(obj, days_ahead=days_ahead, bitmask=bitmask)
+        body = json.dumps(payload, sort_keys=True).encode()
+        cached = (payload, quote_etag(hashlib.md5(body).hexdigest()))
+        cache.set(key, cached, CALENDAR_CACHE_TIMEOUT)
+
+    payload, etag = cached
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(payload)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
@@ -0,0 +1,62 @@
+# apps/bookings/filters.py
+"""
+Filtres de disponibilité pour les listes de biens (résidences, véhicules).
+"""
+
+from datetime import date
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, OuterRef
+from rest_framework import serializers
+
+from .models import Booking
+
+
+def get_requested_period(query_params):
+    """
+    Lit ?start_date=AAAA-MM-JJ&end_date=AAAA-MM-JJ.
+
+    Returns:
+        tuple | None: (start_date, end_date), ou None si aucune période demandée
+    """
+    start = query_params.get('start_date')
+    end = query_params.get('end_date')
+
+    if not start and not end:
+        return None
+
+    if not start or not end:
+        raise serializers.ValidationError(
+            "Les paramètres start_date et end_date doivent être fournis ensemble"
+        )
+
+    try:
+        start_date = date.fromisoformat(start)
+        end_date = date.fromisoformat(end)
+    except ValueError:
+        raise serializers.ValidationError("Format de date invalide (AAAA-MM-JJ attendu)")
+
+    if start_date >= end_date:
+        raise serializers.ValidationError({
+            'end_date': 'La date de fin doit être après la date de début'
+        })
+
+    return start_date, end_date
+
+
+def exclude_booked(queryset, start_date, end_date):
+    """
+    Exclut les biens ayant une réservation bloquante sur la période,
+    en une seule requête (NOT EXISTS sur l'index content_type/object_id/status).
+    """
+    content_type = ContentType.objects.get_for_model(queryset.model)
+
+    overlapping = Booking.objects.filter(
+        content_type=content_type,
+        object_id=OuterRef('pk'),
+        status__in=Booking.BLOCKING_STATUSES,
+        start_date__lt=end_date,
+        end_date__gt=start_date,
+    )
+
+    return queryset.filter(~Exists(overlapping))
@@ -0,0 +1,52 @@
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+
+from apps.bookings.backfill import backfill_listing_fields, backfill_listing_owner, orphans
+from apps.bookings.models import Booking, Favorite
+
+
+class Command(BaseCommand):
+    help = (
+        "Renseigne les clés étrangères vehicle / residence des réservations et "
+        "favoris depuis content_type / object_id, puis le propriétaire du bien "
+        "(listing_owner) des réservations, par lots (utilisable en ligne). "
+        "À lancer après la migration bookings 0007 et avant la 0013 "
+        "(contraintes « un seul bien »)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--delete-orphans', action='store_true',
+            help="Supprime les réservations et favoris dont le bien n'existe plus",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        for model in (Booking, Favorite):
+            updated = backfill_listing_fields(model, ContentType, apps.get_model, batch_size)
+            for field, count in updated.items():
+                self.stdout.write(f"{model.__name__}.{field} : {count} ligne(s) renseignée(s)")
+
+        for field, count in backfill_listing_owner(Booking, apps.get_model, batch_size).items():
+            self.stdout.write(f"Booking.listing_owner ({field}) : {count} ligne(s) renseignée(s)")
+
+        for model in (Booking, Favorite):
+            orphan_rows = orphans(model)
+            count = orphan_rows.count()
+            if not count:
+                continue
+            if options['delete_orphans']:
+                # Suppression par queryset : les signaux tiennent OwnerStats à jour
+                orphan_rows.delete()
+                self.stdout.write(f"{model.__name__} : {count} ligne(s) sans bien supprimée(s)")
+            else:
+                ids = ', '.join(map(str, orphan_rows.values_list('id', flat=True)[:20]))
+                self.stdout.write(self.style.WARNING(
+                    f"{model.__name__} : {count} ligne(s) pointent vers un bien supprimé "
+                    f"(ids : {ids}…) : relancez avec --delete-orphans avant la migration 0013."
+                ))
+
+        self.stdout.write(self.style.SUCCESS("Backfill terminé"))
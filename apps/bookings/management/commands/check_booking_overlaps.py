@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.bookings.models import Booking
+from apps.bookings.overlaps import conflicts_to_cancel, overlapping_bookings
+
+
+class Command(BaseCommand):
+    help = (
+        "Liste les réservations bloquantes qui se chevauchent sur un même bien "
+        "(à résoudre avant la contrainte d'exclusion PostgreSQL)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cancel-conflicts', action='store_true',
+            help="Annule dans chaque conflit les réservations les moins avancées, puis les plus récentes",
+        )
+
+    def handle(self, *args, **options):
+        conflicts = list(overlapping_bookings(Booking, Booking.BLOCKING_STATUSES))
+
+        for booking in conflicts:
+            self.stdout.write(
+                f"Conflit : réservation {booking.id} ({booking.content_type_id}/{booking.object_id}) "
+                f"{booking.start_date} → {booking.end_date}, {booking.status}"
+            )
+
+        if not conflicts:
+            self.stdout.write(self.style.SUCCESS("Aucune réservation en conflit"))
+            return
+
+        if not options['cancel_conflicts']:
+            raise CommandError(
+                f"{len(conflicts)} réservation(s) en conflit. "
+                "Lancez `manage.py check_booking_overlaps --cancel-conflicts` pour les résoudre."
+            )
+
+        # save() : calendrier d'occupation, statistiques et caches suivent
+        cancelled = conflicts_to_cancel(Booking, Booking.BLOCKING_STATUSES)
+        for booking in cancelled:
+            previous_status, booking.status = booking.status, 'cancelled'
+            booking.cancelled_at = timezone.now()
+            booking.cancellation_reason = "Dates déjà réservées (conflit de réservations)"
+            booking.save()
+            self.stdout.write(f"Annulée : réservation {booking.id} ({previous_status})")
+
+        self.stdout.write(self.style.SUCCESS(f"{len(cancelled)} réservation(s) annulée(s)"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.bookings.occupancy import check_occupied_dates
+
+
+class Command(BaseCommand):
+    help = "Vérifie que le calendrier d'occupation correspond aux réservations"
+
+    def handle(self, *args, **options):
+        missing, extra = check_occupied_dates()
+
+        for booking_id, content_type_id, object_id, date in sorted(missing):
+            self.stdout.write(f"Manquante : réservation {booking_id} ({content_type_id}/{object_id}) {date}")
+
+        for booking_id, content_type_id, object_id, date in sorted(extra):
+            self.stdout.write(f"En trop : réservation {booking_id} ({content_type_id}/{object_id}) {date}")
+
+        if missing or extra:
+            raise CommandError(
+                f"Calendrier incohérent : {sum(missing.values())} manquante(s), "
+                f"{sum(extra.values())} en trop. Lancez `manage.py rebuild_occupancy`."
+            )
+
+        self.stdout.write(self.style.SUCCESS("Calendrier d'occupation cohérent"))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.bookings.stats import check_owner_stats
+
+
+class Command(BaseCommand):
+    help = "Compare les statistiques propriétaire (OwnerStats) aux agrégats en direct"
+
+    def handle(self, *args, **options):
+        differences = check_owner_stats()
+
+        for owner_id, listing_type, field, actual, expected in differences:
+            self.stdout.write(
+                f"Propriétaire {owner_id} ({listing_type}) {field} : {actual} au lieu de {expected}"
+            )
+
+        if differences:
+            raise CommandError(
+                f"{len(differences)} écart(s). Lancez `manage.py rebuild_owner_stats`."
+            )
+
+        self.stdout.write(self.style.SUCCESS("Statistiques propriétaire cohérentes"))
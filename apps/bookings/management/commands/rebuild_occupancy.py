@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.bookings.occupancy import rebuild_occupied_dates
+
+
+class Command(BaseCommand):
+    help = "Reconstruit le calendrier d'occupation à partir des réservations"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = rebuild_occupied_dates(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{created} dates occupées reconstruites"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.bookings.stats import rebuild_owner_stats
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les statistiques propriétaire (OwnerStats) à partir des réservations"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, action='append', dest='owner_ids',
+                            help="ID du propriétaire (répétable). Par défaut : tous")
+
+    def handle(self, *args, **options):
+        rows = rebuild_owner_stats(owner_ids=options['owner_ids'])
+        self.stdout.write(self.style.SUCCESS(f"{rows} ligne(s) de statistiques reconstruite(s)"))
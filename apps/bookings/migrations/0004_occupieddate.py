@@ -0,0 +1,55 @@
+# Generated by Django 6.0.1 on 2026-10-17 20:19
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+
+
+BLOCKING_STATUSES = ('pending', 'confirmed', 'paid', 'ongoing')
+
+
+def populate_occupied_dates(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    OccupiedDate = apps.get_model('bookings', 'OccupiedDate')
+
+    rows = []
+    for booking in Booking.objects.filter(status__in=BLOCKING_STATUSES).iterator():
+        day = booking.start_date
+        while day < booking.end_date:
+            rows.append(OccupiedDate(
+                booking_id=booking.id,
+                content_type_id=booking.content_type_id,
+                object_id=booking.object_id,
+                date=day,
+            ))
+            day += timedelta(days=1)
+
+    OccupiedDate.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_transaction_number_alter_booking_status'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupiedDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('date', models.DateField(verbose_name='date')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupied_dates', to='bookings.booking', verbose_name='réservation')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'date occupée',
+                'verbose_name_plural': 'dates occupées',
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['content_type', 'object_id', 'date'], name='bookings_oc_content_720aad_idx')],
+            },
+        ),
+        migrations.RunPython(populate_occupied_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:05
+
+from django.db import migrations
+
+
+BLOCKING_STATUSES = "('pending', 'confirmed', 'paid', 'ongoing')"
+
+# PostgreSQL : contrainte d'exclusion sur la période [start_date, end_date)
+# des réservations bloquantes d'un même bien.
+# Les chevauchements déjà présents doivent être résolus avant la migration
+# (check_overlaps, manage.py check_booking_overlaps).
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    f"""
+    ALTER TABLE bookings_booking
+    ADD CONSTRAINT bookings_booking_no_overlap
+    EXCLUDE USING gist (
+        content_type_id WITH =,
+        object_id WITH =,
+        daterange(start_date, end_date, '[)') WITH &&
+    ) WHERE (status IN {BLOCKING_STATUSES})
+    """,
+]
+POSTGRES_BACKWARD = [
+    "ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS bookings_booking_no_overlap",
+]
+
+# SQLite : pas de contrainte d'exclusion. L'équivalent par triggers est
+# installé après chaque migrate (signal post_migrate, apps/bookings/triggers.py),
+# car SQLite les supprime à chaque reconstruction de table.
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS bookings_booking_no_overlap_insert",
+    "DROP TRIGGER IF EXISTS bookings_booking_no_overlap_update",
+]
+
+
+def check_overlaps(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from apps.bookings.overlaps import check_no_overlaps
+    check_no_overlaps(apps.get_model('bookings', 'Booking'), ('pending', 'confirmed', 'paid', 'ongoing'))
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_occupieddate'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_overlaps, migrations.RunPython.noop),
+        migrations.RunPython(
+            _run({'postgresql': POSTGRES_FORWARD}),
+            _run({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-17 21:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Colonnes nullables seulement (ajout instantané) : le backfill se fait par
+# lots (migration 0007, puis `manage.py backfill_booking_listings` si besoin)
+# et les contraintes « un seul bien » sont posées ensuite (migration 0013).
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_no_overlap'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('residences', '0003_residenceimage_platform_fee_percentage'),
+        ('vehicles', '0006_vehicle_slug'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='residence',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='residences.residence', verbose_name='résidence'),
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='vehicle',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='vehicles.vehicle', verbose_name='véhicule'),
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='residence',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='favorites', to='residences.residence', verbose_name='résidence'),
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='vehicle',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='favorites', to='vehicles.vehicle', verbose_name='véhicule'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-17 22:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_listings(apps, schema_editor):
+    """
+    vehicle / residence puis listing_owner, par lots validés un à un
+    (migration non atomique). `manage.py backfill_booking_listings` refait
+    la même chose, pour les lignes écrites entre deux déploiements.
+    """
+    from apps.bookings.backfill import backfill_listing_fields, backfill_listing_owner
+
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    for model_name in ('Booking', 'Favorite'):
+        backfill_listing_fields(apps.get_model('bookings', model_name), ContentType, apps.get_model)
+    backfill_listing_owner(apps.get_model('bookings', 'Booking'), apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('bookings', '0006_booking_listing_foreign_keys'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('residences', '0003_residenceimage_platform_fee_percentage'),
+        ('vehicles', '0006_vehicle_slug'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='listing_owner',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='received_bookings', to=settings.AUTH_USER_MODEL, verbose_name='propriétaire du bien'),
+        ),
+        migrations.RunPython(backfill_listings, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['listing_owner', 'status', 'created_at'], name='bookings_bo_listing_0c3cce_idx'),
+        ),
+    ]
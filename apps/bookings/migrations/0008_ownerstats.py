@@ -0,0 +1,81 @@
+# Generated by Django 6.0.1 on 2026-10-17 22:45
+
+import django.db.models.deletion
+from collections import defaultdict
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+REVENUE_STATUSES = ('confirmed', 'completed')
+
+
+def populate_owner_stats(apps, schema_editor):
+    """Équivalent de `manage.py rebuild_owner_stats` avec les modèles historiques"""
+    Booking = apps.get_model('bookings', 'Booking')
+    OwnerStats = apps.get_model('bookings', 'OwnerStats')
+    Payment = apps.get_model('payments', 'Payment')
+
+    stats = defaultdict(lambda: defaultdict(Decimal))
+
+    def listing_type(booking):
+        return 'vehicle' if booking.vehicle_id else 'residence'
+
+    for booking in Booking.objects.filter(listing_owner__isnull=False).iterator():
+        row = stats[(booking.listing_owner_id, listing_type(booking))]
+        row['total_bookings'] += 1
+        row[booking.status] += 1
+        if booking.status in REVENUE_STATUSES:
+            row['revenue'] += booking.total_price
+
+    payments = Payment.objects.filter(
+        status='COMPLETED',
+        booking__listing_owner__isnull=False,
+    ).select_related('booking')
+    for payment in payments.iterator():
+        row = stats[(payment.booking.listing_owner_id, listing_type(payment.booking))]
+        row['payments_received'] += payment.amount
+
+    OwnerStats.objects.bulk_create([
+        OwnerStats(owner_id=owner_id, listing_type=kind, **row)
+        for (owner_id, kind), row in stats.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_booking_listing_owner'),
+        ('payments', '0003_payment_payment_proof_payment_payment_reference_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnerStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('listing_type', models.CharField(choices=[('residence', 'Résidence'), ('vehicle', 'Véhicule')], max_length=20, verbose_name='type de bien')),
+                ('total_bookings', models.IntegerField(default=0, verbose_name='réservations')),
+                ('pending', models.IntegerField(default=0, verbose_name='en attente')),
+                ('pending_payment_validation', models.IntegerField(default=0, verbose_name='en attente de validation paiement')),
+                ('confirmed', models.IntegerField(default=0, verbose_name='confirmées')),
+                ('paid', models.IntegerField(default=0, verbose_name='payées')),
+                ('ongoing', models.IntegerField(default=0, verbose_name='en cours')),
+                ('completed', models.IntegerField(default=0, verbose_name='terminées')),
+                ('cancelled', models.IntegerField(default=0, verbose_name='annulées')),
+                ('rejected', models.IntegerField(default=0, verbose_name='rejetées')),
+                ('refunded', models.IntegerField(default=0, verbose_name='remboursées')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name="chiffre d'affaires confirmé (FCFA)")),
+                ('payments_received', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='paiements complétés (FCFA)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='dernière modification')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='owner_stats', to=settings.AUTH_USER_MODEL, verbose_name='propriétaire')),
+            ],
+            options={
+                'verbose_name': 'statistiques propriétaire',
+                'verbose_name_plural': 'statistiques propriétaires',
+                'unique_together': {('owner', 'listing_type')},
+            },
+        ),
+        migrations.RunPython(populate_owner_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:20
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_ownerstats'),
+        ('residences', '0003_residenceimage_platform_fee_percentage'),
+        ('vehicles', '0006_vehicle_slug'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PricingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='nom')),
+                ('kind', models.CharField(choices=[('season', 'Saison (période)'), ('long_stay', 'Séjour long')], max_length=20, verbose_name='type')),
+                ('adjustment_percent', models.DecimalField(decimal_places=2, help_text='Négatif pour une remise (-10 = -10 %), positif pour une majoration', max_digits=5, validators=[django.core.validators.MinValueValidator(-100), django.core.validators.MaxValueValidator(500)], verbose_name='ajustement (%)')),
+                ('start_date', models.DateField(blank=True, null=True, verbose_name='début')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='fin')),
+                ('min_nights', models.PositiveIntegerField(blank=True, null=True, verbose_name='à partir de (nuits)')),
+                ('is_active', models.BooleanField(default=True, verbose_name='active')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='dernière modification')),
+                ('residence', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pricing_rules', to='residences.residence', verbose_name='résidence')),
+                ('vehicle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pricing_rules', to='vehicles.vehicle', verbose_name='véhicule')),
+            ],
+            options={
+                'verbose_name': 'règle tarifaire',
+                'verbose_name_plural': 'règles tarifaires',
+                'ordering': ['kind', 'start_date', 'min_nights'],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('residence__isnull', True), ('vehicle__isnull', False)), models.Q(('residence__isnull', False), ('vehicle__isnull', True)), _connector='OR'), name='pricingrule_exactly_one_listing')],
+            },
+        ),
+    ]
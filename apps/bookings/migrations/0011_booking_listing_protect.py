@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0010_favorite_sort_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='residence',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='residences.residence', verbose_name='résidence'),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='vehicle',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='vehicles.vehicle', verbose_name='véhicule'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:00
+
+from datetime import timedelta
+
+from django.db import migrations
+
+
+PREVIOUS_STATUSES = ('pending', 'confirmed', 'paid', 'ongoing')
+BLOCKING_STATUSES = ('pending', 'pending_payment_validation', 'confirmed', 'paid', 'ongoing')
+
+
+def _constraint_sql(statuses):
+    return f"""
+    ALTER TABLE bookings_booking
+    ADD CONSTRAINT bookings_booking_no_overlap
+    EXCLUDE USING gist (
+        content_type_id WITH =,
+        object_id WITH =,
+        daterange(start_date, end_date, '[)') WITH &&
+    ) WHERE (status IN ({', '.join(f"'{status}'" for status in statuses)}))
+    """
+
+
+DROP_CONSTRAINT = "ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS bookings_booking_no_overlap"
+
+
+def _replace_constraint(statuses):
+    def run(apps, schema_editor):
+        # SQLite : triggers réinstallés par post_migrate (apps/bookings/triggers.py)
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        from apps.bookings.overlaps import check_no_overlaps
+        check_no_overlaps(apps.get_model('bookings', 'Booking'), statuses)
+        schema_editor.execute(DROP_CONSTRAINT)
+        schema_editor.execute(_constraint_sql(statuses))
+    return run
+
+
+def occupy_validation_dates(apps, schema_editor):
+    """Calendrier d'occupation des réservations dont le paiement est en validation"""
+    Booking = apps.get_model('bookings', 'Booking')
+    OccupiedDate = apps.get_model('bookings', 'OccupiedDate')
+
+    rows = []
+    for booking in Booking.objects.filter(status='pending_payment_validation').iterator():
+        day = booking.start_date
+        while day < booking.end_date:
+            rows.append(OccupiedDate(
+                booking_id=booking.id,
+                content_type_id=booking.content_type_id,
+                object_id=booking.object_id,
+                date=day,
+            ))
+            day += timedelta(days=1)
+
+    OccupiedDate.objects.bulk_create(rows, batch_size=1000)
+
+
+def release_validation_dates(apps, schema_editor):
+    OccupiedDate = apps.get_model('bookings', 'OccupiedDate')
+    OccupiedDate.objects.filter(booking__status='pending_payment_validation').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0011_booking_listing_protect'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _replace_constraint(BLOCKING_STATUSES), _replace_constraint(PREVIOUS_STATUSES),
+        ),
+        migrations.RunPython(occupy_validation_dates, release_validation_dates),
+    ]
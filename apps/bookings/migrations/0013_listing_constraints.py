@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+def check_orphans(apps, schema_editor):
+    """
+    Les contraintes « un seul bien » exigent des réservations et favoris
+    rattachés à un bien (`manage.py backfill_booking_listings`, migration 0007).
+    Un favori dont le bien a disparu n'a plus d'usage : il est supprimé. Une
+    réservation sans bien est signalée, pas supprimée d'office.
+    """
+    from apps.bookings.backfill import orphans
+
+    orphans(apps.get_model('bookings', 'Favorite')).delete()
+
+    ids = list(orphans(apps.get_model('bookings', 'Booking')).values_list('id', flat=True)[:20])
+    if ids:
+        raise RuntimeError(
+            f"Réservations sans bien (ids : {', '.join(map(str, ids))}…) : lancez "
+            "`manage.py backfill_booking_listings` (--delete-orphans pour les supprimer) avant de migrer."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0012_booking_block_payment_validation'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_orphans, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('residence__isnull', True), ('vehicle__isnull', False)), models.Q(('residence__isnull', False), ('vehicle__isnull', True)), _connector='OR'), name='booking_exactly_one_listing'),
+        ),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('residence__isnull', True), ('vehicle__isnull', False)), models.Q(('residence__isnull', False), ('vehicle__isnull', True)), _connector='OR'), name='favorite_exactly_one_listing'),
+        ),
+    ]
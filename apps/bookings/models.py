@@ -4,10 +4,49 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.utils import timezone
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
 import uuid
 
 
+# Biens réservables : nom du modèle (ContentType.model) -> clé étrangère typée
+LISTING_FIELDS = ('vehicle', 'residence')
+
+
+def sync_listing_fields(instance):
+    """
+    Synchronise les clés étrangères typées (vehicle / residence) avec la
+    GenericForeignKey (content_type / object_id), dans les deux sens.
+    La GFK reste renseignée pendant la transition pour ne pas casser l'API.
+    """
+    if instance.content_type_id:
+        model = ContentType.objects.get_for_id(instance.content_type_id).model
+        if model in LISTING_FIELDS and not getattr(instance, f'{model}_id'):
+            setattr(instance, f'{model}_id', instance.object_id)
+        return
+
+    for field in LISTING_FIELDS:
+        listing_id = getattr(instance, f'{field}_id')
+        if listing_id:
+            related_model = instance._meta.get_field(field).related_model
+            instance.content_type = ContentType.objects.get_for_model(related_model)
+            instance.object_id = listing_id
+            return
+
+
+def exactly_one_listing(name):
+    return models.CheckConstraint(
+        condition=(
+            models.Q(vehicle__isnull=False, residence__isnull=True)
+            | models.Q(vehicle__isnull=True, residence__isnull=False)
+        ),
+        name=name,
+    )
+
+
 class Booking(models.Model):
     """Modèle pour les réservations (résidences et véhicules)"""
     
@@ -22,6 +61,10 @@ class Booking(models.Model):
         ('rejected', 'Rejetée'),
         ('refunded', 'Remboursée'),
     )
+
+    # Statuts qui bloquent les dates du bien (un paiement en cours de
+    # validation aussi : sinon son approbation heurterait une autre réservation)
+    BLOCKING_STATUSES = ('pending', 'pending_payment_validation', 'confirmed', 'paid', 'ongoing')
     
     # Identifiant unique
     booking_number = models.CharField('numéro de réservation', max_length=20, unique=True, editable=False)
@@ -38,6 +81,37 @@ class Booking(models.Model):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey('content_type', 'object_id')
+
+    # Clés étrangères typées (jointures directes sur les biens).
+    # PROTECT : un bien réservé ne se supprime pas (historique et paiements
+    # conservés) ; les vues le désactivent à la place.
+    vehicle = models.ForeignKey(
+        'vehicles.Vehicle',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='bookings',
+        verbose_name='véhicule'
+    )
+    residence = models.ForeignKey(
+        'residences.Residence',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='bookings',
+        verbose_name='résidence'
+    )
+
+    # Propriétaire du bien (dénormalisé pour les tableaux de bord propriétaire)
+    listing_owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='received_bookings',
+        verbose_name='propriétaire du bien'
+    )
     
     # Dates
     start_date = models.DateField('date de début')
@@ -102,10 +176,32 @@ class Booking(models.Model):
         indexes = [
             models.Index(fields=['status', 'start_date']),
             models.Index(fields=['content_type', 'object_id', 'status']),
+            models.Index(fields=['listing_owner', 'status', 'created_at']),
+        ]
+        constraints = [
+            exactly_one_listing('booking_exactly_one_listing'),
         ]
     
     def __str__(self):
         return f"Réservation {self.booking_number} - {self.client.get_full_name()}"
+
+    # Champs nécessaires au suivi des statistiques propriétaire (OwnerStats)
+    STATS_FIELDS = ('listing_owner_id', 'vehicle_id', 'status', 'total_price')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # État chargé, pour calculer le delta des statistiques au prochain save()
+        if all(field in instance.__dict__ for field in cls.STATS_FIELDS):
+            instance._loaded_stats_state = instance.get_stats_state()
+        return instance
+
+    def get_stats_state(self):
+        """(propriétaire, type de bien, statut, montant) tel que compté dans OwnerStats"""
+        if not self.listing_owner_id:
+            return None
+        listing_type = 'vehicle' if self.vehicle_id else 'residence'
+        return (self.listing_owner_id, listing_type, self.status, self.total_price)
     
     def save(self, *args, **kwargs):
         if not self.booking_number:
@@ -117,7 +213,73 @@ class Booking(models.Model):
         # Calcul sécurisé backend
         self.total_price = self.subtotal + self.fees
 
-        super().save(*args, **kwargs)
+        sync_listing_fields(self)
+
+        if not self.listing_owner_id:
+            listing = self.vehicle or self.residence
+            if listing:
+                self.listing_owner_id = listing.owner_id
+
+        adding = self._state.adding
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_occupied_dates()
+            self.sync_owner_stats(adding)
+
+        self.invalidate_caches()
+
+    # Suppression : OwnerStats et caches sont mis à jour par les signaux
+    # pre_delete/post_delete (apps.bookings.stats), émis aussi pour les
+    # suppressions en cascade et par queryset, qui n'appellent pas delete().
+
+    def sync_owner_stats(self, adding):
+        """Répercute la transition de statut sur OwnerStats (incréments F())"""
+        new_state = self.get_stats_state()
+
+        if adding:
+            OwnerStats.record_booking_change(None, new_state)
+        elif hasattr(self, '_loaded_stats_state'):
+            OwnerStats.record_booking_change(self._loaded_stats_state, new_state)
+        elif self.listing_owner_id:
+            # État précédent inconnu (instance non chargée depuis la base)
+            from .stats import rebuild_owner_stats
+            rebuild_owner_stats(owner_ids=[self.listing_owner_id])
+
+        self._loaded_stats_state = new_state
+
+    def invalidate_caches(self):
+        """Invalide le calendrier du bien, ses listes par période et les statistiques du propriétaire"""
+        from apps.core.response_cache import LISTING_RESPONSES
+        from .calendars import invalidate_calendar
+        from .stats import invalidate_owner_stats
+        invalidate_calendar(self.content_type_id, self.object_id)
+        invalidate_owner_stats(self.listing_owner_id)
+        LISTING_RESPONSES['vehicle' if self.vehicle_id else 'residence'].invalidate_periods()
+
+    def sync_occupied_dates(self):
+        """Met à jour le calendrier d'occupation pour cette réservation"""
+        OccupiedDate.objects.filter(booking=self).delete()
+
+        if self.status not in self.BLOCKING_STATUSES:
+            return
+
+        OccupiedDate.objects.bulk_create([
+            OccupiedDate(
+                booking=self,
+                content_type_id=self.content_type_id,
+                object_id=self.object_id,
+                date=day,
+            )
+            for day in self.get_occupied_days()
+        ])
+
+    def get_occupied_days(self):
+        """Jours (nuits) occupés par la réservation : [start_date, end_date)"""
+        day = self.start_date
+        while day < self.end_date:
+            yield day
+            day += timedelta(days=1)
 
     def clean(self):
         if self.start_date and self.end_date:
@@ -136,6 +298,7 @@ class Booking(models.Model):
     def check_availability(cls, obj, start_date, end_date, exclude_booking_id=None):
         """
         Vérifie si un objet est disponible pour une période donnée.
+        Lit le calendrier d'occupation (OccupiedDate) plutôt que les réservations.
         
         Args:
             obj: L'objet (Vehicle ou Residence) à vérifier
@@ -148,22 +311,17 @@ class Booking(models.Model):
         """
         content_type = ContentType.objects.get_for_model(obj.__class__)
         
-        query = cls.objects.filter(
+        query = OccupiedDate.objects.filter(
             content_type=content_type,
             object_id=obj.id,
-            status__in=['pending', 'confirmed', 'paid', 'ongoing'],
+            date__gte=start_date,
+            date__lt=end_date,
         )
         
         if exclude_booking_id:
-            query = query.exclude(id=exclude_booking_id)
+            query = query.exclude(booking_id=exclude_booking_id)
         
-        # Vérifier les chevauchements
-        overlapping = query.filter(
-            start_date__lt=end_date,
-            end_date__gt=start_date
-        ).exists()
-        
-        return not overlapping
+        return not query.exists()
 
     @classmethod
     def get_unavailable_dates(cls, obj, days_ahead=90):
@@ -171,26 +329,44 @@ class Booking(models.Model):
         Retourne les dates indisponibles pour un objet.
         Utile pour afficher dans un calendrier.
         """
-        from datetime import timedelta
-        
         content_type = ContentType.objects.get_for_model(obj.__class__)
         end_range = timezone.now().date() + timedelta(days=days_ahead)
         
-        bookings = cls.objects.filter(
+        dates = OccupiedDate.objects.filter(
             content_type=content_type,
             object_id=obj.id,
-            status__in=['pending', 'confirmed', 'paid', 'ongoing'],
-            start_date__lte=end_range
-        ).values('start_date', 'end_date')
-        
-        unavailable_dates = []
-        for booking in bookings:
-            current_date = booking['start_date']
-            while current_date < booking['end_date']:
-                unavailable_dates.append(current_date.isoformat())
-                current_date += timedelta(days=1)
+            date__lte=end_range
+        ).values_list('date', flat=True).distinct().order_by('date')
         
-        return unavailable_dates
+        return [date.isoformat() for date in dates]
+
+    @classmethod
+    def get_unavailable_ranges(cls, obj, days_ahead=90):
+        """
+        Retourne les périodes indisponibles fusionnées, sous forme de
+        plages [début, fin) bornées à [aujourd'hui, aujourd'hui + days_ahead).
+        """
+        content_type = ContentType.objects.get_for_model(obj.__class__)
+        today = timezone.now().date()
+        end_range = today + timedelta(days=days_ahead)
+
+        bookings = cls.objects.filter(
+            content_type=content_type,
+            object_id=obj.id,
+            status__in=cls.BLOCKING_STATUSES,
+            start_date__lt=end_range,
+            end_date__gt=today,
+        ).order_by('start_date').values_list('start_date', 'end_date')
+
+        ranges = []
+        for start, end in bookings:
+            start, end = max(start, today), min(end, end_range)
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+
+        return [tuple(r) for r in ranges]
     
     def can_be_cancelled(self):
         """Vérifie si la réservation peut être annulée"""
@@ -228,6 +404,220 @@ class Booking(models.Model):
             return 0  # Pas de remboursement
 
 
+class OwnerStats(models.Model):
+    """
+    Statistiques des réservations reçues, par propriétaire et type de bien.
+    Mises à jour par incréments F() à chaque changement de statut d'une
+    réservation et à chaque paiement complété ; reconstruites par
+    `manage.py rebuild_owner_stats`, vérifiées par `manage.py check_owner_stats`.
+    """
+
+    LISTING_TYPE_CHOICES = (
+        ('residence', 'Résidence'),
+        ('vehicle', 'Véhicule'),
+    )
+
+    # Statuts comptant dans le chiffre d'affaires
+    REVENUE_STATUSES = ('confirmed', 'completed')
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='owner_stats',
+        verbose_name='propriétaire'
+    )
+    listing_type = models.CharField('type de bien', max_length=20, choices=LISTING_TYPE_CHOICES)
+
+    total_bookings = models.IntegerField('réservations', default=0)
+
+    # Une colonne par statut de réservation (voir Booking.STATUS_CHOICES)
+    pending = models.IntegerField('en attente', default=0)
+    pending_payment_validation = models.IntegerField('en attente de validation paiement', default=0)
+    confirmed = models.IntegerField('confirmées', default=0)
+    paid = models.IntegerField('payées', default=0)
+    ongoing = models.IntegerField('en cours', default=0)
+    completed = models.IntegerField('terminées', default=0)
+    cancelled = models.IntegerField('annulées', default=0)
+    rejected = models.IntegerField('rejetées', default=0)
+    refunded = models.IntegerField('remboursées', default=0)
+
+    revenue = models.DecimalField(
+        'chiffre d\'affaires confirmé (FCFA)',
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    payments_received = models.DecimalField(
+        'paiements complétés (FCFA)',
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+
+    updated_at = models.DateTimeField('dernière modification', auto_now=True)
+
+    class Meta:
+        verbose_name = 'statistiques propriétaire'
+        verbose_name_plural = 'statistiques propriétaires'
+        unique_together = ['owner', 'listing_type']
+
+    def __str__(self):
+        return f"Statistiques {self.get_listing_type_display()} - {self.owner}"
+
+    @classmethod
+    def increment(cls, owner_id, listing_type, deltas, create=True):
+        """
+        Applique des deltas {champ: valeur} par incréments F().
+        create=False : ligne absente ignorée (propriétaire en cours de suppression)
+        """
+        updates = {field: models.F(field) + value for field, value in deltas.items() if value}
+        if not updates:
+            return
+
+        if create:
+            cls.objects.get_or_create(owner_id=owner_id, listing_type=listing_type)
+        cls.objects.filter(owner_id=owner_id, listing_type=listing_type).update(**updates)
+
+    @classmethod
+    def record_booking_change(cls, old_state, new_state):
+        """
+        Passe une réservation de old_state à new_state (voir
+        Booking.get_stats_state ; None = réservation absente).
+        """
+        if old_state == new_state:
+            return
+
+        deltas = defaultdict(lambda: defaultdict(int))
+        for state, sign in ((old_state, -1), (new_state, 1)):
+            if state is None:
+                continue
+            owner_id, listing_type, status, total_price = state
+            row = deltas[(owner_id, listing_type)]
+            row['total_bookings'] += sign
+            row[status] += sign
+            if status in cls.REVENUE_STATUSES:
+                row['revenue'] += sign * Decimal(total_price or 0)
+
+        for (owner_id, listing_type), row in deltas.items():
+            cls.increment(owner_id, listing_type, row, create=new_state is not None)
+
+    @classmethod
+    def record_payment(cls, payment, sign=1):
+        """Compte (sign=1) ou décompte (sign=-1) un paiement complété"""
+        state = payment.booking.get_stats_state()
+        if state is None:
+            return
+        owner_id, listing_type, _, _ = state
+        cls.increment(owner_id, listing_type, {'payments_received': sign * payment.amount})
+
+
+class OccupiedDate(models.Model):
+    """
+    Calendrier d'occupation : une ligne par (bien, jour) bloqué par une réservation.
+    Maintenu par Booking.save(), reconstruit par `manage.py rebuild_occupancy`.
+    """
+
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name='occupied_dates',
+        verbose_name='réservation'
+    )
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    date = models.DateField('date')
+
+    class Meta:
+        verbose_name = 'date occupée'
+        verbose_name_plural = 'dates occupées'
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id} - {self.date}"
+
+
+class PricingRule(models.Model):
+    """
+    Règle tarifaire d'un bien : majoration / remise saisonnière ou remise
+    séjour long. Compilée et mise en cache par apps.bookings.pricing, sous
+    une clé versionnée par updated_at (pas d'invalidation explicite).
+    """
+
+    KIND_CHOICES = [
+        ('season', 'Saison (période)'),
+        ('long_stay', 'Séjour long'),
+    ]
+
+    vehicle = models.ForeignKey(
+        'vehicles.Vehicle',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='pricing_rules',
+        verbose_name='véhicule'
+    )
+    residence = models.ForeignKey(
+        'residences.Residence',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='pricing_rules',
+        verbose_name='résidence'
+    )
+
+    name = models.CharField('nom', max_length=100)
+    kind = models.CharField('type', max_length=20, choices=KIND_CHOICES)
+    adjustment_percent = models.DecimalField(
+        'ajustement (%)',
+        max_digits=5,
+        decimal_places=2,
+        validators=[MinValueValidator(-100), MaxValueValidator(500)],
+        help_text='Négatif pour une remise (-10 = -10 %), positif pour une majoration'
+    )
+
+    # Saison : bornes incluses
+    start_date = models.DateField('début', null=True, blank=True)
+    end_date = models.DateField('fin', null=True, blank=True)
+
+    # Séjour long : à partir de N nuits / jours (ex. 7 = semaine, 28 = mois)
+    min_nights = models.PositiveIntegerField('à partir de (nuits)', null=True, blank=True)
+
+    is_active = models.BooleanField('active', default=True)
+    created_at = models.DateTimeField('date de création', auto_now_add=True)
+    updated_at = models.DateTimeField('dernière modification', auto_now=True)
+
+    class Meta:
+        verbose_name = 'règle tarifaire'
+        verbose_name_plural = 'règles tarifaires'
+        ordering = ['kind', 'start_date', 'min_nights']
+        constraints = [
+            exactly_one_listing('pricingrule_exactly_one_listing'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.adjustment_percent} %)"
+
+    @property
+    def listing_type(self):
+        return 'vehicle' if self.vehicle_id else 'residence'
+
+    @property
+    def listing_id(self):
+        return self.vehicle_id or self.residence_id
+
+    def clean(self):
+        if self.kind == 'season':
+            if not self.start_date or not self.end_date:
+                raise ValidationError("Une règle saisonnière nécessite une date de début et de fin")
+            if self.end_date < self.start_date:
+                raise ValidationError("La date de fin doit être après la date de début")
+        elif self.kind == 'long_stay' and not self.min_nights:
+            raise ValidationError("Une remise séjour long nécessite un nombre minimum de nuits")
+
+
 class BookingReview(models.Model):
     """Avis sur les réservations"""
     
@@ -296,6 +686,23 @@ class Favorite(models.Model):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey('content_type', 'object_id')
+
+    vehicle = models.ForeignKey(
+        'vehicles.Vehicle',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='favorites',
+        verbose_name='véhicule'
+    )
+    residence = models.ForeignKey(
+        'residences.Residence',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='favorites',
+        verbose_name='résidence'
+    )
     
     created_at = models.DateTimeField('date d\'ajout', auto_now_add=True)
     
@@ -304,6 +711,16 @@ class Favorite(models.Model):
         verbose_name_plural = 'favoris'
         unique_together = ['user', 'content_type', 'object_id']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
+        constraints = [
+            exactly_one_listing('favorite_exactly_one_listing'),
+        ]
     
     def __str__(self):
-        return f"Favori de {self.user.get_full_name()}"
\ No newline at end of file
+        return f"Favori de {self.user.get_full_name()}"
+
+    def save(self, *args, **kwargs):
+        sync_listing_fields(self)
+        super().save(*args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,78 @@
+# apps/bookings/occupancy.py
+"""
+Calendrier d'occupation des biens (OccupiedDate).
+
+Booking.save() maintient le calendrier au fil de l'eau ; les fonctions
+ci-dessous servent à le reconstruire entièrement et à le comparer aux
+réservations (par exemple après un .update() en masse qui contourne save()).
+"""
+
+from collections import Counter
+
+from django.db import transaction
+
+from .models import Booking, OccupiedDate
+
+
+def expected_occupied_dates(bookings=None):
+    """Calcule les lignes attendues à partir des réservations bloquantes"""
+    if bookings is None:
+        bookings = Booking.objects.all()
+
+    bookings = bookings.filter(status__in=Booking.BLOCKING_STATUSES).only(
+        'id', 'content_type_id', 'object_id', 'start_date', 'end_date'
+    )
+
+    for booking in bookings.iterator():
+        for day in booking.get_occupied_days():
+            yield OccupiedDate(
+                booking_id=booking.id,
+                content_type_id=booking.content_type_id,
+                object_id=booking.object_id,
+                date=day,
+            )
+
+
+def rebuild_occupied_dates(batch_size=1000):
+    """Reconstruit tout le calendrier d'occupation. Retourne le nombre de lignes."""
+    created = 0
+
+    with transaction.atomic():
+        OccupiedDate.objects.all().delete()
+
+        batch = []
+        for row in expected_occupied_dates():
+            batch.append(row)
+            if len(batch) >= batch_size:
+                OccupiedDate.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+
+        if batch:
+            OccupiedDate.objects.bulk_create(batch)
+            created += len(batch)
+
+    return created
+
+
+def _key(row):
+    return (row.booking_id, row.content_type_id, row.object_id, row.date)
+
+
+def check_occupied_dates():
+    """
+    Compare le calendrier aux réservations.
+
+    Returns:
+        tuple: (lignes manquantes, lignes en trop), chacune un Counter de
+        (booking_id, content_type_id, object_id, date)
+    """
+    expected = Counter(_key(row) for row in expected_occupied_dates())
+    actual = Counter(
+        tuple(values)
+        for values in OccupiedDate.objects.values_list(
+            'booking_id', 'content_type_id', 'object_id', 'date'
+        ).iterator()
+    )
+
+    return expected - actual, actual - expected
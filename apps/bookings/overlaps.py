@@ -0,0 +1,71 @@
+# apps/bookings/overlaps.py
+"""
+Réservations bloquantes qui se chevauchent sur un même bien.
+
+La contrainte d'exclusion PostgreSQL `bookings_booking_no_overlap`
+(migrations 0005 et 0012) ne peut pas être posée tant qu'il en reste :
+`manage.py check_booking_overlaps` les liste et, avec --cancel-conflicts,
+annule dans chaque conflit les réservations les moins avancées (en attente
+avant payée), puis les plus récentes.
+"""
+
+from django.db.models import Exists, OuterRef
+
+
+# Ordre de conservation en cas de conflit : la réservation la plus avancée gagne
+STATUS_PRIORITY = ('ongoing', 'paid', 'confirmed', 'pending_payment_validation', 'pending')
+
+
+def overlapping_bookings(booking_model, statuses):
+    """
+    Réservations bloquantes en conflit avec une réservation bloquante
+    antérieure (id plus petit) du même bien.
+
+    Args:
+        booking_model: Booking, ou le modèle historique d'une migration
+        statuses: statuts bloquants à prendre en compte
+    """
+    blocking = booking_model._default_manager.filter(status__in=statuses)
+    earlier = blocking.filter(
+        content_type_id=OuterRef('content_type_id'),
+        object_id=OuterRef('object_id'),
+        id__lt=OuterRef('id'),
+        start_date__lt=OuterRef('end_date'),
+        end_date__gt=OuterRef('start_date'),
+    )
+    return blocking.filter(Exists(earlier)).order_by('id')
+
+
+def check_no_overlaps(booking_model, statuses):
+    """Précondition des migrations qui posent la contrainte d'exclusion"""
+    conflicts = list(overlapping_bookings(booking_model, statuses).values_list('id', flat=True)[:20])
+    if conflicts:
+        raise RuntimeError(
+            "Réservations qui se chevauchent (ids : "
+            f"{', '.join(map(str, conflicts))}…) : lancez `manage.py check_booking_overlaps "
+            "--cancel-conflicts` avant de migrer."
+        )
+
+
+def conflicts_to_cancel(booking_model, statuses):
+    """
+    Réservations à annuler pour qu'il ne reste aucun chevauchement : par bien,
+    les réservations sont retenues par statut (STATUS_PRIORITY) puis par
+    ancienneté, et toute réservation qui chevauche une réservation retenue
+    est écartée.
+    """
+    conflicting = overlapping_bookings(booking_model, statuses).values('content_type_id', 'object_id')
+    listings = {(row['content_type_id'], row['object_id']) for row in conflicting}
+
+    to_cancel = []
+    for content_type_id, object_id in sorted(listings):
+        bookings = booking_model._default_manager.filter(
+            content_type_id=content_type_id, object_id=object_id, status__in=statuses,
+        )
+        kept = []
+        for booking in sorted(bookings, key=lambda b: (STATUS_PRIORITY.index(b.status), b.id)):
+            if any(booking.start_date < other.end_date and booking.end_date > other.start_date for other in kept):
+                to_cancel.append(booking)
+            else:
+                kept.append(booking)
+    return to_cancel
@@ -0,0 +1,14 @@
+# apps/bookings/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class ReceivedBookingPagination(CursorPagination):
+    """
+    Pagination par curseur (keyset) sur (created_at, id) :
+    coût constant quelle que soit la profondeur de page.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
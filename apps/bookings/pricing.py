@@ -0,0 +1,363 @@
+# apps/bookings/pricing.py
+"""
+Devis de séjour (résidences et véhicules).
+
+Le prix de chaque nuit / jour vient de Availability.custom_price s'il existe,
+sinon du prix de base du bien ajusté par les règles saisonnières
+(PricingRule). Les remises séjour long s'appliquent ensuite à toutes les
+nuits. Toutes les lignes Availability d'un lot de devis sont lues en une
+seule requête ; les règles de chaque bien sont compilées une fois puis
+mises en cache sous une clé versionnée par (max(updated_at), nombre) de ses
+règles, relue à chaque lot : une règle modifiée ou supprimée dans un autre
+processus (autre worker gunicorn, admin) n'est jamais servie depuis le cache.
+
+Chaque devis est accompagné d'un jeton signé (HMAC, django.core.signing) et
+de courte durée, que la création de réservation peut réutiliser sans
+recalculer le prix.
+"""
+
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+
+from apps.residences.models import Availability, Residence
+from apps.vehicles.models import Vehicle
+
+from .models import PricingRule
+
+
+# Commission appliquée aux locations de véhicules
+VEHICLE_COMMISSION_RATE = Decimal('0.10')
+
+QUOTE_TOKEN_SALT = 'apps.bookings.quote'
+QUOTE_TOKEN_MAX_AGE = getattr(settings, 'QUOTE_TOKEN_MAX_AGE', 15 * 60)
+
+PRICING_RULES_CACHE_TIMEOUT = getattr(settings, 'PRICING_RULES_CACHE_TIMEOUT', 3600)
+
+# Les prix ajustés sont arrondis au franc CFA
+PRICE_QUANTUM = Decimal('1')
+
+LISTING_MODELS = {
+    'residence': Residence,
+    'vehicle': Vehicle,
+}
+
+PRICE_FIELDS = {
+    'residence': 'price_per_night',
+    'vehicle': 'price_per_day',
+}
+
+
+def listing_type_of(obj):
+    return 'vehicle' if isinstance(obj, Vehicle) else 'residence'
+
+
+def stay_dates(start_date, end_date):
+    """Nuits / jours facturés : [start_date, end_date), au minimum un"""
+    nights = (end_date - start_date).days or 1
+    return [start_date + timedelta(days=i) for i in range(nights)]
+
+
+class CompiledPricingRules:
+    """
+    Règles actives d'un bien, prêtes à être évaluées sans requête.
+
+    seasons : [(début, fin incluse, coefficient)]
+    long_stays : [(nuits minimum, coefficient)], du plus long au plus court
+    """
+
+    def __init__(self, rules=()):
+        self.seasons = []
+        self.long_stays = []
+        for rule in rules:
+            factor = 1 + rule.adjustment_percent / 100
+            if rule.kind == 'season' and rule.start_date and rule.end_date:
+                self.seasons.append((rule.start_date, rule.end_date, factor))
+            elif rule.kind == 'long_stay' and rule.min_nights:
+                self.long_stays.append((rule.min_nights, factor))
+        self.long_stays.sort(reverse=True)
+
+    def __bool__(self):
+        return bool(self.seasons or self.long_stays)
+
+    def nightly_factors(self, start_date, nights):
+        """
+        Coefficient de chaque nuit de [start_date, start_date + nights).
+        Chaque saison remplit sa tranche d'indices : O(règles + nuits).
+        """
+        factors = [Decimal('1')] * nights
+        last_day = start_date + timedelta(days=nights - 1)
+        for season_start, season_end, factor in self.seasons:
+            if season_end < start_date or season_start > last_day:
+                continue
+            first = max((season_start - start_date).days, 0)
+            last = min((season_end - start_date).days, nights - 1)
+            for i in range(first, last + 1):
+                factors[i] *= factor
+        return factors
+
+    def long_stay_factor(self, nights):
+        """Meilleure remise séjour long applicable (seuil le plus élevé atteint)"""
+        for min_nights, factor in self.long_stays:
+            if nights >= min_nights:
+                return factor
+        return Decimal('1')
+
+    def apply(self, start_date, prices, fixed):
+        """
+        Args:
+            prices: prix de base par nuit
+            fixed: nuits dont le prix est imposé (custom_price), sans saison
+
+        Returns:
+            list: prix ajustés par nuit
+        """
+        if not self:
+            return prices
+        nights = len(prices)
+        long_stay = self.long_stay_factor(nights)
+        adjusted = []
+        for price, factor, is_fixed in zip(prices, self.nightly_factors(start_date, nights), fixed):
+            factor = long_stay if is_fixed else factor * long_stay
+            if factor != 1:
+                price = (price * factor).quantize(PRICE_QUANTUM, rounding=ROUND_HALF_UP)
+            adjusted.append(price)
+        return adjusted
+
+
+def _rules_cache_key(listing_type, listing_id, version):
+    return f"pricing-rules:{listing_type}:{listing_id}:{version}"
+
+
+def _listing_lookups(listing_keys):
+    lookups = Q()
+    for listing_type, listing_id in listing_keys:
+        lookups |= Q(**{f'{listing_type}_id': listing_id})
+    return lookups
+
+
+def rules_versions(listing_keys):
+    """
+    Version des règles de chaque bien (biens sans règle absents), en une
+    requête : date de la dernière modification et nombre de règles.
+    """
+    rows = PricingRule.objects.filter(_listing_lookups(listing_keys)).values(
+        'vehicle_id', 'residence_id'
+    ).annotate(last_modified=Max('updated_at'), count=Count('id')).order_by()
+    return {
+        ('vehicle', row['vehicle_id']) if row['vehicle_id'] else ('residence', row['residence_id']):
+            f"{row['last_modified'].timestamp()}.{row['count']}"
+        for row in rows
+    }
+
+
+def compiled_rules(stays):
+    """
+    Règles compilées des biens d'un lot de devis : versions des règles, lecture
+    groupée du cache, puis une requête pour tous les biens absents du cache.
+
+    Returns:
+        dict: {(listing_type, id): CompiledPricingRules}
+    """
+    listing_keys = {(listing_type_of(obj), obj.pk) for obj, start_date, end_date in stays}
+    if not listing_keys:
+        return {}
+
+    versions = rules_versions(listing_keys)
+    # Bien sans aucune règle : rien à lire
+    compiled = {key: CompiledPricingRules() for key in listing_keys - set(versions)}
+
+    cache_keys = {_rules_cache_key(*key, version): key for key, version in versions.items()}
+    found = cache.get_many(cache_keys) if PRICING_RULES_CACHE_TIMEOUT else {}
+    compiled.update({cache_keys[key]: rules for key, rules in found.items()})
+
+    missing = listing_keys - set(compiled)
+    if missing:
+        rules_by_listing = {key: [] for key in missing}
+        for rule in PricingRule.objects.filter(_listing_lookups(missing), is_active=True):
+            rules_by_listing[(rule.listing_type, rule.listing_id)].append(rule)
+
+        fresh = {key: CompiledPricingRules(rules) for key, rules in rules_by_listing.items()}
+        compiled.update(fresh)
+        if PRICING_RULES_CACHE_TIMEOUT:
+            cache.set_many(
+                {_rules_cache_key(*key, versions[key]): rules for key, rules in fresh.items()},
+                PRICING_RULES_CACHE_TIMEOUT,
+            )
+
+    return compiled
+
+
+def _availability_overrides(stays):
+    """
+    Lit en une requête les lignes Availability des résidences concernées.
+
+    Returns:
+        tuple: ({(residence_id, date): custom_price}, {(residence_id, date)} indisponibles)
+    """
+    # Une seule plage par résidence, couvrant tous ses séjours du lot
+    bounds = {}
+    for obj, start_date, end_date in stays:
+        if listing_type_of(obj) == 'residence':
+            last_day = stay_dates(start_date, end_date)[-1]
+            first, last = bounds.get(obj.pk, (start_date, last_day))
+            bounds[obj.pk] = (min(first, start_date), max(last, last_day))
+
+    if not bounds:
+        return {}, set()
+
+    ranges = Q()
+    for residence_id, (first, last) in bounds.items():
+        ranges |= Q(residence_id=residence_id, date__gte=first, date__lte=last)
+
+    custom_prices, unavailable = {}, set()
+    rows = Availability.objects.filter(ranges).values_list(
+        'residence_id', 'date', 'is_available', 'custom_price'
+    )
+    for residence_id, day, is_available, custom_price in rows:
+        if custom_price is not None:
+            custom_prices[(residence_id, day)] = custom_price
+        if not is_available:
+            unavailable.add((residence_id, day))
+
+    return custom_prices, unavailable
+
+
+def _build_quote(obj, start_date, end_date, custom_prices, unavailable, rules):
+    listing_type = listing_type_of(obj)
+    base_price = Decimal(str(getattr(obj, PRICE_FIELDS[listing_type]) or 0))
+    dates = stay_dates(start_date, end_date)
+
+    if listing_type == 'residence':
+        prices = [Decimal(custom_prices.get((obj.pk, day), base_price)) for day in dates]
+        fixed = [(obj.pk, day) in custom_prices for day in dates]
+    else:
+        prices = [base_price] * len(dates)
+        fixed = [False] * len(dates)
+
+    if rules:
+        prices = rules.apply(start_date, prices, fixed)
+
+    subtotal = sum(prices, Decimal('0'))
+
+    if listing_type == 'residence':
+        # Résidences : frais de ménage fixes
+        fees = Decimal(str(obj.cleaning_fee or 0))
+        fee_label = 'cleaning_fee'
+    else:
+        # Véhicules : commission plateforme
+        fees = subtotal * VEHICLE_COMMISSION_RATE
+        fee_label = 'commission'
+
+    return {
+        "listing_type": listing_type,
+        "listing_id": obj.pk,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "nights": len(dates),
+        "nightly_prices": [
+            {"date": day.isoformat(), "price": price}
+            for day, price in zip(dates, prices)
+        ],
+        "subtotal": subtotal,
+        "fees": fees,
+        "fee_type": fee_label,
+        "total_price": subtotal + fees,
+        "unavailable_dates": [
+            day.isoformat() for day in dates if (obj.pk, day) in unavailable
+        ] if listing_type == 'residence' else [],
+    }
+
+
+def quote_stays(stays):
+    """
+    Devis pour plusieurs séjours.
+
+    Args:
+        stays: liste de (bien, start_date, end_date)
+
+    Returns:
+        list: un devis détaillé par séjour, dans le même ordre
+    """
+    custom_prices, unavailable = _availability_overrides(stays)
+    rules = compiled_rules(stays)
+    return [
+        _build_quote(
+            obj, start_date, end_date, custom_prices, unavailable,
+            rules.get((listing_type_of(obj), obj.pk)),
+        )
+        for obj, start_date, end_date in stays
+    ]
+
+
+def sign_quote(quote):
+    """Jeton signé encodant le bien, les dates et les montants du devis"""
+    return signing.dumps({
+        "type": quote["listing_type"],
+        "id": quote["listing_id"],
+        "start": quote["start_date"],
+        "end": quote["end_date"],
+        "nights": quote["nights"],
+        "subtotal": str(quote["subtotal"]),
+        "fees": str(quote["fees"]),
+    }, salt=QUOTE_TOKEN_SALT, compress=True)
+
+
+def load_quote_token(token, obj, start_date, end_date):
+    """
+    Vérifie un jeton de devis pour ce bien et ces dates.
+
+    Returns:
+        dict | None: montants du devis, ou None si le jeton est invalide,
+        expiré ou ne correspond pas à la réservation demandée
+    """
+    try:
+        data = signing.loads(token, salt=QUOTE_TOKEN_SALT, max_age=QUOTE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+    try:
+        matches = (
+            data["type"] == listing_type_of(obj)
+            and data["id"] == obj.pk
+            and date.fromisoformat(data["start"]) == start_date
+            and date.fromisoformat(data["end"]) == end_date
+        )
+        if not matches:
+            return None
+
+        subtotal = Decimal(data["subtotal"])
+        fees = Decimal(data["fees"])
+        return {
+            "nights": data["nights"],
+            "subtotal": subtotal,
+            "fees": fees,
+            "total_price": subtotal + fees,
+        }
+    except (KeyError, TypeError, ValueError, ArithmeticError):
+        return None
+
+
+def quote_stay(obj, start_date, end_date):
+    return quote_stays([(obj, start_date, end_date)])[0]
+
+
+def load_listings(items):
+    """
+    Charge les biens référencés par des éléments {"residence"|"vehicle": id},
+    avec une requête par type de bien.
+
+    Returns:
+        dict: {(listing_type, id): bien}
+    """
+    listings = {}
+    for listing_type, model in LISTING_MODELS.items():
+        ids = {item[listing_type] for item in items if listing_type in item}
+        if ids:
+            for pk, obj in model.objects.filter(is_active=True).in_bulk(ids).items():
+                listings[(listing_type, pk)] = obj
+    return listings
@@ -1,7 +1,9 @@
 from rest_framework import serializers
-from decimal import Decimal
 from django.contrib.contenttypes.models import ContentType
-from .models import Booking, BookingReview, Favorite
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from .models import Booking, BookingReview, Favorite, PricingRule
+from .pricing import load_quote_token, quote_stay
 from apps.vehicles.models import Vehicle
 from apps.residences.models import Residence
 
@@ -33,6 +35,9 @@ class BookingSerializer(serializers.ModelSerializer):
         write_only=True
     )
 
+    # Jeton renvoyé par POST /api/bookings/quote/ (optionnel)
+    quote_token = serializers.CharField(required=False, write_only=True)
+
     class Meta:
         model = Booking
         fields = [
@@ -49,6 +54,7 @@ class BookingSerializer(serializers.ModelSerializer):
             # création
             "vehicle",
             "residence",
+            "quote_token",
 
             "start_date",
             "end_date",
@@ -81,7 +87,8 @@ class BookingSerializer(serializers.ModelSerializer):
 
     # ✅ maintenant DRF le connait
     def get_content_type_model(self, obj):
-        return obj.content_type.model
+        # get_for_id utilise le cache de ContentType : pas de requête par ligne
+        return ContentType.objects.get_for_id(obj.content_type_id).model
 
     def validate(self, data):
 
@@ -115,53 +122,76 @@ class BookingSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         request = self.context["request"]
         validated_data["client"] = request.user
+        quote_token = validated_data.pop("quote_token", None)
 
         # Déterminer le type d'objet et le champ de prix
         if 'vehicle' in validated_data:
-            obj = validated_data.pop('vehicle')
+            obj = validated_data['vehicle']
             content_type = ContentType.objects.get_for_model(Vehicle)
             price_field = 'price_per_day'
-            has_cleaning_fee = False
         elif 'residence' in validated_data:
-            obj = validated_data.pop('residence')
+            obj = validated_data['residence']
             content_type = ContentType.objects.get_for_model(Residence)
             price_field = 'price_per_night'
-            has_cleaning_fee = True
         else:
             raise serializers.ValidationError("Type d'objet non spécifié")
 
+        # Clé étrangère typée (conservée dans validated_data) + GFK pour compatibilité
         validated_data['content_type'] = content_type
         validated_data['object_id'] = obj.id
 
-        # Calcul des jours/nuits
-        days = (validated_data["end_date"] - validated_data["start_date"]).days
-        if days == 0:
-            days = 1
-
         # Récupérer le prix selon le type d'objet
         price_per_period = getattr(obj, price_field, None)
 
         if not price_per_period:
             raise serializers.ValidationError(f"Objet sans prix. Champ requis: {price_field}")
 
-        # Calcul du sous-total
-        subtotal = Decimal(str(price_per_period)) * days
-        
-        # Calcul des frais selon le type
-        if has_cleaning_fee:
-            # Pour les résidences : frais de ménage fixes
-            cleaning_fee = getattr(obj, 'cleaning_fee', Decimal('0.00'))
-            fees = Decimal(str(cleaning_fee)) if cleaning_fee else Decimal('0.00')
-        else:
-            # Pour les véhicules : 10% de commission
-            fees = subtotal * Decimal("0.10")
-
-        validated_data["duration"] = days
-        validated_data["subtotal"] = subtotal
-        validated_data["fees"] = fees
-        validated_data["total_price"] = subtotal + fees
-
-        return super().create(validated_data)
+        # Devis signé encore valide : pas de recalcul. Sinon prix nuit par nuit
+        # (Availability.custom_price) + frais selon le type
+        quote = None
+        if quote_token:
+            quote = load_quote_token(
+                quote_token, obj, validated_data["start_date"], validated_data["end_date"]
+            )
+        if quote is None:
+            quote = quote_stay(obj, validated_data["start_date"], validated_data["end_date"])
+
+        validated_data["duration"] = quote["nights"]
+        validated_data["subtotal"] = quote["subtotal"]
+        validated_data["fees"] = quote["fees"]
+        validated_data["total_price"] = quote["total_price"]
+
+        return self.create_locked(obj, validated_data)
+
+    def create_locked(self, obj, validated_data):
+        """
+        Vérification de disponibilité + insertion dans une même transaction.
+
+        Le verrou porte uniquement sur la ligne du bien réservé (select_for_update),
+        donc deux réservations simultanées du même bien sont sérialisées sans
+        bloquer les autres biens. SQLite ignore ce verrou : la transaction y est
+        ouverte en BEGIN IMMEDIATE (settings.DATABASES), ce qui sérialise les
+        écritures. La contrainte d'exclusion (PostgreSQL) ou les triggers
+        (SQLite) de la migration 0005 restent le dernier rempart.
+        """
+        unavailable = serializers.ValidationError(
+            "Ce bien n'est pas disponible pour ces dates"
+        )
+
+        try:
+            with transaction.atomic():
+                obj.__class__.objects.select_for_update().only('id').get(pk=obj.pk)
+
+                if not Booking.check_availability(
+                    obj, validated_data["start_date"], validated_data["end_date"]
+                ):
+                    raise unavailable
+
+                return super().create(validated_data)
+        except IntegrityError as exc:
+            if 'bookings_booking_no_overlap' in str(exc):
+                raise unavailable
+            raise
     
 
     def update(self, instance, validated_data):
@@ -175,6 +205,64 @@ class BookingSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class ReceivedBookingSerializer(BookingSerializer):
+    """
+    Réservation reçue par un propriétaire, avec un résumé du bien.
+    Le queryset doit précharger vehicle / residence et leurs images
+    principales dans `primary_images` (voir BookingViewSet.received).
+    """
+
+    listing = serializers.SerializerMethodField(read_only=True)
+
+    class Meta(BookingSerializer.Meta):
+        fields = BookingSerializer.Meta.fields + ["listing"]
+
+    def get_listing(self, obj):
+        listing = obj.vehicle or obj.residence
+        if listing is None:
+            return None
+
+        primary_images = getattr(listing, 'primary_images', [])
+        thumbnail = primary_images[0].image.url if primary_images else None
+        request = self.context.get("request")
+        if thumbnail and request:
+            thumbnail = request.build_absolute_uri(thumbnail)
+
+        return {
+            "id": listing.id,
+            "type": "vehicle" if obj.vehicle_id else "residence",
+            "title": listing.title,
+            "city": listing.city,
+            "thumbnail": thumbnail,
+        }
+
+
+class QuoteItemSerializer(serializers.Serializer):
+    """Un séjour à chiffrer : un véhicule OU une résidence et des dates"""
+
+    vehicle = serializers.IntegerField(required=False, min_value=1)
+    residence = serializers.IntegerField(required=False, min_value=1)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, data):
+        if ('vehicle' in data) == ('residence' in data):
+            raise serializers.ValidationError(
+                "Vous devez spécifier un véhicule OU une résidence"
+            )
+
+        if data['start_date'] >= data['end_date']:
+            raise serializers.ValidationError({
+                'end_date': 'La date de fin doit être après la date de début'
+            })
+
+        return data
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    items = QuoteItemSerializer(many=True, allow_empty=False, max_length=100)
+
+
 class BookingReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = BookingReview
@@ -193,3 +281,52 @@ class FavoriteSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class PricingRuleSerializer(serializers.ModelSerializer):
+    vehicle = serializers.PrimaryKeyRelatedField(
+        queryset=Vehicle.objects.all(), required=False, allow_null=True
+    )
+    residence = serializers.PrimaryKeyRelatedField(
+        queryset=Residence.objects.all(), required=False, allow_null=True
+    )
+
+    class Meta:
+        model = PricingRule
+        fields = [
+            "id",
+            "vehicle",
+            "residence",
+            "name",
+            "kind",
+            "adjustment_percent",
+            "start_date",
+            "end_date",
+            "min_nights",
+            "is_active",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["created_at", "updated_at"]
+
+    def validate(self, data):
+        vehicle = data.get("vehicle", getattr(self.instance, "vehicle", None))
+        residence = data.get("residence", getattr(self.instance, "residence", None))
+        if bool(vehicle) == bool(residence):
+            raise serializers.ValidationError(
+                "Vous devez spécifier un véhicule OU une résidence"
+            )
+
+        listing = vehicle or residence
+        if listing.owner_id != self.context["request"].user.id:
+            raise serializers.ValidationError("Ce bien ne vous appartient pas")
+
+        rule = PricingRule(**{
+            field: data.get(field, getattr(self.instance, field, None))
+            for field in ("kind", "start_date", "end_date", "min_nights")
+        })
+        try:
+            rule.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+
+        return data
+
@@ -0,0 +1,225 @@
+# apps/bookings/stats.py
+"""
+Statistiques des tableaux de bord propriétaire.
+
+/api/bookings/owner_stats/ lit le modèle OwnerStats, maintenu par incréments.
+Les statistiques my_stats sont calculées en un seul aggregate() (Count/Sum
+avec filter=Q(...)) et mises en cache par propriétaire pendant
+OWNER_STATS_CACHE_TIMEOUT secondes (0 pour désactiver le cache).
+Booking.save(), la suppression d'une réservation (signaux, y compris en
+cascade) et les save() des biens invalident le cache, partagé entre workers
+avec CACHE_BACKEND file ou redis (avec locmem, seul le processus courant est
+invalidé et les autres servent au plus OWNER_STATS_CACHE_TIMEOUT secondes de
+retard).
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, CharField, Count, Q, Sum, Value, When
+
+from .models import Booking, OwnerStats
+
+
+OWNER_STATS_CACHE_TIMEOUT = getattr(settings, 'OWNER_STATS_CACHE_TIMEOUT', 30)
+
+REVENUE_STATUSES = OwnerStats.REVENUE_STATUSES
+
+STATUSES = [code for code, label in Booking.STATUS_CHOICES]
+
+# Variantes mises en cache par propriétaire
+STATS_KINDS = ('residence', 'vehicle')
+
+# Colonnes comparées entre OwnerStats et les agrégats en direct
+OWNER_STATS_FIELDS = ['total_bookings', *STATUSES, 'revenue', 'payments_received']
+
+
+def _cache_key(owner_id, kind):
+    return f"owner-stats:{owner_id}:{kind}"
+
+
+def invalidate_owner_stats(owner_id):
+    if owner_id:
+        cache.delete_many([_cache_key(owner_id, kind) for kind in STATS_KINDS])
+
+
+def cached_owner_stats(owner_id, kind, compute):
+    if not OWNER_STATS_CACHE_TIMEOUT:
+        return compute()
+
+    key = _cache_key(owner_id, kind)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute()
+        cache.set(key, stats, OWNER_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def owner_booking_stats(owner):
+    """Statistiques de /api/bookings/owner_stats/ : lecture des lignes OwnerStats"""
+    totals = defaultdict(int)
+    for row in OwnerStats.objects.filter(owner=owner).values(*OWNER_STATS_FIELDS):
+        for field, value in row.items():
+            totals[field] += value
+
+    by_status = {code: totals[code] for code in STATUSES}
+
+    return {
+        "total_bookings": totals['total_bookings'],
+        "pending": by_status['pending'],
+        "confirmed": by_status['confirmed'],
+        "completed": by_status['completed'],
+        "cancelled": by_status['cancelled'],
+        "rejected": by_status['rejected'],
+        "total_revenue": float(totals['revenue'] or Decimal('0')),
+        "payments_received": float(totals['payments_received'] or Decimal('0')),
+        "by_status": by_status,
+    }
+
+
+def owner_listing_stats(owner, listing_model, kind):
+    """
+    Statistiques my_stats d'un type de bien (résidences ou véhicules) :
+    biens et réservations reçues, en un seul aggregate() avec jointure.
+    """
+
+    def compute():
+        aggregates = {
+            'total': Count('id', distinct=True),
+            'available': Count('id', filter=Q(is_active=True), distinct=True),
+            'unavailable': Count('id', filter=Q(is_active=False), distinct=True),
+            'total_bookings': Count('bookings'),
+        }
+        for code in STATUSES:
+            aggregates[f'status_{code}'] = Count('bookings', filter=Q(bookings__status=code))
+
+        row = listing_model.objects.filter(owner=owner).aggregate(**aggregates)
+        by_status = {code: row[f'status_{code}'] for code in STATUSES}
+
+        return {
+            f"total_{kind}s": row['total'],
+            "available": row['available'],
+            "unavailable": row['unavailable'],
+            "total_bookings": row['total_bookings'],
+            "active_bookings": by_status['confirmed'],
+            "by_status": by_status,
+        }
+
+    return cached_owner_stats(owner.pk, kind, compute)
+
+
+def live_owner_stats(owner_ids=None):
+    """
+    Agrégats calculés directement sur Booking et Payment.
+
+    Returns:
+        dict: {(owner_id, listing_type): {champ: valeur}}
+    """
+    from apps.payments.models import Payment
+
+    listing_type = Case(
+        When(vehicle__isnull=False, then=Value('vehicle')),
+        default=Value('residence'),
+        output_field=CharField(),
+    )
+
+    bookings = Booking.objects.filter(listing_owner__isnull=False)
+    if owner_ids is not None:
+        bookings = bookings.filter(listing_owner_id__in=owner_ids)
+
+    aggregates = {
+        'total_bookings': Count('id'),
+        'revenue': Sum('total_price', filter=Q(status__in=REVENUE_STATUSES)),
+    }
+    for code in STATUSES:
+        aggregates[code] = Count('id', filter=Q(status=code))
+
+    stats = defaultdict(lambda: dict.fromkeys(OWNER_STATS_FIELDS, 0))
+
+    rows = bookings.annotate(listing_type=listing_type).values(
+        'listing_owner_id', 'listing_type'
+    ).annotate(**aggregates).order_by()
+    for row in rows:
+        key = (row.pop('listing_owner_id'), row.pop('listing_type'))
+        stats[key].update({field: value or 0 for field, value in row.items()})
+
+    payments = Payment.objects.filter(
+        status='COMPLETED',
+        booking__in=bookings,
+    ).annotate(
+        listing_type=Case(
+            When(booking__vehicle__isnull=False, then=Value('vehicle')),
+            default=Value('residence'),
+            output_field=CharField(),
+        )
+    ).values('booking__listing_owner_id', 'listing_type').annotate(
+        total=Sum('amount')
+    ).order_by()
+    for row in payments:
+        key = (row['booking__listing_owner_id'], row['listing_type'])
+        stats[key]['payments_received'] = row['total'] or 0
+
+    return dict(stats)
+
+
+def rebuild_owner_stats(owner_ids=None):
+    """Reconstruit OwnerStats (tous les propriétaires ou seulement owner_ids)"""
+    live = live_owner_stats(owner_ids)
+
+    with transaction.atomic():
+        existing = OwnerStats.objects.all()
+        if owner_ids is not None:
+            existing = existing.filter(owner_id__in=owner_ids)
+        existing.delete()
+
+        OwnerStats.objects.bulk_create([
+            OwnerStats(owner_id=owner_id, listing_type=listing_type, **values)
+            for (owner_id, listing_type), values in live.items()
+        ])
+
+    return len(live)
+
+
+def check_owner_stats():
+    """
+    Compare OwnerStats aux agrégats en direct.
+
+    Returns:
+        list: [(owner_id, listing_type, champ, valeur stockée, valeur attendue)]
+    """
+    live = live_owner_stats()
+    stored = {
+        (row.pop('owner_id'), row.pop('listing_type')): row
+        for row in OwnerStats.objects.values('owner_id', 'listing_type', *OWNER_STATS_FIELDS)
+    }
+
+    differences = []
+    for key in sorted(set(live) | set(stored), key=str):
+        expected = live.get(key, dict.fromkeys(OWNER_STATS_FIELDS, 0))
+        actual = stored.get(key, dict.fromkeys(OWNER_STATS_FIELDS, 0))
+        for field in OWNER_STATS_FIELDS:
+            if Decimal(actual[field]) != Decimal(expected[field]):
+                differences.append((*key, field, actual[field], expected[field]))
+
+    return differences
+
+
+def booking_pre_delete(sender, instance, **kwargs):
+    """État compté dans OwnerStats, relevé avant la suppression des paiements"""
+    state = instance.get_stats_state()
+    paid = None
+    if state:
+        paid = instance.payments.filter(status='COMPLETED').aggregate(total=Sum('amount'))['total']
+    instance._deleted_stats_state = (state, paid)
+
+
+def booking_post_delete(sender, instance, **kwargs):
+    """Retire la réservation d'OwnerStats (delete(), cascade ou queryset)"""
+    state, paid = getattr(instance, '_deleted_stats_state', (instance.get_stats_state(), None))
+    OwnerStats.record_booking_change(state, None)
+    if state and paid:
+        OwnerStats.increment(state[0], state[1], {'payments_received': -paid}, create=False)
+    instance.invalidate_caches()
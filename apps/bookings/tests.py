@@ -1,3 +1,291 @@
-from django.test import TestCase
+import threading
+from io import StringIO
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.residences.models import Residence
+from apps.vehicles.models import Vehicle
+
+from .models import Booking, PricingRule
+from .overlaps import overlapping_bookings
+from .pricing import quote_stay
+from .stats import check_owner_stats, owner_booking_stats
+from .triggers import SQLITE_DROP_TRIGGERS
+
+
+User = get_user_model()
+
+
+def make_user(username, user_type='client', **extra):
+    return User.objects.create_user(
+        username=username, email=f'{username}@example.com', password='secret', user_type=user_type, **extra
+    )
+
+
+def make_residence(owner, **extra):
+    values = {
+        'title': 'Villa test', 'description': 'Villa', 'type': Residence.TYPE_CHOICES[0][0],
+        'city': Residence.CITY_CHOICES[0][0], 'neighborhood': 'Cocody', 'address': 'Rue 1',
+        'price_per_night': Decimal('50000'),
+    }
+    values.update(extra)
+    return Residence.objects.create(owner=owner, **values)
+
+
+def make_vehicle(owner, **extra):
+    values = {
+        'title': 'Berline test', 'description': 'Berline', 'brand': 'Toyota', 'model': 'Corolla',
+        'year': 2020, 'type': Vehicle.TYPE_CHOICES[0][0], 'transmission': Vehicle.TRANSMISSION_CHOICES[0][0],
+        'fuel_type': Vehicle.FUEL_CHOICES[0][0], 'color': 'Gris', 'plate_number': f'AB-{Vehicle.objects.count()}',
+        'city': Vehicle.CITY_CHOICES[0][0], 'pickup_location': 'Plateau', 'price_per_day': Decimal('30000'),
+    }
+    values.update(extra)
+    return Vehicle.objects.create(owner=owner, **values)
+
+
+def make_booking(client, residence=None, days_from_now=10, nights=3, status='pending', vehicle=None):
+    start = timezone.now().date() + timedelta(days=days_from_now)
+    return Booking.objects.create(
+        client=client, residence=residence, vehicle=vehicle, start_date=start,
+        end_date=start + timedelta(days=nights), subtotal=Decimal('150000'), fees=Decimal('0'), status=status,
+    )
+
+
+class ListingDeletionTests(TestCase):
+    """Un bien réservé n'emporte pas son historique de réservations"""
+
+    def setUp(self):
+        self.owner = make_user('owner', 'proprietaire')
+        self.client_user = make_user('client')
+        self.residence = make_residence(self.owner)
+        self.api = APIClient()
+        self.api.force_authenticate(self.owner)
+
+    def test_booked_residence_is_deactivated(self):
+        make_booking(self.client_user, self.residence)
+
+        response = self.api.delete(f'/api/residences/{self.residence.pk}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.residence.refresh_from_db()
+        self.assertFalse(self.residence.is_active)
+        self.assertEqual(Booking.objects.filter(residence=self.residence).count(), 1)
+        self.assertEqual(check_owner_stats(), [])
+
+    def test_unbooked_residence_is_deleted(self):
+        response = self.api.delete(f'/api/residences/{self.residence.pk}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Residence.objects.filter(pk=self.residence.pk).exists())
+
+
+class OwnerStatsDeletionTests(TestCase):
+    """OwnerStats suit les réservations supprimées sans Booking.delete()"""
+
+    def setUp(self):
+        self.owner = make_user('owner', 'proprietaire')
+        self.client_user = make_user('client')
+        self.residence = make_residence(self.owner)
+
+    def test_booking_delete(self):
+        booking = make_booking(self.client_user, self.residence, status='confirmed')
+        booking.delete()
+
+        self.assertEqual(check_owner_stats(), [])
+        self.assertEqual(owner_booking_stats(self.owner)['total_bookings'], 0)
+
+    def test_queryset_delete(self):
+        make_booking(self.client_user, self.residence)
+        make_booking(self.client_user, self.residence, days_from_now=20, status='confirmed')
+
+        Booking.objects.filter(residence=self.residence).delete()
+
+        self.assertEqual(check_owner_stats(), [])
+        stats = owner_booking_stats(self.owner)
+        self.assertEqual((stats['total_bookings'], stats['pending'], stats['total_revenue']), (0, 0, 0))
+
+    def test_cascade_from_deleted_client(self):
+        make_booking(self.client_user, self.residence)
+        other_client = make_user('other')
+        make_booking(other_client, self.residence, days_from_now=20)
+
+        self.client_user.delete()
+
+        self.assertEqual(check_owner_stats(), [])
+        self.assertEqual(owner_booking_stats(self.owner)['pending'], 1)
+
+
+class PricingRulesCacheTests(TestCase):
+    """Les règles compilées en cache suivent les modifications faites ailleurs"""
+
+    def setUp(self):
+        self.residence = make_residence(make_user('owner', 'proprietaire'))
+        self.start = timezone.now().date() + timedelta(days=30)
+        self.end = self.start + timedelta(days=2)
+        self.rule = PricingRule.objects.create(
+            residence=self.residence, name='Haute saison', kind='season', adjustment_percent=Decimal('50'),
+            start_date=self.start, end_date=self.end,
+        )
+
+    def subtotal(self):
+        return quote_stay(self.residence, self.start, self.end)['subtotal']
+
+    def test_rule_updated_without_save_hooks(self):
+        self.assertEqual(self.subtotal(), Decimal('150000'))
+
+        # Modification par un autre processus : aucune invalidation locale
+        PricingRule.objects.filter(pk=self.rule.pk).update(
+            adjustment_percent=Decimal('-10'), updated_at=timezone.now() + timedelta(seconds=1),
+        )
+
+        self.assertEqual(self.subtotal(), Decimal('90000'))
+
+    def test_rule_deleted(self):
+        self.assertEqual(self.subtotal(), Decimal('150000'))
+
+        PricingRule.objects.filter(pk=self.rule.pk).delete()
+
+        self.assertEqual(self.subtotal(), Decimal('100000'))
+
+
+class QuoteTests(TestCase):
+    def setUp(self):
+        self.residence = make_residence(make_user('owner', 'proprietaire'))
+        self.api = APIClient()
+        self.api.force_authenticate(make_user('client'))
+        self.start = timezone.now().date() + timedelta(days=30)
+
+    def quote(self, **listing):
+        return self.api.post('/api/bookings/quote/', {'items': [{
+            **listing, 'start_date': self.start.isoformat(), 'end_date': (self.start + timedelta(days=2)).isoformat(),
+        }]}, format='json')
+
+    def test_quote(self):
+        response = self.quote(residence=self.residence.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(str(response.data['quotes'][0]['subtotal'])), Decimal('100000'))
+
+    def test_invalid_listing_id_is_rejected(self):
+        for listing in ({'vehicle': 0}, {'residence': 0}, {'vehicle': -3}):
+            with self.subTest(listing=listing):
+                self.assertEqual(self.quote(**listing).status_code, 400)
+
+    def test_unknown_listing(self):
+        response = self.quote(vehicle=999)
+        self.assertEqual(response.data['quotes'], [{'error': 'Bien introuvable'}])
+
+
+class OwnerQueryCountTests(TestCase):
+    """Espace propriétaire : nombre de requêtes indépendant du volume"""
+
+    def setUp(self):
+        self.owner = make_user('owner', 'proprietaire')
+        self.api = APIClient()
+        self.api.force_authenticate(self.owner)
+        client = make_user('client')
+        for index in range(3):
+            residence = make_residence(self.owner)
+            vehicle = make_vehicle(self.owner)
+            make_booking(client, residence, days_from_now=10 + index)
+            make_booking(client, vehicle=vehicle, days_from_now=10 + index, status='confirmed')
+
+    def test_received(self):
+        # Réservations + images principales des véhicules et des résidences
+        with self.assertNumQueries(3):
+            response = self.api.get('/api/bookings/received/')
+        self.assertEqual(len(response.data['results']), 6)
+
+        make_booking(make_user('other'), make_residence(self.owner), days_from_now=40)
+        with self.assertNumQueries(3):
+            response = self.api.get('/api/bookings/received/')
+        self.assertEqual(len(response.data['results']), 7)
+
+    def test_owner_stats(self):
+        with self.assertNumQueries(1):
+            response = self.api.get('/api/bookings/owner_stats/')
+        self.assertEqual(response.data['total_bookings'], 6)
+
+    def test_my_stats(self):
+        for url in ('/api/residences/my_stats/', '/api/vehicles/my_stats/'):
+            with self.subTest(url=url), self.assertNumQueries(1):
+                response = self.api.get(url)
+            self.assertEqual(response.data['total_bookings'], 3)
+
+
+class BookingOverlapTests(TestCase):
+    """check_booking_overlaps : conflits hérités d'avant la contrainte"""
+
+    def setUp(self):
+        # Réservations antérieures aux triggers / à la contrainte d'exclusion
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for statement in SQLITE_DROP_TRIGGERS:
+                    cursor.execute(statement)
+        self.residence = make_residence(make_user('owner', 'proprietaire'))
+        client = make_user('client')
+        self.pending = make_booking(client, self.residence, days_from_now=10)
+        self.paid = make_booking(client, self.residence, days_from_now=11, status='paid')
+        self.validating = make_booking(client, self.residence, days_from_now=12, status='pending_payment_validation')
+        self.later = make_booking(client, self.residence, days_from_now=14)
+
+    def test_cancel_conflicts_keeps_most_advanced_booking(self):
+        self.assertEqual(
+            list(overlapping_bookings(Booking, Booking.BLOCKING_STATUSES)), [self.paid, self.validating, self.later],
+        )
+
+        call_command('check_booking_overlaps', cancel_conflicts=True, stdout=StringIO())
+
+        statuses = dict(Booking.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {
+            self.pending.pk: 'cancelled', self.paid.pk: 'paid',
+            self.validating.pk: 'cancelled', self.later.pk: 'pending',
+        })
+        self.assertFalse(overlapping_bookings(Booking, Booking.BLOCKING_STATUSES).exists())
+        self.assertEqual(check_owner_stats(), [])
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Des réservations simultanées des mêmes dates : une seule passe"""
+
+    clients = 4
+
+    def setUp(self):
+        self.residence = make_residence(make_user('owner', 'proprietaire'))
+        self.users = [make_user(f'client{index}') for index in range(self.clients)]
+        self.start = timezone.now().date() + timedelta(days=30)
+
+    def post_booking(self, user, barrier, statuses):
+        api = APIClient()
+        api.force_authenticate(user)
+        barrier.wait()
+        try:
+            response = api.post('/api/bookings/', {
+                'residence': self.residence.pk,
+                'start_date': self.start.isoformat(),
+                'end_date': (self.start + timedelta(days=3)).isoformat(),
+            }, format='json')
+            statuses.append(response.status_code)
+        finally:
+            connection.close()
+
+    def test_parallel_bookings_of_same_dates(self):
+        barrier = threading.Barrier(self.clients)
+        statuses = []
+        threads = [
+            threading.Thread(target=self.post_booking, args=(user, barrier, statuses))
+            for user in self.users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(statuses), [201] + [400] * (self.clients - 1))
+        self.assertEqual(Booking.objects.filter(residence=self.residence).count(), 1)
@@ -0,0 +1,69 @@
+# apps/bookings/triggers.py
+"""
+Équivalent SQLite de la contrainte d'exclusion PostgreSQL
+`bookings_booking_no_overlap` (migration 0005).
+
+SQLite reconstruit la table à chaque AddConstraint/AlterField, ce qui supprime
+les triggers : ils sont donc (ré)installés après chaque `migrate`
+(signal post_migrate, voir BookingsConfig.ready), supprimés puis recréés pour
+suivre les changements de BLOCKING_STATUSES.
+"""
+
+BLOCKING_STATUSES = "('pending', 'pending_payment_validation', 'confirmed', 'paid', 'ongoing')"
+
+_OVERLAP_CHECK = f"""
+    SELECT RAISE(ABORT, 'bookings_booking_no_overlap')
+    WHERE EXISTS (
+        SELECT 1 FROM bookings_booking b
+        WHERE b.content_type_id = NEW.content_type_id
+          AND b.object_id = NEW.object_id
+          AND b.id != NEW.id
+          AND b.status IN {BLOCKING_STATUSES}
+          AND b.start_date < NEW.end_date
+          AND b.end_date > NEW.start_date
+    );
+"""
+
+# À la mise à jour, seules les transitions vers une période bloquante sont
+# vérifiées, pour ne pas figer les chevauchements historiques.
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS bookings_booking_no_overlap_insert
+    BEFORE INSERT ON bookings_booking
+    WHEN NEW.status IN {BLOCKING_STATUSES}
+    BEGIN {_OVERLAP_CHECK} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS bookings_booking_no_overlap_update
+    BEFORE UPDATE OF status, start_date, end_date, content_type_id, object_id ON bookings_booking
+    WHEN NEW.status IN {BLOCKING_STATUSES} AND (
+        OLD.status NOT IN {BLOCKING_STATUSES}
+        OR NEW.start_date != OLD.start_date
+        OR NEW.end_date != OLD.end_date
+        OR NEW.content_type_id != OLD.content_type_id
+        OR NEW.object_id != OLD.object_id
+    )
+    BEGIN {_OVERLAP_CHECK} END
+    """,
+]
+
+SQLITE_DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS bookings_booking_no_overlap_insert",
+    "DROP TRIGGER IF EXISTS bookings_booking_no_overlap_update",
+]
+
+
+def install_overlap_triggers(using='default', **kwargs):
+    """Handler post_migrate : installe les triggers sur SQLite"""
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+
+    if 'bookings_booking' not in connection.introspection.table_names():
+        return
+
+    with connection.cursor() as cursor:
+        for statement in SQLITE_DROP_TRIGGERS + SQLITE_TRIGGERS:
+            cursor.execute(statement)
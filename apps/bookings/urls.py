@@ -1,5 +1,5 @@
 from rest_framework.routers import DefaultRouter
-from .views import BookingViewSet, BookingReviewViewSet, FavoriteViewSet
+from .views import BookingViewSet, BookingReviewViewSet, FavoriteViewSet, PricingRuleViewSet
 
 router = DefaultRouter()
 
@@ -7,5 +7,6 @@ router = DefaultRouter()
 router.register("bookings", BookingViewSet, basename="booking")
 router.register("reviews", BookingReviewViewSet, basename="review")
 router.register("favorites", FavoriteViewSet, basename="favorite")
+router.register("pricing-rules", PricingRuleViewSet, basename="pricing-rule")
 
 urlpatterns = router.urls
\ No newline at end of file
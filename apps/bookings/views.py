@@ -5,13 +5,21 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Sum
-from django.contrib.contenttypes.models import ContentType
-from django.db import models as django_models
-from decimal import Decimal
+from django.db.models import Prefetch, Q
+from datetime import date
 
-from .models import Booking, BookingReview, Favorite
-from .serializers import BookingSerializer, BookingReviewSerializer, FavoriteSerializer
+from .models import Booking, BookingReview, Favorite, PricingRule
+from apps.core.pagination import KeysetPagination
+
+from .pagination import ReceivedBookingPagination
+from .serializers import (
+    BookingSerializer,
+    BookingReviewSerializer,
+    FavoriteSerializer,
+    PricingRuleSerializer,
+    QuoteRequestSerializer,
+    ReceivedBookingSerializer,
+)
 
 
 class BookingViewSet(viewsets.ModelViewSet):
@@ -96,9 +104,10 @@ class BookingViewSet(viewsets.ModelViewSet):
     def received(self, request):
         """
         Réservations REÇUES par le propriétaire
-        GET /api/bookings/received/
+        GET /api/bookings/received/?status=pending,confirmed&start_date=...&end_date=...&cursor=...
         
-        ✅ CORRIGÉ pour GenericForeignKey
+        Pagination par curseur sur (created_at, id). Les filtres de dates
+        retiennent les séjours qui chevauchent la période demandée.
         """
         if not request.user.is_authenticated:
             return Response(
@@ -106,31 +115,78 @@ class BookingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        # Import des modèles
-        from apps.vehicles.models import Vehicle
-        from apps.residences.models import Residence
+        from apps.vehicles.models import VehicleImage
+        from apps.residences.models import ResidenceImage
         
-        # Récupérer les ContentTypes
-        vehicle_ct = ContentType.objects.get_for_model(Vehicle)
-        residence_ct = ContentType.objects.get_for_model(Residence)
+        # Réservations pour MES véhicules ou MES résidences
+        # (index listing_owner / status / created_at)
+        bookings = Booking.objects.filter(listing_owner=request.user)
         
-        # IDs de mes véhicules et résidences
-        my_vehicle_ids = list(Vehicle.objects.filter(owner=request.user).values_list('id', flat=True))
-        my_residence_ids = list(Residence.objects.filter(owner=request.user).values_list('id', flat=True))
+        statuses = request.query_params.get('status')
+        if statuses:
+            bookings = bookings.filter(status__in=statuses.split(','))
         
-        # Réservations pour MES véhicules ou MES résidences
-        bookings = Booking.objects.filter(
-            django_models.Q(
-                content_type=vehicle_ct,
-                object_id__in=my_vehicle_ids
-            ) | django_models.Q(
-                content_type=residence_ct,
-                object_id__in=my_residence_ids
+        try:
+            if request.query_params.get('start_date'):
+                bookings = bookings.filter(end_date__gt=date.fromisoformat(request.query_params['start_date']))
+            if request.query_params.get('end_date'):
+                bookings = bookings.filter(start_date__lt=date.fromisoformat(request.query_params['end_date']))
+        except ValueError:
+            return Response(
+                {"error": "Format de date invalide (AAAA-MM-JJ attendu)"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        ).select_related('client', 'content_type').prefetch_related('content_object').order_by('-created_at')
         
-        serializer = self.get_serializer(bookings, many=True)
-        return Response(serializer.data)
+        # Résumé du bien : jointure + une requête d'images par type de bien
+        bookings = bookings.select_related('client', 'vehicle', 'residence').prefetch_related(
+            Prefetch(
+                'vehicle__images',
+                queryset=VehicleImage.objects.filter(is_primary=True),
+                to_attr='primary_images',
+            ),
+            Prefetch(
+                'residence__images',
+                queryset=ResidenceImage.objects.filter(is_primary=True),
+                to_attr='primary_images',
+            ),
+        )
+        
+        paginator = ReceivedBookingPagination()
+        page = paginator.paginate_queryset(bookings, request, view=self)
+        serializer = ReceivedBookingSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+    
+    @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny])
+    def quote(self, request):
+        """
+        Devis détaillés pour plusieurs séjours en un appel
+        POST /api/bookings/quote/
+        Body: {"items": [{"residence": 1, "start_date": "...", "end_date": "..."}, ...]}
+        """
+        from .pricing import load_listings, quote_stays, sign_quote
+        
+        serializer = QuoteRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['items']
+        
+        listings = load_listings(items)
+        
+        stays, positions, quotes = [], [], [None] * len(items)
+        for index, item in enumerate(items):
+            listing_type = 'vehicle' if 'vehicle' in item else 'residence'
+            obj = listings.get((listing_type, item[listing_type]))
+            if obj is None:
+                quotes[index] = {"error": "Bien introuvable"}
+                continue
+            stays.append((obj, item['start_date'], item['end_date']))
+            positions.append(index)
+        
+        for index, quote in zip(positions, quote_stays(stays)):
+            # Jeton signé réutilisable par POST /api/bookings/ (champ quote_token)
+            quote["quote_token"] = sign_quote(quote)
+            quotes[index] = quote
+        
+        return Response({"quotes": quotes})
     
     @action(detail=True, methods=['post'])
     def accept(self, request, pk=None):
@@ -212,8 +268,6 @@ class BookingViewSet(viewsets.ModelViewSet):
         """
         Statistiques des réservations pour le propriétaire
         GET /api/bookings/owner_stats/
-        
-        ✅ CORRIGÉ pour GenericForeignKey
         """
         if not request.user.is_authenticated:
             return Response(
@@ -221,41 +275,8 @@ class BookingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        from apps.vehicles.models import Vehicle
-        from apps.residences.models import Residence
-        
-        # ContentTypes
-        vehicle_ct = ContentType.objects.get_for_model(Vehicle)
-        residence_ct = ContentType.objects.get_for_model(Residence)
-        
-        # IDs de mes biens
-        my_vehicle_ids = list(Vehicle.objects.filter(owner=request.user).values_list('id', flat=True))
-        my_residence_ids = list(Residence.objects.filter(owner=request.user).values_list('id', flat=True))
-        
-        # Toutes mes réservations
-        bookings = Booking.objects.filter(
-            django_models.Q(
-                content_type=vehicle_ct,
-                object_id__in=my_vehicle_ids
-            ) | django_models.Q(
-                content_type=residence_ct,
-                object_id__in=my_residence_ids
-            )
-        )
-        
-        stats = {
-            "total_bookings": bookings.count(),
-            "pending": bookings.filter(status='pending').count(),
-            "confirmed": bookings.filter(status='confirmed').count(),
-            "completed": bookings.filter(status='completed').count(),
-            "cancelled": bookings.filter(status='cancelled').count(),
-            "rejected": bookings.filter(status='rejected').count(),
-            "total_revenue": float(bookings.filter(
-                status__in=['confirmed', 'completed']
-            ).aggregate(
-                total=Sum('total_price')
-            )['total'] or Decimal('0')),
-        }
+        from .stats import owner_booking_stats
+        stats = owner_booking_stats(request.user)
         
         return Response(stats)
 
@@ -273,9 +294,34 @@ class BookingReviewViewSet(viewsets.ModelViewSet):
 class FavoriteViewSet(viewsets.ModelViewSet):
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Favorite.objects.filter(user=self.request.user)
 
     def get_serializer_context(self):
-        return {"request": self.request}
\ No newline at end of file
+        return {"request": self.request}
+
+
+class PricingRuleViewSet(viewsets.ModelViewSet):
+    """
+    Règles tarifaires des biens du propriétaire connecté
+    /api/pricing-rules/?residence=<id> ou ?vehicle=<id>
+    """
+    serializer_class = PricingRuleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = PricingRule.objects.filter(
+            Q(vehicle__owner=user) | Q(residence__owner=user)
+        )
+        for field in ('vehicle', 'residence'):
+            listing_id = self.request.query_params.get(field)
+            if listing_id and listing_id.isdigit():
+                queryset = queryset.filter(**{f'{field}_id': listing_id})
+        return queryset
+
+    def get_serializer_context(self):
+        return {"request": self.request}
+
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = 'apps.core'
+
+    def ready(self):
+        from django.core.checks import register
+        from .checks import check_shared_caches
+        register(check_shared_caches, 'caches', deploy=True)
@@ -0,0 +1,315 @@
+# apps/core/benchmarks.py
+"""
+Mesures de performance reproductibles : `manage.py benchmark [nom ...]`.
+
+Chaque mesure crée son jeu de données synthétique (graine --seed) dans une
+transaction annulée à la fin : la base n'est pas modifiée, mais l'écriture
+de centaines de milliers de lignes la verrouille pendant la mesure. À lancer
+sur une copie de la base, jamais en production.
+"""
+
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+
+# nom -> fonction (options, write) ; voir @benchmark
+BENCHMARKS = {}
+
+# Photos de la mesure `uploads` : capteur 12 Mpx de téléphone
+UPLOAD_PHOTO_SIZE = (4032, 3024)
+
+
+def benchmark(name):
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+def measure(function, repeat):
+    """Durées (ms) de `repeat` appels et nombre de requêtes SQL du dernier"""
+    durations = []
+    for _ in range(repeat):
+        # l'amorçage des données a rempli le journal des requêtes (borné)
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            function()
+            durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return {
+        'median_ms': round(statistics.median(durations), 1),
+        'p95_ms': round(durations[round(0.95 * (len(durations) - 1))], 1),
+        'queries': len(queries),
+    }
+
+
+def format_result(result):
+    return f"médiane {result['median_ms']} ms, p95 {result['p95_ms']} ms, {result['queries']} requête(s)"
+
+
+def timed(function):
+    """(résultat, durée en secondes)"""
+    start = time.perf_counter()
+    value = function()
+    return value, time.perf_counter() - start
+
+
+# --- Données synthétiques ---
+
+def seed_user(user_type='client'):
+    suffix = uuid.uuid4().hex[:12]
+    return get_user_model().objects.create_user(
+        username=f'bench-{suffix}', email=f'bench-{suffix}@example.com', password=None, user_type=user_type,
+    )
+
+
+def seed_residences(owner, count, rng, batch_size=2000):
+    from apps.residences.models import Residence
+    from .facets import RESIDENCE_FACETS
+
+    types = [value for value, label in Residence.TYPE_CHOICES]
+    cities = [value for value, label in Residence.CITY_CHOICES]
+
+    residences = []
+    for index in range(count):
+        residence = Residence(
+            owner=owner, title=f'Résidence {index}', description='Benchmark', type=rng.choice(types),
+            city=rng.choice(cities), neighborhood='Benchmark', address='Benchmark',
+            price_per_night=Decimal(rng.randrange(10000, 200000, 1000)),
+            **{field: rng.random() < 0.4 for field in RESIDENCE_FACETS.boolean_fields},
+        )
+        # bulk_create n'appelle pas save() : masque des équipements calculé ici
+        residence.amenities = residence.get_amenities_mask()
+        residences.append(residence)
+    return residences and Residence.objects.bulk_create(residences, batch_size=batch_size)
+
+
+def seed_bookings(residences, per_listing, client, rng, days=330, batch_size=5000):
+    """
+    `per_listing` réservations par résidence, sans chevauchement, sur les
+    `days` prochains jours ; statuts tirés parmi tous les statuts.
+    """
+    from apps.bookings.models import Booking
+    from apps.residences.models import Residence
+
+    content_type = ContentType.objects.get_for_model(Residence)
+    statuses = [value for value, label in Booking.STATUS_CHOICES]
+    today = timezone.now().date()
+    span = max(1, days // max(per_listing, 1))
+
+    batch, created = [], 0
+    for residence in residences:
+        for slot in range(per_listing):
+            nights = rng.randint(1, max(1, span - 1))
+            start = today + timedelta(days=slot * span + rng.randint(0, span - nights))
+            subtotal = residence.price_per_night * nights
+            batch.append(Booking(
+                booking_number=f'BENCH-{uuid.uuid4().hex[:12].upper()}', client=client,
+                residence=residence, content_type=content_type, object_id=residence.pk,
+                listing_owner_id=residence.owner_id, start_date=start, end_date=start + timedelta(days=nights),
+                duration=nights, subtotal=subtotal, fees=Decimal('0'), total_price=subtotal,
+                status=rng.choice(statuses),
+            ))
+            if len(batch) >= batch_size:
+                Booking.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+    if batch:
+        Booking.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def list_view(viewset, path, params):
+    """Vue de liste prête à l'emploi (hors dispatch, donc sans le cache des réponses)"""
+    view = viewset(action='list', action_map={'get': 'list'}, format_kwarg=None, args=(), kwargs={})
+    view.request = view.initialize_request(APIRequestFactory().get(path, params))
+    return view
+
+
+def list_view_call(viewset, path, params):
+    """Appel de list() : queryset filtré de la vue, première page et sérialisation"""
+    view = list_view(viewset, path, params)
+    queryset = view.filter_queryset(view.get_queryset())
+    page = view.paginate_queryset(queryset)
+    return view.get_serializer(page, many=True).data
+
+
+# --- Mesures ---
+
+@benchmark('availability')
+def availability_benchmark(options, write):
+    """Liste des résidences filtrée par période (?start_date=&end_date=)"""
+    from apps.residences.views import ResidenceViewSet
+
+    rng = random.Random(options['seed'])
+    listings = options['listings'] or 10_000
+    per_listing = max(1, (options['bookings'] or 500_000) // listings)
+
+    owner = seed_user('proprietaire')
+    residences, seconds = timed(lambda: seed_residences(owner, listings, rng))
+    bookings, booking_seconds = timed(lambda: seed_bookings(residences, per_listing, seed_user(), rng))
+    write(f"Données : {listings} résidences, {bookings} réservations ({seconds + booking_seconds:.0f} s)")
+
+    today = timezone.now().date()
+
+    def period_list():
+        start = today + timedelta(days=rng.randrange(300))
+        return list_view_call(ResidenceViewSet, '/api/residences/', {
+            'start_date': start.isoformat(), 'end_date': (start + timedelta(days=3)).isoformat(),
+        })
+
+    write(f"Liste par période : {format_result(measure(period_list, options['repeat']))}")
+
+
+@benchmark('facets')
+def facets_benchmark(options, write):
+    """Liste des résidences avec comptes par facette (?facets=1)"""
+    from apps.residences.views import ResidenceViewSet
+    from .facets import RESIDENCE_FACETS, faceted_list
+
+    rng = random.Random(options['seed'])
+    listings = options['listings'] or 100_000
+
+    residences, seconds = timed(lambda: seed_residences(seed_user('proprietaire'), listings, rng))
+    write(f"Données : {len(residences)} résidences ({seconds:.0f} s)")
+
+    cities = [value for value, label in RESIDENCE_FACETS.model.CITY_CHOICES]
+    cases = [
+        ("Sans filtre, hors cache", {'facets': '1'}, RESIDENCE_FACETS.invalidate),
+        ("Sans filtre, en cache", {'facets': '1'}, lambda: None),
+        ("Ville + piscine", {'facets': '1', 'city': ','.join(cities[:2]), 'has_pool': '1'}, lambda: None),
+    ]
+    RESIDENCE_FACETS.invalidate()
+    for label, params, before in cases:
+        def faceted():
+            before()
+            return faceted_list(list_view(ResidenceViewSet, '/api/residences/', params), RESIDENCE_FACETS).data
+        write(f"{label} : {format_result(measure(faceted, options['repeat']))}")
+    RESIDENCE_FACETS.invalidate()
+
+
+@benchmark('quotes')
+def quotes_benchmark(options, write):
+    """Devis de séjours (apps.bookings.pricing.quote_stays), en séjours par seconde"""
+    from apps.bookings.models import PricingRule
+    from apps.bookings.pricing import quote_stays
+    from apps.residences.models import Availability
+
+    rng = random.Random(options['seed'])
+    listings = options['listings'] or 1_000
+    today = timezone.now().date()
+
+    residences = seed_residences(seed_user('proprietaire'), listings, rng)
+    rules, availabilities = [], []
+    for residence in residences:
+        season = today + timedelta(days=rng.randrange(200))
+        rules += [
+            PricingRule(residence=residence, name='Haute saison', kind='season', adjustment_percent=Decimal('20'),
+                        start_date=season, end_date=season + timedelta(days=30)),
+            PricingRule(residence=residence, name='Semaine', kind='long_stay', adjustment_percent=Decimal('-10'),
+                        min_nights=7),
+        ]
+        availabilities += [
+            Availability(residence=residence, date=today + timedelta(days=day),
+                         custom_price=residence.price_per_night * 2)
+            for day in rng.sample(range(300), 10)
+        ]
+    PricingRule.objects.bulk_create(rules)
+    Availability.objects.bulk_create(availabilities, batch_size=5000)
+    write(f"Données : {listings} résidences, {len(rules)} règles, {len(availabilities)} prix personnalisés")
+
+    def random_stay():
+        start = today + timedelta(days=rng.randrange(300))
+        return (rng.choice(residences), start, start + timedelta(days=rng.randint(1, 14)))
+
+    # Lots de la taille maximale de l'endpoint de devis, puis séjour isolé
+    # (création de réservation) ; règles compilées déjà en cache
+    for size in (100, 1):
+        quote_stays([random_stay() for _ in range(size)])
+        result = measure(lambda: quote_stays([random_stay() for _ in range(size)]), options['repeat'])
+        rate = round(size * 1000 / result['median_ms'])
+        write(f"Lots de {size} séjour(s) : {format_result(result)} soit {rate} séjours/s")
+
+
+def photo(index, size, rng):
+    """JPEG d'appareil photo : contenu propre à `index`, EXIF avec orientation et GPS"""
+    from io import BytesIO
+    from PIL import ExifTags, Image, ImageDraw
+
+    image = Image.effect_mandelbrot(size, (-2.2, -1.2, 1.0, 1.2), 64).convert('RGB')
+    ImageDraw.Draw(image).rectangle((0, 0, size[0] // 4, size[1] // 4), fill=(index * 20 % 256, rng.randrange(256), 90))
+
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = 'Benchmark'
+    exif[ExifTags.Base.Orientation] = 6
+    exif[ExifTags.IFD.GPSInfo] = {ExifTags.GPS.GPSLatitudeRef: 'N', ExifTags.GPS.GPSLatitude: (5.0, 19.0, 0.0)}
+
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=92, exif=exif)
+    return buffer.getvalue()
+
+
+@benchmark('uploads')
+def uploads_benchmark(options, write):
+    """Création d'une résidence avec 10 photos (POST /api/residences/), puis rendu par le worker"""
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from .images import processing_pool, render_image
+
+    rng = random.Random(options['seed'])
+    photos = [photo(index, UPLOAD_PHOTO_SIZE, rng) for index in range(10)]
+    write(f"Données : {len(photos)} photos {UPLOAD_PHOTO_SIZE[0]}x{UPLOAD_PHOTO_SIZE[1]}, {sum(map(len, photos)) // 1024} Ko au total")
+
+    # Fichiers écrits dans un MEDIA_ROOT temporaire, supprimé à la fin
+    media_root = tempfile.mkdtemp()
+    try:
+        with override_settings(MEDIA_ROOT=media_root):
+            client = APIClient()
+            client.force_authenticate(seed_user('proprietaire'))
+            created = []
+
+            def upload():
+                response = client.post('/api/residences/', {
+                    'title': 'Benchmark', 'description': 'Benchmark', 'type': 'villa', 'city': 'abidjan',
+                    'neighborhood': 'Benchmark', 'address': 'Benchmark', 'price_per_night': '50000',
+                    'uploaded_images': [
+                        SimpleUploadedFile(f'photo-{index}.jpg', content, content_type='image/jpeg')
+                        for index, content in enumerate(photos)
+                    ],
+                }, format='multipart')
+                if response.status_code != 201:
+                    raise CommandError(f"Envoi refusé ({response.status_code}) : {response.content[:200]}")
+                created.append(response.data['id'])
+
+            write(f"Envoi : {format_result(measure(upload, options['repeat']))}")
+
+            from apps.residences.models import ResidenceImage
+            names = list(ResidenceImage.objects.filter(residence_id=created[-1]).values_list('image', flat=True))
+            executor = processing_pool()
+            try:
+                results, seconds = timed(lambda: list(
+                    executor.map(render_image, names) if executor else map(render_image, names)
+                ))
+            finally:
+                if executor:
+                    executor.shutdown()
+            errors = [variants['error'] for normalized, variants in results if 'error' in variants]
+            write(f"Rendu des déclinaisons (worker) : {seconds * 1000:.0f} ms"
+                  + (f", erreurs : {errors}" if errors else ""))
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
@@ -0,0 +1,27 @@
+# apps/core/checks.py
+
+from django.conf import settings
+from django.core.checks import Warning
+
+
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Caches invalidés explicitement (calendriers, statistiques, facettes,
+    réponses) : un backend locmem n'est invalidé que dans le processus courant.
+    """
+    if settings.DEBUG:
+        return []
+
+    local = [
+        alias for alias, config in settings.CACHES.items()
+        if config.get('BACKEND', '').endswith('LocMemCache')
+    ]
+    if not local:
+        return []
+
+    return [Warning(
+        f"Cache(s) {', '.join(local)} en mémoire locale : les invalidations ne "
+        "touchent que le worker qui les déclenche.",
+        hint="Définir CACHE_BACKEND=file ou CACHE_BACKEND=redis en production.",
+        id='core.W001',
+    )]
@@ -0,0 +1,165 @@
+# apps/core/conditional.py
+"""
+GET conditionnels (ETag / Last-Modified, réponses 304) des lectures publiques.
+
+Validateurs :
+
+- liste : max(updated_at) et nombre de lignes du queryset filtré, en un
+  aggregate() ; ETag seulement (une suppression ne change pas le max) ;
+- détail : updated_at de l'objet et des objets imbriqués dans la réponse
+  (detail_related_last_modified, ex. le profil public du propriétaire) ;
+  ETag et Last-Modified.
+
+Ils sont calculés avant toute sérialisation et, si la requête correspond
+(If-None-Match / If-Modified-Since), la vue répond 304 sans exécuter le
+handler (ni cache de réponses, ni sérialiseur). Exception : sans ces
+en-têtes, un handler mis en cache (cache_response) relit les validateurs
+stockés avec la réponse ; un HIT ne coûte alors aucune requête.
+Les en-têtes Cache-Control sont réglés par vue (cache_control,
+detail_cache_control).
+"""
+
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .response_cache import PRIVATE_PARAMS
+
+
+_UNSET = object()
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Mixin de vue DRF : validateurs calculés dans initial(), 304 anticipé.
+
+    Les sous-ressources (images, types de billets) mettent à jour le
+    updated_at de leur parent pour que le détail change d'ETag.
+    """
+
+    last_modified_field = 'updated_at'
+    # Dates de modification des objets imbriqués dans le détail
+    detail_related_last_modified = ()
+    # Liste (et détail, sauf detail_cache_control)
+    cache_control = {'public': True, 'max_age': 0, 'must_revalidate': True}
+    detail_cache_control = None
+
+    def _conditional_kind(self):
+        if self.request.method not in ('GET', 'HEAD'):
+            return None
+        if any(self.request.query_params.get(name) == value for name, value in PRIVATE_PARAMS.items()):
+            return None
+
+        action = getattr(self, 'action', None)
+        if action is not None:
+            return {'list': 'list', 'retrieve': 'detail'}.get(action)
+        return 'detail' if (self.lookup_url_kwarg or self.lookup_field) in self.kwargs else 'list'
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        # ?facets=1 : les comptes portent sur l'ensemble avant filtres à facettes
+        if self.request.query_params.get('facets') in ('1', 'true'):
+            queryset = getattr(self, 'facet_base', queryset)
+        return queryset
+
+    def get_validators(self, kind):
+        """(etag, last_modified) ou None si la ressource n'existe pas"""
+        field = self.last_modified_field
+        media_type = self.request.accepted_media_type or ''
+
+        if kind == 'list':
+            stats = self.get_conditional_queryset().order_by().aggregate(
+                last_modified=Max(field), count=Count('pk'),
+            )
+            last_modified = stats['last_modified']
+            signature = f"{last_modified.isoformat() if last_modified else ''}:{stats['count']}"
+            return quote_etag(hashlib.md5(f"{signature}:{media_type}".encode()).hexdigest()), None
+
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            row = self.get_queryset().filter(
+                **{self.lookup_field: self.kwargs[lookup]}
+            ).values_list(field, *self.detail_related_last_modified).first()
+        except (TypeError, ValueError, ValidationError):
+            # Identifiant mal formé : le handler répond 404
+            return None
+        if row is None or row[0] is None:
+            return None
+        last_modified = max(value for value in row if value is not None)
+        signature = f"{last_modified.isoformat()}:{media_type}"
+        return quote_etag(hashlib.md5(signature.encode()).hexdigest()), last_modified
+
+    def is_response_cached(self):
+        handler = getattr(self, 'list' if self.conditional_kind == 'list' else 'retrieve', None)
+        return getattr(handler, 'response_cache', None) is not None
+
+    def has_conditional_headers(self):
+        meta = self.request.META
+        return 'HTTP_IF_NONE_MATCH' in meta or 'HTTP_IF_MODIFIED_SINCE' in meta
+
+    def get_conditional_validators(self):
+        """Validateurs de la requête, calculés une seule fois (None : pas de validateur)"""
+        if self.conditional_validators is _UNSET:
+            self.conditional_validators = None
+            if self.conditional_kind:
+                self.conditional_validators = self.get_validators(self.conditional_kind)
+        return self.conditional_validators
+
+    def set_cached_validators(self, validators):
+        """Validateurs stockés avec une réponse du cache (s'ils ne sont pas déjà calculés)"""
+        if self.conditional_validators is _UNSET:
+            self.conditional_validators = validators
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        self.conditional_kind = self._conditional_kind()
+        self.conditional_validators = _UNSET
+        if not self.conditional_kind:
+            return
+        # Validateurs relus depuis le cache des réponses (ou calculés sur MISS)
+        if not self.has_conditional_headers() and self.is_response_cached():
+            return
+
+        validators = self.get_conditional_validators()
+        if validators:
+            etag, last_modified = validators
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=int(last_modified.timestamp()) if last_modified else None,
+            )
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        validators = None
+        if getattr(self, 'conditional_kind', None) and response.status_code in (200, 304):
+            validators = self.get_conditional_validators()
+        if validators:
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+
+            cache_control = self.cache_control
+            if self.conditional_kind == 'detail' and self.detail_cache_control is not None:
+                cache_control = self.detail_cache_control
+            patch_cache_control(response, **cache_control)
+
+        return response
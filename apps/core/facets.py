@@ -0,0 +1,155 @@
+# apps/core/facets.py
+"""
+Filtres à facettes des annonces (?city=abidjan,bouake&type=villa&has_pool=1)
+et comptes par facette (?facets=1).
+
+Les comptes sont calculés en agrégats conditionnels (Count(filter=Q(...))),
+sur l'ensemble déjà filtré : une requête pour toutes les facettes, plus une
+par facette à choix filtrée (comptée sans son propre filtre, pour afficher
+les autres choix possibles). Sans aucun filtre, les comptes globaux sont mis
+en cache pendant FACETS_CACHE_TIMEOUT secondes ; les save()/delete() des
+biens invalident ce cache.
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from rest_framework.response import Response
+
+
+FACETS_CACHE_TIMEOUT = getattr(settings, 'FACETS_CACHE_TIMEOUT', 300)
+
+# Paramètres qui ne restreignent pas l'ensemble des résultats
+NEUTRAL_PARAMS = {'facets', 'format', 'cursor', 'page_size', 'ordering', 'fields'}
+
+TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+
+
+class FacetSet:
+    """Facettes d'un modèle : champs à choix (OU) et booléens (ET)"""
+
+    def __init__(self, model_label, choice_fields, boolean_fields):
+        self.model_label = model_label
+        self.choice_fields = choice_fields
+        self.boolean_fields = boolean_fields
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def cache_key(self):
+        return f"facets:{self.model_label}"
+
+    def invalidate(self):
+        cache.delete(self.cache_key)
+
+    def _choices(self, field):
+        return self.model._meta.get_field(field).choices
+
+    def conditions(self, query_params):
+        """{champ: Q} pour chaque facette présente dans la requête"""
+        conditions = {}
+        for field in self.choice_fields:
+            valid = {value for value, label in self._choices(field)}
+            values = [value for value in query_params.get(field, '').split(',') if value in valid]
+            if values:
+                conditions[field] = Q(**{f'{field}__in': values})
+
+        for field in self.boolean_fields:
+            if query_params.get(field, '').lower() in TRUE_VALUES:
+                conditions[field] = Q(**{field: True})
+
+        return conditions
+
+    def filter(self, queryset, query_params):
+        return queryset.filter(*self.conditions(query_params).values())
+
+    def _aggregate(self, queryset, choice_fields, boolean_fields):
+        aggregates, keys = {}, {}
+        for field in choice_fields:
+            for value, label in self._choices(field):
+                alias = f'facet_{len(aggregates)}'
+                aggregates[alias] = Count('pk', filter=Q(**{field: value}))
+                keys[alias] = (field, value, label)
+        for field in boolean_fields:
+            alias = f'facet_{len(aggregates)}'
+            aggregates[alias] = Count('pk', filter=Q(**{field: True}))
+            keys[alias] = ('amenities', field, self.model._meta.get_field(field).verbose_name)
+
+        counts = {}
+        for alias, count in queryset.order_by().aggregate(**aggregates).items():
+            facet, value, label = keys[alias]
+            counts.setdefault(facet, []).append({'value': value, 'label': str(label), 'count': count})
+        return counts
+
+    def counts(self, base, query_params):
+        """
+        Comptes par facette pour la requête.
+
+        Args:
+            base: queryset avant les filtres à facettes (recherche, période… appliqués)
+        """
+        conditions = self.conditions(query_params)
+        unfiltered = not (set(query_params) - NEUTRAL_PARAMS)
+
+        if unfiltered and FACETS_CACHE_TIMEOUT:
+            counts = cache.get(self.cache_key)
+            if counts is not None:
+                return counts
+
+        open_fields = [field for field in self.choice_fields if field not in conditions]
+        counts = self._aggregate(
+            base.filter(*conditions.values()), open_fields, self.boolean_fields
+        )
+
+        # Facette à choix filtrée : comptée avec les autres filtres seulement
+        for field in self.choice_fields:
+            if field in conditions:
+                others = [q for other, q in conditions.items() if other != field]
+                counts.update(self._aggregate(base.filter(*others), [field], []))
+
+        counts = {facet: counts[facet] for facet in [*self.choice_fields, 'amenities'] if facet in counts}
+
+        if unfiltered and FACETS_CACHE_TIMEOUT:
+            cache.set(self.cache_key, counts, FACETS_CACHE_TIMEOUT)
+        return counts
+
+
+RESIDENCE_FACETS = FacetSet(
+    'residences.Residence',
+    ['city', 'type'],
+    [
+        'has_wifi', 'has_ac', 'has_tv', 'has_kitchen', 'has_parking',
+        'has_pool', 'has_security', 'has_generator', 'allow_pets', 'allow_smoking',
+    ],
+)
+
+VEHICLE_FACETS = FacetSet(
+    'vehicles.Vehicle',
+    ['city', 'type', 'transmission', 'fuel_type'],
+    ['driver_available'],
+)
+
+
+def faceted_list(view, facet_set):
+    """
+    Réponse de liste avec les comptes par facette :
+    {"results": [...], "facets": {"city": [{"value", "label", "count"}, ...], ...}}
+    """
+    request = view.request
+    queryset = view.filter_queryset(view.get_queryset())
+    base = getattr(view, 'facet_base', queryset)
+    facets = facet_set.counts(base, request.query_params)
+
+    page = view.paginate_queryset(queryset)
+    if page is not None:
+        response = view.get_paginated_response(view.get_serializer(page, many=True).data)
+        response.data['facets'] = facets
+        return response
+
+    return Response({
+        'results': view.get_serializer(queryset, many=True).data,
+        'facets': facets,
+    })
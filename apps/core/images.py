@@ -0,0 +1,450 @@
+# apps/core/images.py
+"""
+Déclinaisons des images publiées (photos des annonces, affiches
+d'événements, avatars) : largeurs fixes IMAGE_VARIANT_WIDTHS, en WebP et JPEG.
+
+Les déclinaisons sont générées hors requête par le worker
+`manage.py process_image_variants --loop`, en parallèle dans un pool de
+processus. Le worker normalise d'abord l'original (orientation EXIF appliquée,
+métadonnées EXIF/GPS retirées, côté limité à IMAGE_UPLOAD_MAX_DIMENSION,
+réencodage) puis enregistre les déclinaisons dans un JSONField du modèle :
+
+    {"source": "residences/villa.jpg",
+     "webp": {"320": "derived/residences/villa_320.webp", ...},
+     "jpeg": {"320": "derived/residences/villa_320.jpg", ...}}
+
+Les originaux sont publics dès leur enregistrement, avant le passage du
+worker : les métadonnées en sont retirées à l'envoi (strip_metadata, appelé
+par sync_variants et bulk_add_images), sans décodage pour JPEG et PNG. Seule
+l'orientation EXIF est conservée, pour que le worker l'applique.
+
+Un JSON vide signifie « à générer » ; save() le vide quand le fichier source
+change (sync_variants). Les anciens fichiers (original remplacé, dérivés) ne
+sont pas supprimés ici : voir collect_media_garbage (apps.core.storage).
+
+Les photos envoyées avec une annonce sont insérées en un bulk_create
+(bulk_add_images) ; la requête ne fait que les vérifier.
+"""
+
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Max
+from django.db.models.signals import post_save
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError
+
+
+VARIANT_WIDTHS = tuple(getattr(settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 1280)))
+
+# format -> (format Pillow, extension, options d'encodage)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+DERIVED_DIR = 'derived'
+
+# Fond des déclinaisons sans transparence (JPEG) pour les images avec alpha
+JPEG_BACKGROUND = (255, 255, 255)
+
+MAX_DIMENSION = getattr(settings, 'IMAGE_UPLOAD_MAX_DIMENSION', 2560)
+PROCESSING_WORKERS = getattr(settings, 'IMAGE_PROCESSING_WORKERS', os.cpu_count() or 1)
+
+JPEG_SIGNATURE = b'\xff\xd8'
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Segments JPEG conservés : JFIF (APP0), profil ICC (APP2), Adobe (APP14) ;
+# les autres APPn (EXIF, XMP, IPTC, MPF…) et les commentaires sont retirés
+JPEG_KEPT_SEGMENTS = {0xE0, 0xE2, 0xEE}
+ICC_PROFILE_PREFIX = b'ICC_PROFILE\x00'
+
+# Chunks PNG retirés : EXIF, textes (dont XMP), date de modification
+PNG_METADATA_CHUNKS = {b'eXIf', b'tEXt', b'zTXt', b'iTXt', b'tIME'}
+
+# (modèle, champ image, champ des déclinaisons)
+IMAGE_SOURCES = [
+    ('residences.ResidenceImage', 'image', 'variants'),
+    ('vehicles.VehicleImage', 'image', 'variants'),
+    ('events.Event', 'image', 'image_variants'),
+    ('accounts.User', 'avatar', 'avatar_variants'),
+]
+
+
+def sync_variants(instance, field_name, variants_field='variants'):
+    """
+    À appeler dans save() : retire les métadonnées d'un fichier envoyé pas
+    encore enregistré, oublie les déclinaisons d'un ancien fichier source
+    """
+    source = getattr(instance, field_name)
+    if source and not source._committed:
+        stripped = strip_metadata(source.file)
+        if stripped is not source.file:
+            setattr(instance, field_name, stripped)
+            source = getattr(instance, field_name)
+
+    variants = getattr(instance, variants_field)
+    if variants and variants.get('source') != (source.name if source else ''):
+        setattr(instance, variants_field, {})
+
+
+def variant_path(name, width, extension):
+    stem = name.rsplit('.', 1)[0]
+    return f"{DERIVED_DIR}/{stem}_{width}.{extension}"
+
+
+def _variant_widths(original_width):
+    """Largeurs à produire, sans agrandir (au moins une : la largeur d'origine)"""
+    widths = [width for width in VARIANT_WIDTHS if width < original_width]
+    if len(widths) < len(VARIANT_WIDTHS):
+        widths.append(min(original_width, VARIANT_WIDTHS[-1]))
+    return widths
+
+
+def _needs_normalizing(image):
+    """Original à réencoder : métadonnées, orientation, taille ou format"""
+    return bool(
+        image.getexif()
+        or 'xmp' in image.info
+        or max(image.size) > MAX_DIMENSION
+        or image.format not in ('JPEG', 'PNG')
+    )
+
+
+def _encode(image, has_alpha):
+    """(contenu, extension) : PNG avec transparence, JPEG sinon, sans métadonnées"""
+    buffer = BytesIO()
+    if has_alpha:
+        image.save(buffer, 'PNG', optimize=True)
+        return buffer.getvalue(), 'png'
+    image.save(buffer, 'JPEG', quality=85, progressive=True)
+    return buffer.getvalue(), 'jpg'
+
+
+def _normalize(name, image, has_alpha, storage):
+    """Enregistre l'original normalisé (sans métadonnées) et renvoie son nom"""
+    image = image.copy()
+    image.thumbnail((MAX_DIMENSION, MAX_DIMENSION), Image.LANCZOS)
+
+    content, extension = _encode(image, has_alpha)
+    stem = name.rsplit('.', 1)[0]
+    return storage.save(f"{stem}.{extension}", ContentFile(content))
+
+
+def _orientation_exif(orientation):
+    """Bloc EXIF (b'Exif\\0\\0' + TIFF) réduit à l'orientation, vide si l'image est droite"""
+    if orientation in (None, 1):
+        return b''
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = orientation
+    return exif.tobytes()
+
+
+def _strip_jpeg(data, exif):
+    """
+    JPEG sans ses segments de métadonnées, données compressées recopiées
+    telles quelles. Tout ce qui suit la fin d'image (EOI) est abandonné :
+    images secondaires MPF des téléphones, avec leur propre EXIF.
+    """
+    output = [data[:2]]
+    position = 2
+    while True:
+        if position + 2 > len(data) or data[position] != 0xFF:
+            raise ValueError("JPEG invalide ou tronqué")
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker == 0xD9:
+            output.append(b'\xff\xd9')
+            return b''.join(output)
+        if position + 4 > len(data):
+            raise ValueError("JPEG tronqué")
+
+        # Orientation réinsérée après l'en-tête JFIF éventuel
+        if exif and marker != 0xE0:
+            output.append(b'\xff\xe1' + (len(exif) + 2).to_bytes(2, 'big') + exif)
+            exif = b''
+
+        end = position + 2 + int.from_bytes(data[position + 2:position + 4], 'big')
+        if end > len(data):
+            raise ValueError("JPEG tronqué")
+        is_metadata = marker == 0xFE or (0xE0 <= marker <= 0xEF and (
+            marker not in JPEG_KEPT_SEGMENTS
+            or (marker == 0xE2 and not data[position + 4:end].startswith(ICC_PROFILE_PREFIX))
+        ))
+        if not is_metadata:
+            output.append(data[position:end])
+        position = end
+
+        if marker == 0xDA:
+            # Données compressées : jusqu'au prochain marqueur (ni octet
+            # d'échappement FF00, ni marqueur de resynchronisation RSTn)
+            scan = position
+            while True:
+                scan = data.find(b'\xff', scan)
+                if scan < 0 or scan + 1 >= len(data):
+                    raise ValueError("JPEG tronqué")
+                following = data[scan + 1]
+                if following == 0x00 or 0xD0 <= following <= 0xD7:
+                    scan += 2
+                elif following == 0xFF:
+                    scan += 1
+                else:
+                    break
+            output.append(data[position:scan])
+            position = scan
+
+
+def _strip_png(data, exif):
+    """PNG sans ses chunks de métadonnées ; l'orientation (eXIf) précède les données"""
+    output = [data[:8]]
+    position = 8
+    while position < len(data):
+        length = int.from_bytes(data[position:position + 4], 'big')
+        kind = data[position + 4:position + 8]
+        end = position + 12 + length
+        if end > len(data):
+            raise ValueError("PNG tronqué")
+
+        if kind == b'IDAT' and exif:
+            chunk = b'eXIf' + exif[6:]
+            output.append(
+                (len(exif) - 6).to_bytes(4, 'big') + chunk + zlib.crc32(chunk).to_bytes(4, 'big')
+            )
+            exif = b''
+        if kind not in PNG_METADATA_CHUNKS:
+            output.append(data[position:end])
+        position = end
+        if kind == b'IEND':
+            break
+    return b''.join(output)
+
+
+def _reencode(data):
+    """(contenu, extension) d'une image décodée puis réencodée, orientation appliquée"""
+    with Image.open(BytesIO(data)) as image:
+        image.load()
+        image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    return _encode(image.convert('RGBA' if has_alpha else 'RGB'), has_alpha)
+
+
+def strip_metadata(file):
+    """
+    Fichier envoyé sans ses métadonnées (EXIF hors orientation, GPS, XMP,
+    IPTC, commentaires), à appliquer avant son premier enregistrement.
+
+    JPEG et PNG sont réécrits sans décodage (segments / chunks retirés,
+    pixels inchangés) ; les autres formats, ou un fichier que le découpage
+    ne sait pas lire, sont décodés et réencodés. Un fichier que Pillow ne
+    sait pas décoder est renvoyé tel quel.
+
+    Returns:
+        `file` s'il n'y avait rien à retirer, sinon un ContentFile
+    """
+    file.seek(0)
+    data = file.read()
+    file.seek(0)
+    name = os.path.basename(file.name)
+
+    try:
+        with Image.open(BytesIO(data)) as image:
+            exif = _orientation_exif(image.getexif().get(ExifTags.Base.Orientation))
+        try:
+            if data.startswith(JPEG_SIGNATURE):
+                stripped = _strip_jpeg(data, exif)
+            elif data.startswith(PNG_SIGNATURE):
+                stripped = _strip_png(data, exif)
+            else:
+                raise ValueError("format réencodé")
+        except ValueError:
+            stripped, extension = _reencode(data)
+            name = f"{name.rsplit('.', 1)[0]}.{extension}"
+    except (OSError, SyntaxError, UnidentifiedImageError, Image.DecompressionBombError):
+        # Illisible : le worker le marquera en erreur
+        return file
+
+    if stripped == data:
+        return file
+    return ContentFile(stripped, name=name)
+
+
+def _flatten(image):
+    """Image RGB : la transparence est posée sur JPEG_BACKGROUND (sinon noire)"""
+    if image.mode != 'RGBA':
+        return image.convert('RGB')
+    background = Image.new('RGBA', image.size, JPEG_BACKGROUND + (255,))
+    return Image.alpha_composite(background, image).convert('RGB')
+
+
+def render_image(name, storage=default_storage):
+    """
+    Normalise l'original `name` si besoin et génère ses déclinaisons.
+    Exécuté dans le pool de processus du worker.
+
+    Returns:
+        tuple: (nom du nouvel original ou None, déclinaisons)
+    """
+    try:
+        with storage.open(name) as source:
+            image = Image.open(source)
+            image.load()
+    except (OSError, SyntaxError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        return None, {'source': name, 'error': (str(exc) or exc.__class__.__name__)[:200]}
+
+    normalize = _needs_normalizing(image)
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    normalized = _normalize(name, image, has_alpha, storage) if normalize else None
+    source_name = normalized or name
+
+    variants = {'source': source_name}
+    for width in _variant_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+        for key, (pil_format, extension, options) in VARIANT_FORMATS.items():
+            frame = _flatten(resized) if pil_format == 'JPEG' and resized.mode != 'RGB' else resized
+
+            buffer = BytesIO()
+            frame.save(buffer, pil_format, **options)
+
+            # Nom adressé par le contenu : un nouveau rendu identique réutilise le fichier existant
+            variants.setdefault(key, {})[str(width)] = storage.save(
+                variant_path(source_name, width, extension), ContentFile(buffer.getvalue())
+            )
+
+    return normalized, variants
+
+
+def smallest_variant(variants, key='webp'):
+    """Chemin de la plus petite déclinaison, ou None si pas encore générée"""
+    sizes = (variants or {}).get(key)
+    if not sizes:
+        return None
+    return sizes[min(sizes, key=int)]
+
+
+def srcset_map(variants, url):
+    """{"webp": "url 320w, url 640w", "jpeg": "..."} (vide si pas encore générées)"""
+    return {
+        key: ', '.join(
+            f"{url(path)} {width}w"
+            for width, path in sorted(variants[key].items(), key=lambda item: int(item[0]))
+        )
+        for key in VARIANT_FORMATS if (variants or {}).get(key)
+    }
+
+
+def pending_variants(model_label, field_name, variants_field):
+    model = apps.get_model(model_label)
+    return model.objects.filter(**{variants_field: {}}).exclude(
+        **{f'{field_name}__isnull': True}
+    ).exclude(**{field_name: ''})
+
+
+def process_pending(batch_size=50, executor=None, stdout=None):
+    """
+    Normalise les originaux et génère les déclinaisons manquantes
+    (au plus batch_size images par modèle).
+
+    Le rendu des images d'un lot est réparti sur `executor` (pool de
+    processus) s'il est fourni. L'enregistrement passe par
+    save(update_fields=...) : les signaux d'invalidation (cache des réponses,
+    dates de modification) suivent. Un fichier illisible est marqué
+    {"source": ..., "error": ...} pour ne pas être repris en boucle.
+
+    Returns:
+        int: nombre d'images traitées
+    """
+    processed = 0
+    for model_label, field_name, variants_field in IMAGE_SOURCES:
+        objects = list(pending_variants(model_label, field_name, variants_field).order_by('pk')[:batch_size])
+        names = [getattr(obj, field_name).name for obj in objects]
+        results = executor.map(render_image, names) if executor else map(render_image, names)
+
+        for obj, name, (normalized, variants) in zip(objects, names, results):
+            if 'error' in variants and stdout:
+                stdout.write(f"{model_label} #{obj.pk} : {variants['error']}")
+
+            # Fichier source remplacé pendant le rendu : reprise au prochain passage
+            current = type(obj).objects.filter(pk=obj.pk).values_list(field_name, flat=True).first()
+            if current != name:
+                continue
+
+            update_fields = [variants_field]
+            if normalized:
+                setattr(obj, field_name, normalized)
+                update_fields.append(field_name)
+            if any(field.name == 'updated_at' for field in obj._meta.fields):
+                update_fields.append('updated_at')
+
+            setattr(obj, variants_field, variants)
+            obj.save(update_fields=update_fields)
+            processed += 1
+
+    return processed
+
+
+def processing_pool(workers=PROCESSING_WORKERS):
+    """Pool de processus du worker (None : rendu dans le processus courant)"""
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+
+def reset_variants(model_labels=None):
+    """Force la régénération (par exemple après un changement de largeurs)"""
+    reset = 0
+    for model_label, field_name, variants_field in IMAGE_SOURCES:
+        if model_labels and model_label not in model_labels:
+            continue
+        reset += apps.get_model(model_label).objects.exclude(**{variants_field: {}}).update(
+            **{variants_field: {}}
+        )
+    return reset
+
+
+def bulk_add_images(images, files, primary_index=None):
+    """
+    Ajoute des photos à une annonce en un bulk_create.
+
+    Args:
+        images: gestionnaire lié des images (residence.images, vehicle.images)
+        files: fichiers envoyés (déjà vérifiés par le sérialiseur), dont les
+            métadonnées sont retirées avant l'enregistrement
+        primary_index: rang de la nouvelle image principale, le cas échéant
+    """
+    if not files:
+        return []
+
+    model, listing = images.model, images.instance
+    files = [strip_metadata(file) for file in files]
+    last_order = images.aggregate(last=Max('order'))['last']
+    start = 0 if last_order is None else last_order + 1
+
+    created = model.objects.bulk_create([
+        model(**{images.field.name: listing}, image=file, order=start + index, is_primary=index == primary_index)
+        for index, file in enumerate(files)
+    ])
+
+    # Une seule image principale : une requête pour retirer le flag des autres
+    if primary_index is not None:
+        images.filter(is_primary=True).exclude(pk=created[primary_index].pk).update(is_primary=False)
+
+    # bulk_create n'appelle ni save() ni post_save : date de modification de
+    # l'annonce (ETag) et invalidation du cache des réponses
+    type(listing).objects.filter(pk=listing.pk).update(updated_at=timezone.now())
+    for image in created:
+        post_save.send(
+            sender=model, instance=image, created=True, update_fields=None, raw=False, using=image._state.db,
+        )
+
+    return created
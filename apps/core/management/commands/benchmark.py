@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.core.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesures de performance sur données synthétiques, dans une transaction "
+        "annulée à la fin (à lancer sur une copie de la base)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help=f"Mesures à lancer (toutes par défaut) : {', '.join(BENCHMARKS)}")
+        parser.add_argument('--listings', type=int, help="Nombre de biens (défaut propre à chaque mesure)")
+        parser.add_argument('--bookings', type=int, help="Nombre de réservations (défaut propre à chaque mesure)")
+        parser.add_argument('--repeat', type=int, default=50, help="Appels mesurés")
+        parser.add_argument('--seed', type=int, default=0, help="Graine des données synthétiques")
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(BENCHMARKS)
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Mesures inconnues : {', '.join(sorted(unknown))}")
+
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name} : {BENCHMARKS[name].__doc__.strip()}"))
+            with transaction.atomic():
+                BENCHMARKS[name](options, self.stdout.write)
+                transaction.set_rollback(True)
@@ -0,0 +1,49 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.storage import (
+    MEDIA_GC_MIN_AGE,
+    ContentAddressedStorage,
+    collect_garbage,
+    rehash_files,
+)
+
+
+def _megabytes(size):
+    return f"{size / 1024 / 1024:.1f} Mo"
+
+
+class Command(BaseCommand):
+    help = "Supprime les fichiers media qui ne sont plus référencés (--rehash : range les anciens fichiers sous leur empreinte)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=float, default=MEDIA_GC_MIN_AGE,
+            help="Âge minimal (heures) d'un fichier non référencé avant suppression",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Affiche sans supprimer")
+        parser.add_argument(
+            '--rehash', action='store_true',
+            help="Renomme d'abord les fichiers enregistrés avant le stockage par empreinte",
+        )
+
+    def handle(self, *args, **options):
+        if options['rehash']:
+            if not isinstance(default_storage, ContentAddressedStorage):
+                raise CommandError("--rehash demande STORAGES['default'] = ContentAddressedStorage")
+            if options['dry_run']:
+                raise CommandError("--rehash ne peut pas être simulé (--dry-run)")
+            updated = rehash_files()
+            self.stdout.write(f"{updated} référence(s) renommée(s) par empreinte")
+
+        stats = collect_garbage(min_age=options['min_age'], dry_run=options['dry_run'])
+
+        verb = "à supprimer" if options['dry_run'] else "supprimé(s)"
+        self.stdout.write(
+            f"{stats.get('kept', 0)} fichier(s) référencé(s) ({_megabytes(stats.get('kept_bytes', 0))}), "
+            f"{_megabytes(stats.get('deduplicated_bytes', 0))} de doublons évités"
+        )
+        self.stdout.write(f"{stats.get('recent', 0)} fichier(s) récent(s) non référencé(s) conservé(s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats.get('deleted', 0)} fichier(s) {verb} ({_megabytes(stats.get('deleted_bytes', 0))})"
+        ))
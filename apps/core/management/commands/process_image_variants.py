@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.images import (
+    IMAGE_SOURCES,
+    PROCESSING_WORKERS,
+    process_pending,
+    processing_pool,
+    reset_variants,
+)
+
+
+class Command(BaseCommand):
+    help = "Normalise les images et génère leurs déclinaisons WebP/JPEG (worker avec --loop)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--workers', type=int, default=PROCESSING_WORKERS,
+            help="Processus de rendu (1 : dans le processus courant)",
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Tourne en continu et traite les nouvelles images",
+        )
+        parser.add_argument('--interval', type=float, default=5, help="Attente entre deux passes (s)")
+        parser.add_argument(
+            '--reset', nargs='*', metavar='MODELE',
+            choices=[label for label, field, variants in IMAGE_SOURCES],
+            help="Régénère toutes les déclinaisons (ou celles des modèles indiqués)",
+        )
+
+    def handle(self, *args, **options):
+        if options['reset'] is not None:
+            reset = reset_variants(options['reset'])
+            self.stdout.write(f"{reset} image(s) à régénérer")
+
+        executor = processing_pool(options['workers'])
+        total = 0
+        try:
+            while True:
+                processed = process_pending(
+                    batch_size=options['batch_size'], executor=executor, stdout=self.stdout,
+                )
+                total += processed
+                if processed:
+                    self.stdout.write(f"{processed} image(s) traitée(s)")
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            if executor:
+                executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f"{total} image(s) traitée(s) au total"))
@@ -0,0 +1,185 @@
+# apps/core/media.py
+"""
+Envoi des fichiers media (MEDIA_URL), en remplacement de
+django.conf.urls.static.
+
+Django ne fait que vérifier les droits et poser les en-têtes ; selon
+MEDIA_ACCEL, les octets sont envoyés par :
+
+- 'nginx' : en-tête X-Accel-Redirect vers MEDIA_ACCEL_PREFIX, à déclarer
+  en location interne :
+
+      location /protected-media/ {
+          internal;
+          alias /chemin/vers/media/;
+      }
+
+- 'sendfile' : en-tête X-Sendfile (Apache mod_xsendfile, lighttpd) ;
+- None (développement) : Django lui-même, requêtes Range comprises.
+
+Les fichiers de PROTECTED_MEDIA (preuves de paiement) ne sont servis qu'aux
+utilisateurs autorisés (session ou JWT) ; les autres sont publics. Un nom
+adressé par contenu (apps.core.storage) ne change jamais de contenu : il est
+servi avec Cache-Control immutable.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .storage import is_hashed
+
+
+MEDIA_ACCEL = getattr(settings, 'MEDIA_ACCEL', None)
+MEDIA_ACCEL_PREFIX = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MEDIA_MAX_AGE = getattr(settings, 'MEDIA_MAX_AGE', 3600)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def can_view_payment_proof(user, name):
+    from apps.payments.models import Payment
+
+    # Un même fichier peut servir à plusieurs paiements (stockage par contenu)
+    return user.is_staff or Payment.objects.filter(payment_proof=name, user=user).exists()
+
+
+# Répertoire -> fonction (utilisateur, nom) qui autorise l'accès
+PROTECTED_MEDIA = {
+    'payment_proofs': can_view_payment_proof,
+}
+
+
+def access_rule(name):
+    """Fonction d'autorisation du fichier, ou None s'il est public"""
+    return PROTECTED_MEDIA.get(name.split('/', 1)[0])
+
+
+def media_etag(name, stat):
+    if is_hashed(name):
+        return quote_etag(os.path.splitext(os.path.basename(name))[0])
+    return quote_etag(f"{int(stat.st_mtime):x}-{stat.st_size:x}")
+
+
+def parse_range(header, size):
+    """
+    (début, fin incluse) d'un en-tête Range à une seule plage ; None pour
+    l'ignorer (absent, invalide, plusieurs plages) ; ValueError si la plage
+    est hors du fichier (416).
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # bytes=-500 : les 500 derniers octets
+        length = int(last)
+        if not length:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    """If-Range absent ou encore valide : la plage demandée peut être servie"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+def _file_slice(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def accel_response(name, path, content_type):
+    """Réponse vide : le serveur frontal envoie le fichier (et gère Range)"""
+    response = HttpResponse(content_type=content_type)
+    if MEDIA_ACCEL == 'nginx':
+        response['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(name)
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def file_response(request, path, stat, content_type, etag):
+    """Fichier envoyé par Django, plage d'octets comprise (206)"""
+    size = stat.st_size
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range and _if_range_matches(request, etag, stat.st_mtime):
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _file_slice(path, start, length) if request.method != 'HEAD' else [],
+            status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+    elif request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = str(size)
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve_media(request, name, path, stat):
+    """
+    Réponse d'un fichier media déjà autorisé : validateurs, 304, en-têtes
+    de cache puis envoi (frontal ou Django).
+    """
+    protected = access_rule(name) is not None
+    etag = media_etag(name, stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type, encoding = mimetypes.guess_type(name)
+        content_type = content_type or 'application/octet-stream'
+        if MEDIA_ACCEL:
+            response = accel_response(name, path, content_type)
+        else:
+            response = file_response(request, path, stat, content_type, etag)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if protected:
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+    elif is_hashed(name):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=MEDIA_MAX_AGE)
+    return response
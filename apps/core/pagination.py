@@ -0,0 +1,162 @@
+# apps/core/pagination.py
+"""
+Pagination par curseur (keyset) triable.
+
+Le tri se fait toujours sur (clé de tri, id) et le curseur encode ces deux
+valeurs pour la dernière (ou première) ligne de la page : chaque page est une
+requête `WHERE (clé, id) > (v, i) ORDER BY clé, id LIMIT n` servie par un
+index composite, à coût constant quelle que soit la profondeur.
+
+Les vues déclarent leurs tris publics :
+
+    sort_fields = {'price': 'price_per_night', 'created_at': 'created_at'}
+    default_ordering = '-created_at'
+
+et ?ordering=price ou ?ordering=-price choisit le tri. Une clé de tri peut
+être une annotation du queryset (search_rank, distance_km) ; elle n'est alors
+retenue que si l'annotation est présente. default_ordering peut lister
+plusieurs tris : le premier applicable est utilisé.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from decimal import InvalidOperation
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    invalid_cursor_message = 'Curseur invalide'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request, queryset, view):
+        """(champ de tri, décroissant)"""
+        sort_fields = getattr(view, 'sort_fields', {'created_at': 'created_at'})
+        defaults = getattr(view, 'default_ordering', '-created_at')
+        if isinstance(defaults, str):
+            defaults = (defaults,)
+
+        for value in (request.query_params.get(self.ordering_query_param), *defaults):
+            if not value:
+                continue
+            field = sort_fields.get(value.lstrip('-'))
+            if field and self._sortable(queryset, field):
+                return field, value.startswith('-')
+
+        return 'pk', True
+
+    def _sortable(self, queryset, field):
+        if field in queryset.query.annotations:
+            return True
+        try:
+            queryset.model._meta.get_field(field)
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    def encode_cursor(self, value, pk, reverse):
+        data = {'v': value, 'i': pk}
+        if reverse:
+            data['r'] = 1
+        token = urlsafe_b64encode(json.dumps(data, default=str).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            data = json.loads(urlsafe_b64decode(token.encode()))
+            return data['v'], int(data['i']), bool(data.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def cursor_value(self, queryset, field, value):
+        """Valeur du curseur convertie par le champ de tri (ou l'annotation)"""
+        annotation = queryset.query.annotations.get(field)
+        if annotation is not None:
+            output_field = annotation.output_field
+        else:
+            output_field = queryset.model._meta.get_field(field)
+        try:
+            value = output_field.to_python(value)
+        except (ValidationError, TypeError, ValueError, InvalidOperation):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        field, descending = self.get_ordering(request, queryset, view)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor[2])
+
+        # Page précédente : on parcourt dans l'ordre inverse puis on retourne la page
+        walk_descending = descending != reverse
+        prefix = '-' if walk_descending else ''
+        queryset = queryset.order_by(f'{prefix}{field}', f'{prefix}pk')
+
+        if cursor:
+            value, pk, _ = cursor
+            op = 'lt' if walk_descending else 'gt'
+            if field == 'pk':
+                queryset = queryset.filter(**{f'pk__{op}': pk})
+            else:
+                value = self.cursor_value(queryset, field, value)
+                queryset = queryset.filter(
+                    Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+                )
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.field = field
+        self.next_link = self.previous_link = None
+        if rows:
+            if (has_more and not reverse) or (reverse and cursor):
+                self.next_link = self.encode_cursor(self._value(rows[-1]), rows[-1].pk, False)
+            if (cursor and not reverse) or (reverse and has_more):
+                self.previous_link = self.encode_cursor(self._value(rows[0]), rows[0].pk, True)
+        return rows
+
+    def _value(self, obj):
+        return obj.pk if self.field == 'pk' else getattr(obj, self.field)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.next_link,
+            'previous': self.previous_link,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
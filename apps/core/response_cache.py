@@ -0,0 +1,280 @@
+# apps/core/response_cache.py
+"""
+Cache en lecture des réponses publiques (listes et détails des annonces et
+des événements).
+
+Les réponses sont stockées dans l'alias de cache RESPONSE_CACHE_ALIAS
+(locmem, fichiers ou Redis selon CACHE_BACKEND) :
+
+- liste : clé = version de la liste + paramètres de requête normalisés ;
+  avec ?start_date=&end_date=, la version des disponibilités s'y ajoute ;
+- détail : clé = version de l'objet (pk ou slug) + paramètres de requête.
+
+Le schéma et l'hôte de la requête entrent aussi dans la clé : les réponses
+contiennent des URL absolues (liens de pagination, images).
+
+L'invalidation se fait par incrément de version, via post_save/post_delete
+des modèles sources (un bien, ses images, un événement, ses types de
+billets) : la liste et le détail de l'objet modifié seulement. Le profil
+public du propriétaire, imbriqué dans le détail des biens, invalide les
+détails de ses biens (post_save de l'utilisateur, hors connexion). Les
+réservations (Booking.invalidate_caches()) et les disponibilités
+invalident les listes filtrées par période.
+
+Compteurs de hits/misses : GET /api/cache/stats/ (administrateurs).
+Avec locmem, le cache (et donc l'invalidation) est propre à chaque processus :
+utiliser file ou redis dès qu'il y a plusieurs workers.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+
+RESPONSE_CACHE_ALIAS = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+# Paramètres sans effet sur le contenu de la réponse
+IGNORED_PARAMS = {'format'}
+
+# Paramètres dont la réponse dépend de l'utilisateur : jamais mis en cache
+PRIVATE_PARAMS = {'owner': 'me'}
+
+# Paramètres de période (résultats dépendant des réservations)
+PERIOD_PARAMS = ('start_date', 'end_date')
+
+
+def _cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def _incr(key):
+    cache = _cache()
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Clé expulsée entre add() et incr()
+        cache.set(key, 1, None)
+        return 1
+
+
+def _request_variant(request):
+    """
+    Origine (schéma + hôte) et paramètres triés, valeurs vides et
+    IGNORED_PARAMS retirés : les liens absolus de la réponse (next/previous,
+    images) dépendent de l'origine.
+    """
+    items = sorted(
+        (name, value.strip())
+        for name, values in request.query_params.lists() if name not in IGNORED_PARAMS
+        for value in values if value.strip()
+    )
+    origin = f"{request.scheme}://{request.get_host()}"
+    return hashlib.md5(f"{origin}?{urlencode(items)}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Réponses mises en cache d'un type de ressource.
+
+    Args:
+        namespace: préfixe des clés ('residences', 'vehicles', 'events')
+        sources: {modèle: relation vers la ressource (None pour la ressource elle-même)}
+        period_sources: modèles dont dépendent les listes filtrées par période
+        lookup_fields: attributs identifiant une ressource en détail (pk, slug)
+        owner_field: clé vers l'utilisateur dont le profil est imbriqué dans le détail
+    """
+
+    def __init__(self, namespace, sources, period_sources=(), lookup_fields=('pk',), owner_field=None):
+        self.namespace = namespace
+        self.sources = sources
+        self.period_sources = period_sources
+        self.lookup_fields = lookup_fields
+        self.owner_field = owner_field
+
+    def _version_key(self, scope):
+        return f"responses:{self.namespace}:version:{scope}"
+
+    def _stat_key(self, name):
+        return f"responses:{self.namespace}:{name}"
+
+    # --- Invalidation ---
+
+    def invalidate_list(self):
+        _incr(self._version_key('list'))
+
+    def invalidate_periods(self):
+        """Réservations ou disponibilités modifiées : listes filtrées par période"""
+        _incr(self._version_key('period'))
+
+    def invalidate_object(self, obj):
+        """Détail de la ressource, sous chacun de ses identifiants"""
+        for field in self.lookup_fields:
+            value = getattr(obj, field, None)
+            if value:
+                _incr(self._version_key(f'{field}:{value}'))
+
+    def _source_changed(self, sender, instance, **kwargs):
+        self.invalidate_list()
+        relation = self.sources[sender._meta.label]
+        obj = instance if relation is None else getattr(instance, relation, None)
+        if obj is not None:
+            self.invalidate_object(obj)
+
+    def _period_source_changed(self, sender, instance, **kwargs):
+        self.invalidate_periods()
+
+    def _owner_changed(self, sender, instance, update_fields=None, **kwargs):
+        """Profil modifié : détails des biens de l'utilisateur (les cartes n'en contiennent rien)"""
+        if update_fields is not None and set(update_fields) <= {'last_login'}:
+            return
+        label = next(label for label, relation in self.sources.items() if relation is None)
+        model = apps.get_model(label)
+        fields = [field for field in self.lookup_fields if field != 'pk']
+        for obj in model._default_manager.filter(**{self.owner_field: instance}).only(*fields):
+            self.invalidate_object(obj)
+
+    def connect(self, app_config):
+        """Branche post_save/post_delete des modèles sources de l'application"""
+        handlers = [(label, self._source_changed) for label in self.sources]
+        handlers += [(label, self._period_source_changed) for label in self.period_sources]
+
+        for label, handler in handlers:
+            app_label, model_name = label.split('.')
+            if app_label != app_config.label:
+                continue
+            model = app_config.get_model(model_name)
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    handler, sender=model,
+                    dispatch_uid=f'response-cache:{self.namespace}:{label}',
+                )
+
+        if self.owner_field and settings.AUTH_USER_MODEL.split('.')[0] == app_config.label:
+            post_save.connect(
+                self._owner_changed, sender=settings.AUTH_USER_MODEL,
+                dispatch_uid=f'response-cache:{self.namespace}:owner',
+            )
+
+    # --- Lecture ---
+
+    def cache_key(self, view, request):
+        """Clé de la réponse, ou None si elle ne doit pas être mise en cache"""
+        params = request.query_params
+        if any(params.get(name) == value for name, value in PRIVATE_PARAMS.items()):
+            return None
+
+        lookup = view.lookup_url_kwarg or view.lookup_field
+        if lookup in view.kwargs:
+            field = 'pk' if view.lookup_field in ('pk', 'id') else view.lookup_field
+            if field not in self.lookup_fields:
+                return None
+            scopes = [f'{field}:{view.kwargs[lookup]}']
+        else:
+            scopes = ['list']
+            if any(name in params for name in PERIOD_PARAMS):
+                scopes.append('period')
+
+        versions = _cache().get_many([self._version_key(scope) for scope in scopes])
+        version = '.'.join(
+            str(versions.get(self._version_key(scope), 0)) for scope in scopes
+        )
+        return f"responses:{self.namespace}:{scopes[0]}:{version}:{_request_variant(request)}"
+
+    def record(self, hit):
+        _incr(self._stat_key('hits' if hit else 'misses'))
+
+    def stats(self):
+        counts = _cache().get_many([self._stat_key('hits'), self._stat_key('misses')])
+        hits = counts.get(self._stat_key('hits'), 0)
+        misses = counts.get(self._stat_key('misses'), 0)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+
+def cache_response(response_cache):
+    """
+    Décorateur des méthodes list()/retrieve() d'une vue DRF : réponse servie
+    depuis le cache (en-tête X-Cache: HIT) ou calculée puis stockée (MISS).
+    Appliqué au handler, il passe après authentification et permissions.
+
+    Les validateurs d'une vue ConditionalGetMixin (ETag, Last-Modified) sont
+    calculés avant la réponse sur MISS et stockés avec elle.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if not RESPONSE_CACHE_TIMEOUT:
+                return method(view, request, *args, **kwargs)
+
+            key = response_cache.cache_key(view, request)
+            if key is None:
+                return method(view, request, *args, **kwargs)
+
+            conditional = hasattr(view, 'get_conditional_validators')
+            cache = _cache()
+            cached = cache.get(key)
+            if cached is not None:
+                data, validators = cached
+                if conditional:
+                    view.set_cached_validators(validators)
+                response_cache.record(hit=True)
+                return Response(data, headers={'X-Cache': 'HIT'})
+
+            # Avant la réponse : un validateur ne peut pas être plus récent que les données
+            validators = view.get_conditional_validators() if conditional else None
+            response = method(view, request, *args, **kwargs)
+            response_cache.record(hit=False)
+            if response.status_code == 200:
+                cache.set(key, (response.data, validators), RESPONSE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+            return response
+
+        wrapper.response_cache = response_cache
+        return wrapper
+    return decorator
+
+
+RESIDENCE_RESPONSES = ResponseCache(
+    'residences',
+    {'residences.Residence': None, 'residences.ResidenceImage': 'residence'},
+    period_sources=['residences.Availability'],
+    owner_field='owner',
+)
+
+VEHICLE_RESPONSES = ResponseCache(
+    'vehicles',
+    {'vehicles.Vehicle': None, 'vehicles.VehicleImage': 'vehicle'},
+    lookup_fields=('pk', 'slug'),
+    owner_field='owner',
+)
+
+EVENT_RESPONSES = ResponseCache(
+    'events',
+    {'events.Event': None, 'events.TicketType': 'event'},
+)
+
+RESPONSE_CACHES = [RESIDENCE_RESPONSES, VEHICLE_RESPONSES, EVENT_RESPONSES]
+
+# Bien réservé (Booking.content_type.model) -> cache de ses listes
+LISTING_RESPONSES = {'residence': RESIDENCE_RESPONSES, 'vehicle': VEHICLE_RESPONSES}
+
+
+def connect_response_caches(app_config):
+    """À appeler depuis AppConfig.ready() des applications sources"""
+    for response_cache in RESPONSE_CACHES:
+        response_cache.connect(app_config)
+
+
+def response_cache_stats():
+    return {response_cache.namespace: response_cache.stats() for response_cache in RESPONSE_CACHES}
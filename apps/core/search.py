@@ -0,0 +1,206 @@
+# apps/core/search.py
+"""
+Recherche plein texte sur les annonces (?q=), insensible aux accents.
+
+- SQLite : table FTS5 à contenu externe (tokenizer unicode61
+  remove_diacritics 2), synchronisée par triggers.
+- PostgreSQL : index GIN sur un tsvector calculé avec la configuration
+  french_unaccent (french + unaccent).
+
+Les index et triggers sont (ré)installés après chaque `migrate` (signal
+post_migrate des applications residences et vehicles) : SQLite supprime les triggers quand il
+reconstruit une table. Sur les autres bases, repli sur icontains.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+
+TEXT_SEARCH_CONFIG = 'french_unaccent'
+
+# Nombre maximum de mots pris en compte dans ?q=
+MAX_TERMS = 10
+
+_TERM_RE = re.compile(r'[^\W_]+')
+
+
+def _weight_letter(weight):
+    """Poids numérique (bm25) -> classe de poids tsvector"""
+    if weight >= 10:
+        return 'A'
+    if weight >= 5:
+        return 'B'
+    return 'C'
+
+
+class FullTextIndex:
+    """Index plein texte d'une table : colonnes et poids de pertinence"""
+
+    def __init__(self, app_label, table, weights):
+        self.app_label = app_label
+        self.table = table
+        self.weights = weights
+        self.columns = list(weights)
+
+    @property
+    def fts_table(self):
+        return f"{self.table}_fts"
+
+    # --- SQLite (FTS5) ---
+
+    def _sqlite_triggers(self):
+        columns = ', '.join(self.columns)
+        new_values = ', '.join(f'new.{column}' for column in self.columns)
+        old_values = ', '.join(f'old.{column}' for column in self.columns)
+        fts = self.fts_table
+        return {
+            f'{fts}_insert': f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {self.table} BEGIN
+                    INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+                END
+            """,
+            f'{fts}_delete': f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {self.table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                END
+            """,
+            f'{fts}_update': f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {columns} ON {self.table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                    INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+                END
+            """,
+        }
+
+    def install_sqlite(self, cursor):
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5(
+                {', '.join(self.columns)},
+                content='{self.table}',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+
+        triggers = self._sqlite_triggers()
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+            [self.table],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+
+        for statement in triggers.values():
+            cursor.execute(statement)
+
+        # Triggers absents (table créée ou reconstruite) : réindexer
+        if not set(triggers) <= existing:
+            cursor.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+
+    def _sqlite_match(self, terms):
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    # --- PostgreSQL (tsvector) ---
+
+    def _pg_vector(self):
+        return ' || '.join(
+            f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}'::regconfig, coalesce({column}, '')), "
+            f"'{_weight_letter(weight)}')"
+            for column, weight in self.weights.items()
+        )
+
+    def install_postgresql(self, cursor):
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_search ON {self.table} USING GIN (({self._pg_vector()}))"
+        )
+
+    def _pg_query(self, terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    # --- Requêtes ---
+
+    def search(self, queryset, text):
+        """Filtre et trie le queryset par pertinence (annotation search_rank)"""
+        terms = _TERM_RE.findall(text.lower())[:MAX_TERMS]
+        if not terms:
+            return queryset
+
+        pk = f'"{self.table}"."id"'
+        vendor = connections[queryset.db].vendor
+
+        if vendor == 'sqlite':
+            match = self._sqlite_match(terms)
+            weights = ', '.join(str(float(weight)) for weight in self.weights.values())
+            matches = RawSQL(
+                f"{pk} IN (SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s)",
+                [match], output_field=BooleanField(),
+            )
+            rank = RawSQL(
+                f"(SELECT -bm25({self.fts_table}, {weights}) FROM {self.fts_table} "
+                f"WHERE {self.fts_table} MATCH %s AND rowid = {pk})",
+                [match], output_field=FloatField(),
+            )
+        elif vendor == 'postgresql':
+            tsquery = f"to_tsquery('{TEXT_SEARCH_CONFIG}'::regconfig, %s)"
+            query = self._pg_query(terms)
+            matches = RawSQL(f"({self._pg_vector()}) @@ {tsquery}", [query], output_field=BooleanField())
+            rank = RawSQL(f"ts_rank({self._pg_vector()}, {tsquery})", [query], output_field=FloatField())
+        else:
+            condition = Q()
+            for term in terms:
+                term_condition = Q()
+                for column in self.columns:
+                    term_condition |= Q(**{f'{column}__icontains': term})
+                condition &= term_condition
+            return queryset.filter(condition)
+
+        return queryset.filter(matches).annotate(search_rank=rank).order_by('-search_rank', '-id')
+
+
+# Index par table (les noms de colonnes sont ceux de la base)
+SEARCH_INDEXES = {
+    'residences_residence': FullTextIndex('residences', 'residences_residence', {
+        'title': 10, 'neighborhood': 5, 'city': 5, 'description': 1,
+    }),
+    'vehicles_vehicle': FullTextIndex('vehicles', 'vehicles_vehicle', {
+        'title': 10, 'brand': 5, 'model': 5, 'city': 5, 'description': 1,
+    }),
+}
+
+
+def search(queryset, text):
+    """?q= : recherche plein texte sur le modèle du queryset"""
+    if not text or not text.strip():
+        return queryset
+    return SEARCH_INDEXES[queryset.model._meta.db_table].search(queryset, text)
+
+
+def install_search_indexes(sender, using='default', **kwargs):
+    """Handler post_migrate : crée index, tables FTS5 et triggers de l'application"""
+    connection = connections[using]
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        return
+
+    tables = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+            cursor.execute(f"""
+                DO $$ BEGIN
+                    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{TEXT_SEARCH_CONFIG}') THEN
+                        CREATE TEXT SEARCH CONFIGURATION {TEXT_SEARCH_CONFIG} (COPY = french);
+                        ALTER TEXT SEARCH CONFIGURATION {TEXT_SEARCH_CONFIG}
+                            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+                    END IF;
+                END $$
+            """)
+
+        for index in SEARCH_INDEXES.values():
+            if index.app_label != sender.label or index.table not in tables:
+                continue
+            if connection.vendor == 'sqlite':
+                index.install_sqlite(cursor)
+            else:
+                index.install_postgresql(cursor)
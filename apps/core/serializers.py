@@ -0,0 +1,51 @@
+# apps/core/serializers.py
+
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+
+class SparseFieldsetMixin:
+    """
+    ?fields=id,title,price_per_night : ne renvoie que les champs demandés
+    (lecture uniquement ; les champs inconnus sont ignorés).
+    """
+
+    fields_query_param = 'fields'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        requested = request.query_params.get(self.fields_query_param)
+        if not requested:
+            return
+
+        keep = {name.strip() for name in requested.split(',')}
+        if not keep & set(self.fields):
+            return
+
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+
+def media_url(request, path):
+    """URL absolue d'un fichier stocké (chemin relatif à MEDIA_ROOT)"""
+    if not path:
+        return None
+    url = default_storage.url(path)
+    return request.build_absolute_uri(url) if request else url
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Déclinaisons d'une image prêtes pour srcset :
+    {"webp": "https://…_320.webp 320w, …", "jpeg": "…"} ({} tant que le worker ne les a pas générées)
+    """
+
+    def to_representation(self, value):
+        from .images import srcset_map
+        request = self.context.get('request')
+        return srcset_map(value, lambda path: media_url(request, path))
@@ -0,0 +1,225 @@
+# apps/core/storage.py
+"""
+Stockage des fichiers envoyés (photos des annonces, affiches, avatars,
+preuves de paiement) et de leurs déclinaisons, adressé par contenu.
+
+Un fichier est enregistré sous l'empreinte SHA-256 de son contenu, dans le
+répertoire de son upload_to :
+
+    residences/3f/3fa2…9c.jpg      payment_proofs/b0/b07e…41.png
+
+Deux envois identiques (la même photo sur plusieurs annonces, une preuve de
+paiement renvoyée après un échec) partagent donc un seul fichier : save()
+renvoie le nom existant sans rien écrire ni le modifier. Les noms ne changent
+jamais de contenu, ce qui permet de les servir avec un cache « immutable ».
+Un nouveau fichier est écrit sous un nom temporaire puis lié à son nom
+définitif : celui-ci n'apparaît que complet, et deux envois identiques
+simultanés aboutissent au même fichier.
+
+Aucun fichier n'est supprimé à l'enregistrement ni à la suppression d'une
+ligne : les références sont comptées à partir de la base (media_references)
+et `manage.py collect_media_garbage` supprime les fichiers qui n'en ont plus
+aucune (originaux remplacés par le worker d'images, anciennes déclinaisons,
+lignes supprimées), après un délai de grâce MEDIA_GC_MIN_AGE.
+Les fichiers enregistrés avant ce stockage gardent leur nom jusqu'à
+`collect_media_garbage --rehash`.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models
+
+
+HASHED_NAME = re.compile(r'^(?:[^/]+/)?([0-9a-f]{2})/\1[0-9a-f]{62}(?:\.[0-9a-z]+)?$')
+
+# Heures pendant lesquelles un fichier non référencé est conservé
+# (envoi en cours, réponses encore en cache qui pointent dessus)
+MEDIA_GC_MIN_AGE = getattr(settings, 'MEDIA_GC_MIN_AGE', 24)
+
+
+def content_hash(content):
+    sha256 = hashlib.sha256()
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+def hashed_name(name, digest):
+    """'residences/villa.JPG' -> 'residences/3f/3fa2….jpg'"""
+    directory = name.split('/', 1)[0] if '/' in name else ''
+    extension = posixpath.splitext(name)[1].lower()
+    return posixpath.join(directory, digest[:2], f"{digest}{extension}")
+
+
+def is_hashed(name):
+    return bool(HASHED_NAME.match(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage dont les noms sont l'empreinte du contenu"""
+
+    def _save(self, name, content):
+        name = hashed_name(name, content_hash(content))
+        if self.exists(name):
+            # Doublon : le fichier existant sert tel quel (ni réécrit ni
+            # rajeuni, sa date sert de Last-Modified)
+            return name
+
+        temporary = super()._save(f"{name}.tmp", content)
+        try:
+            os.link(self.path(temporary), self.path(name))
+        except FileExistsError:
+            # Envoi identique simultané : son fichier sert
+            pass
+        finally:
+            os.remove(self.path(temporary))
+        return name
+
+
+# --- Références et ramasse-miettes ---
+
+def file_fields():
+    """[(modèle, nom du champ)] de tous les FileField/ImageField du projet"""
+    return [
+        (model, field.name)
+        for model in apps.get_models() if not model._meta.proxy
+        for field in model._meta.get_fields()
+        if isinstance(field, models.FileField)
+    ]
+
+
+def media_directories():
+    """Répertoires gérés : upload_to des champs fichiers et déclinaisons"""
+    from .images import DERIVED_DIR
+
+    directories = {DERIVED_DIR}
+    for model, field_name in file_fields():
+        upload_to = model._meta.get_field(field_name).upload_to
+        if isinstance(upload_to, str) and upload_to.strip('/'):
+            directories.add(upload_to.strip('/').split('/', 1)[0])
+    return sorted(directories)
+
+
+def media_references():
+    """
+    Nombre de références de chaque fichier : champs fichiers et déclinaisons
+    d'images (IMAGE_SOURCES).
+
+    Returns:
+        Counter: {nom du fichier: nombre de lignes qui le référencent}
+    """
+    from .images import IMAGE_SOURCES, VARIANT_FORMATS
+
+    references = Counter()
+    for model, field_name in file_fields():
+        names = model._default_manager.exclude(**{f'{field_name}__isnull': True}).exclude(
+            **{field_name: ''}
+        ).values_list(field_name, flat=True)
+        references.update(names.iterator())
+
+    for model_label, field_name, variants_field in IMAGE_SOURCES:
+        rows = apps.get_model(model_label)._default_manager.exclude(
+            **{variants_field: {}}
+        ).values_list(variants_field, flat=True)
+        for variants in rows.iterator():
+            for key in VARIANT_FORMATS:
+                references.update(set((variants or {}).get(key, {}).values()))
+
+    return references
+
+
+def stored_files(storage=default_storage):
+    """(nom, taille, date de modification) des fichiers des répertoires gérés"""
+    for directory in media_directories():
+        root = storage.path(directory)
+        for dirpath, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                yield name, stat.st_size, stat.st_mtime
+
+
+def collect_garbage(min_age=MEDIA_GC_MIN_AGE, dry_run=False, storage=default_storage):
+    """
+    Supprime les fichiers sans référence plus anciens que min_age heures.
+
+    Returns:
+        dict: fichiers et octets supprimés, conservés, doublons évités
+    """
+    references = media_references()
+    threshold = time.time() - min_age * 3600
+    stats = Counter()
+
+    for name, size, mtime in stored_files(storage):
+        count = references.get(name, 0)
+        if count:
+            stats['kept'] += 1
+            stats['kept_bytes'] += size
+            # Fichier partagé : chaque référence en plus est une copie évitée
+            stats['deduplicated_bytes'] += (count - 1) * size
+        elif mtime > threshold:
+            stats['recent'] += 1
+        else:
+            if not dry_run:
+                storage.delete(name)
+            stats['deleted'] += 1
+            stats['deleted_bytes'] += size
+
+    return dict(stats)
+
+
+def rehash_files(storage=default_storage):
+    """
+    Range sous leur empreinte les fichiers enregistrés avant ce stockage
+    (les doublons sont fusionnés). Les anciens fichiers sont rajeunis : ils
+    restent servis pendant MEDIA_GC_MIN_AGE, puis collect_garbage les supprime.
+
+    Returns:
+        int: nombre de lignes mises à jour
+    """
+    from .images import IMAGE_SOURCES
+
+    renamed = {}
+    updated = 0
+
+    for model, field_name in file_fields():
+        rows = model._default_manager.exclude(**{f'{field_name}__isnull': True}).exclude(
+            **{field_name: ''}
+        ).values_list('pk', field_name)
+        for pk, name in list(rows):
+            if is_hashed(name):
+                continue
+            if name not in renamed:
+                if not storage.exists(name):
+                    continue
+                with storage.open(name) as source:
+                    renamed[name] = storage.save(name, source)
+                os.utime(storage.path(name))
+
+            variants_fields = [
+                variants_field for label, field, variants_field in IMAGE_SOURCES
+                if (label, field) == (model._meta.label, field_name)
+            ]
+            if variants_fields:
+                # save() : déclinaisons à régénérer, caches et dates de modification
+                obj = model._default_manager.get(pk=pk)
+                setattr(obj, field_name, renamed[name])
+                update_fields = [field_name, *variants_fields]
+                if any(field.name == 'updated_at' for field in obj._meta.fields):
+                    update_fields.append('updated_at')
+                obj.save(update_fields=update_fields)
+            else:
+                model._default_manager.filter(pk=pk).update(**{field_name: renamed[name]})
+            updated += 1
+
+    return updated
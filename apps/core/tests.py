@@ -0,0 +1,206 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import ExifTags, Image
+
+from apps.bookings.tests import make_residence, make_user
+from apps.residences.models import Residence
+
+from .images import bulk_add_images, render_image, smallest_variant, strip_metadata
+from .storage import ContentAddressedStorage, is_hashed
+
+
+def image_file(name='photo.png', color=(200, 30, 30, 255), size=(40, 30)):
+    buffer = BytesIO()
+    Image.new('RGBA', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+def camera_photo(name='photo.jpg', size=(64, 48), image_format='JPEG'):
+    """Photo avec orientation, GPS, XMP et commentaire, comme celles des téléphones"""
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = 6
+    exif[ExifTags.IFD.GPSInfo] = {ExifTags.GPS.GPSLatitudeRef: 'N', ExifTags.GPS.GPSLatitude: (5.0, 19.0, 0.0)}
+    options = {'comment': b'Abidjan', 'xmp': b'<x:xmpmeta>GPS</x:xmpmeta>'} if image_format == 'JPEG' else {}
+
+    buffer = BytesIO()
+    Image.effect_mandelbrot(size, (-2, -1.5, 1, 1.5), 50).convert('RGB').save(
+        buffer, image_format, exif=exif, **options
+    )
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class MediaTestCase(TestCase):
+    """Fichiers enregistrés dans un MEDIA_ROOT temporaire"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class BulkAddImagesTests(MediaTestCase):
+    """Photos d'une annonce : nombre de requêtes indépendant du nombre de fichiers"""
+
+    def setUp(self):
+        super().setUp()
+        self.residence = make_residence(make_user('owner', 'proprietaire'))
+
+    def add(self, count, primary_index=None):
+        files = [image_file(color=(index * 40, 0, 0, 255)) for index in range(count)]
+        return bulk_add_images(self.residence.images, files, primary_index)
+
+    def test_query_count_does_not_grow_with_files(self):
+        with self.assertNumQueries(3):
+            self.add(1)
+        with self.assertNumQueries(3):
+            self.add(5)
+
+        orders = list(self.residence.images.order_by('order').values_list('order', flat=True))
+        self.assertEqual(orders, list(range(6)))
+
+    def test_single_primary_image(self):
+        self.add(2, primary_index=0)
+        created = self.add(3, primary_index=1)
+
+        primary = self.residence.images.filter(is_primary=True)
+        self.assertEqual(list(primary.values_list('pk', flat=True)), [created[1].pk])
+
+
+class StripMetadataTests(MediaTestCase):
+    """Métadonnées retirées avant le premier enregistrement de l'original"""
+
+    def assertOnlyOrientation(self, content):
+        image = Image.open(BytesIO(content))
+        self.assertEqual(dict(image.getexif()), {ExifTags.Base.Orientation: 6})
+        self.assertFalse({'xmp', 'comment'} & set(image.info))
+        return image
+
+    def test_jpeg_is_stripped_without_reencoding(self):
+        upload = camera_photo()
+        original = Image.open(BytesIO(upload.read()))
+
+        stripped = self.assertOnlyOrientation(strip_metadata(upload).read())
+
+        self.assertEqual(stripped.tobytes(), original.tobytes())
+
+    def test_png_keeps_pixels_and_orientation(self):
+        upload = camera_photo('photo.png', image_format='PNG')
+        original = Image.open(BytesIO(upload.read()))
+
+        stripped = self.assertOnlyOrientation(strip_metadata(upload).read())
+
+        self.assertEqual(stripped.tobytes(), original.tobytes())
+
+    def test_other_formats_are_reencoded(self):
+        stripped = strip_metadata(camera_photo('photo.webp', image_format='WEBP'))
+
+        self.assertEqual(stripped.name, 'photo.jpg')
+        image = Image.open(BytesIO(stripped.read()))
+        self.assertEqual((image.format, image.size, dict(image.getexif())), ('JPEG', (48, 64), {}))
+
+    def test_clean_file_is_kept(self):
+        upload = image_file()
+        self.assertIs(strip_metadata(upload), upload)
+
+    def test_listing_photos_are_stored_stripped(self):
+        residence = make_residence(make_user('owner', 'proprietaire'))
+        image, = bulk_add_images(residence.images, [camera_photo()])
+
+        with default_storage.open(image.image.name) as stored:
+            self.assertOnlyOrientation(stored.read())
+
+    def test_avatar_is_stored_stripped(self):
+        user = make_user('client')
+        user.avatar = camera_photo('avatar.jpg')
+        user.save()
+
+        with default_storage.open(user.avatar.name) as stored:
+            self.assertOnlyOrientation(stored.read())
+
+
+class RenderImageTests(MediaTestCase):
+    def test_transparent_pixels_are_white_in_jpeg(self):
+        name = default_storage.save('residences/logo.png', image_file(color=(0, 0, 0, 0)))
+
+        normalized, variants = render_image(name)
+
+        for path in variants['jpeg'].values():
+            with default_storage.open(path) as variant:
+                self.assertGreater(min(Image.open(variant).convert('RGB').getpixel((0, 0))), 250)
+        with default_storage.open(next(iter(variants['webp'].values()))) as variant:
+            self.assertEqual(Image.open(variant).mode, 'RGBA')
+
+    def test_rendering_again_reuses_variant_files(self):
+        name = default_storage.save('residences/logo.png', image_file())
+
+        first = render_image(name)
+        directory = os.path.dirname(default_storage.path(smallest_variant(first[1])))
+        files = sorted(os.listdir(directory))
+
+        self.assertEqual(render_image(name), first)
+        self.assertEqual(sorted(os.listdir(directory)), files)
+
+
+class ContentAddressedStorageTests(MediaTestCase):
+    def test_duplicate_keeps_existing_file_untouched(self):
+        name = default_storage.save('payment_proofs/recu.pdf', ContentFile(b'recu'))
+        os.utime(default_storage.path(name), (1000, 1000))
+
+        self.assertEqual(default_storage.save('payment_proofs/autre.pdf', ContentFile(b'recu')), name)
+        self.assertTrue(is_hashed(name))
+        self.assertEqual(os.stat(default_storage.path(name)).st_mtime, 1000)
+
+    def test_concurrent_identical_upload_is_a_duplicate(self):
+        name = default_storage.save('payment_proofs/recu.pdf', ContentFile(b'recu'))
+
+        # L'autre envoi a créé le fichier entre exists() et l'écriture
+        with mock.patch.object(ContentAddressedStorage, 'exists', return_value=False):
+            self.assertEqual(default_storage.save('payment_proofs/recu.pdf', ContentFile(b'recu')), name)
+
+        self.assertEqual(os.listdir(os.path.dirname(default_storage.path(name))), [os.path.basename(name)])
+
+
+class BenchmarkCommandTests(TestCase):
+    """Les mesures tournent sur un petit jeu de données et n'en laissent aucune trace"""
+
+    def run_benchmark(self, name, **options):
+        output = StringIO()
+        call_command('benchmark', name, repeat=1, stdout=output, **options)
+        return output.getvalue()
+
+    def test_availability(self):
+        output = self.run_benchmark('availability', listings=5, bookings=20)
+
+        self.assertIn('Liste par période', output)
+        self.assertFalse(Residence.objects.filter(description='Benchmark').exists())
+
+    def test_facets(self):
+        output = self.run_benchmark('facets', listings=5)
+
+        self.assertIn('Ville + piscine', output)
+        self.assertFalse(Residence.objects.filter(description='Benchmark').exists())
+
+    def test_quotes(self):
+        output = self.run_benchmark('quotes', listings=5)
+
+        self.assertIn('séjours/s', output)
+        self.assertFalse(Residence.objects.filter(description='Benchmark').exists())
+
+    def test_uploads(self):
+        with mock.patch('apps.core.benchmarks.UPLOAD_PHOTO_SIZE', (64, 48)):
+            output = self.run_benchmark('uploads')
+
+        self.assertIn('Rendu des déclinaisons', output)
+        self.assertNotIn('erreurs', output)
+        self.assertFalse(Residence.objects.filter(description='Benchmark').exists())
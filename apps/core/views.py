@@ -0,0 +1,62 @@
+# apps/core/views.py
+
+import os
+from stat import S_ISREG
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.views import View
+from rest_framework import permissions
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .media import access_rule, serve_media
+from .response_cache import response_cache_stats
+
+
+class ResponseCacheStatsView(APIView):
+    """Compteurs hits/misses du cache des réponses publiques"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache_stats())
+
+
+class MediaView(View):
+    """
+    Fichiers media : publics, ou réservés (PROTECTED_MEDIA) aux utilisateurs
+    autorisés, authentifiés par session (admin) ou par JWT.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+
+    def get_user(self, request):
+        if request.user.is_authenticated:
+            return request.user
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except (AuthenticationFailed, InvalidToken):
+            return None
+        return authenticated[0] if authenticated else None
+
+    def get(self, request, name):
+        try:
+            path = default_storage.path(name)
+            stat = os.stat(path)
+        except (SuspiciousFileOperation, OSError):
+            raise Http404
+        if not S_ISREG(stat.st_mode):
+            raise Http404
+
+        rule = access_rule(name)
+        if rule is not None:
+            user = self.get_user(request)
+            # 404 plutôt que 403 : l'existence du fichier n'est pas révélée
+            if user is None or not rule(user, name):
+                raise Http404
+
+        return serve_media(request, name, path, stat)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_fields = 'djando.db.models.BigAutoField'
     name = 'apps.events'
+
+    def ready(self):
+        from apps.core.response_cache import connect_response_caches
+        connect_response_caches(self)
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_event_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='tickettype',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
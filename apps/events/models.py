@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Event(models.Model):
     CATEGORY_CHOICES = [
@@ -15,26 +16,54 @@ class Event(models.Model):
     location = models.CharField(max_length=255)
     event_date = models.DateTimeField()
     image = models.ImageField(upload_to="events/")
+    # Déclinaisons WebP/JPEG par largeur (apps.core.images)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     organizer = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name="organized_events"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["event_date", "id"]),
+            models.Index(fields=["created_at", "id"]),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        from apps.core.images import sync_variants
+        sync_variants(self, 'image', 'image_variants')
+        super().save(*args, **kwargs)
+
 
 class TicketType(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="ticket_types")
     name = models.CharField(max_length=100)  # VIP, Standard
     price = models.DecimalField(max_digits=10, decimal_places=2)
     quantity = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.event.title} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.touch_event()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.touch_event()
+        return result
+
+    def touch_event(self):
+        """Les types de billets (et leur stock) sont servis avec l'événement"""
+        Event.objects.filter(pk=self.event_id).update(updated_at=timezone.now())
+
 
 class Ticket(models.Model):
     ticket_type = models.ForeignKey(TicketType, on_delete=models.CASCADE)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Event, TicketType, Ticket
+from apps.core.serializers import ImageVariantsField
 
 class TicketTypeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -9,6 +10,7 @@ class TicketTypeSerializer(serializers.ModelSerializer):
 
 class EventSerializer(serializers.ModelSerializer):
     ticket_types = TicketTypeSerializer(many=True, read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Event
@@ -3,21 +3,36 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from .models import Event, TicketType, Ticket
 from .serializers import EventSerializer, TicketSerializer
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.response_cache import EVENT_RESPONSES, cache_response
 
 
 # Liste publique
-class EventListView(generics.ListAPIView):
+class EventListView(ConditionalGetMixin, generics.ListAPIView):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [permissions.AllowAny]
+    cache_control = {'public': True, 'max_age': 60}
+    pagination_class = KeysetPagination
+    sort_fields = {'event_date': 'event_date', 'created_at': 'created_at'}
+    default_ordering = 'event_date'
+
+    @cache_response(EVENT_RESPONSES)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
 # Détail public
-class EventDetailView(generics.RetrieveAPIView):
+class EventDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [permissions.AllowAny]
 
+    @cache_response(EVENT_RESPONSES)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 
 # Création événement (organisateur)
 class EventCreateView(generics.CreateAPIView):
@@ -1,6 +1,6 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
 from django.utils.html import format_html
-from django.utils import timezone
 from .models import Payment, Refund, Payout
 
 
@@ -104,15 +104,12 @@ class PaymentAdmin(admin.ModelAdmin):
         """Approuver les paiements sélectionnés"""
         count = 0
         for payment in queryset.filter(status='processing'):
-            payment.status = 'COMPLETED'
-            payment.verified_by = request.user
-            payment.verified_at = timezone.now()
-            payment.completed_at = timezone.now()
-            payment.save()
-            
-            # Marquer la réservation comme payée
-            payment.booking.status = 'paid'
-            payment.booking.save()
+            # Paiement complété et réservation payée, ou rien si les dates sont prises
+            try:
+                payment.approve(request.user)
+            except ValidationError as exc:
+                self.message_user(request, f"❌ {payment.transaction_id} : {exc.messages[0]}", messages.ERROR)
+                continue
             count += 1
         
         self.message_user(request, f"✅ {count} paiement(s) approuvé(s)")
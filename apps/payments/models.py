@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 import uuid
 
 
@@ -155,10 +157,20 @@ class Payment(models.Model):
         verbose_name = 'paiement'
         verbose_name_plural = 'paiements'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
     
     def __str__(self):
         return f"Paiement {self.transaction_id} - {self.amount} FCFA ({self.get_status_display()})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Statut chargé, pour détecter le passage à COMPLETED au prochain save()
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
     def save(self, *args, **kwargs):
         if not self.transaction_id:
             self.transaction_id = f"PAY-{uuid.uuid4().hex[:12].upper()}"
@@ -168,7 +180,18 @@ class Payment(models.Model):
             self.platform_commission = float(self.amount) * commission_rate
             self.owner_amount = float(self.amount) - self.platform_commission
         
-        super().save(*args, **kwargs)
+        from apps.bookings.models import OwnerStats
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            # Statistiques propriétaire : paiements complétés
+            was_completed = getattr(self, '_loaded_status', None) == 'COMPLETED'
+            is_completed = self.status == 'COMPLETED'
+            if was_completed != is_completed:
+                OwnerStats.record_payment(self, 1 if is_completed else -1)
+        
+        self._loaded_status = self.status
     
     def mark_as_completed(self):
         from django.utils import timezone
@@ -181,6 +204,29 @@ class Payment(models.Model):
             self.booking.confirmed_at = timezone.now()
             self.booking.save()
     
+    def approve(self, verified_by):
+        """
+        Validation manuelle : paiement complété et réservation payée, ensemble.
+        Si les dates ont été reprises entre-temps (contrainte de chevauchement
+        des réservations), rien n'est validé et ValidationError est levée.
+        """
+        from django.utils import timezone
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                self.status = 'COMPLETED'
+                self.verified_by = verified_by
+                self.verified_at = now
+                self.completed_at = now
+                self.save()
+
+                self.booking.status = 'paid'
+                self.booking.save()
+        except IntegrityError as exc:
+            if 'bookings_booking_no_overlap' not in str(exc):
+                raise
+            raise ValidationError("Les dates de cette réservation ne sont plus disponibles")
+    
     def mark_as_failed(self, error_message=''):
         self.status = 'FAILED'
         self.error_message = error_message
@@ -1,3 +1,50 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.bookings.tests import make_booking, make_residence, make_user
+
+from .models import Payment
+
+
+class PaymentApprovalTests(TestCase):
+    def setUp(self):
+        self.client_user = make_user('client')
+        self.residence = make_residence(make_user('owner', 'proprietaire'))
+        self.booking = make_booking(self.client_user, self.residence, status='pending_payment_validation')
+        self.payment = Payment.objects.create(
+            booking=self.booking, user=self.client_user, amount=Decimal('150000'), status='processing',
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(make_user('admin', is_staff=True))
+
+    def test_booking_under_validation_blocks_its_dates(self):
+        other = APIClient()
+        other.force_authenticate(make_user('other'))
+        response = other.post('/api/bookings/', {
+            'residence': self.residence.pk,
+            'start_date': self.booking.start_date.isoformat(),
+            'end_date': self.booking.end_date.isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.api.post(f'/api/payments/{self.payment.pk}/verify/', {'action': 'approve'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'paid')
+
+    def test_approval_of_taken_dates_is_refused(self):
+        self.booking.status = 'cancelled'
+        self.booking.save()
+        make_booking(make_user('other'), self.residence)
+
+        with self.assertRaises(ValidationError):
+            self.payment.approve(None)
 
-# Create your tests here.
+        response = self.api.post(f'/api/payments/{self.payment.pk}/verify/', {'action': 'approve'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.payment.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertEqual((self.payment.status, self.booking.status), ('processing', 'cancelled'))
@@ -3,12 +3,13 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 
 from .models import Payment, Refund, Payout
 from .serializers import PaymentSerializer, RefundSerializer, PayoutSerializer
 from apps.bookings.models import Booking
+from apps.core.pagination import KeysetPagination
 
 
 # ✅ MODE PAIEMENT MANUEL ACTIVÉ
@@ -19,6 +20,8 @@ class PaymentViewSet(viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    sort_fields = {'created_at': 'created_at', 'id': 'id'}
 
     def get_queryset(self):
         # Les utilisateurs voient leurs paiements
@@ -136,15 +139,11 @@ class PaymentViewSet(viewsets.ModelViewSet):
         action_type = request.data.get('action')
         
         if action_type == 'approve':
-            payment.status = "COMPLETED"
-            payment.verified_by = request.user
-            payment.verified_at = timezone.now()
-            payment.completed_at = timezone.now()
-            payment.save()
-            
-            # Marquer la réservation comme payée
-            payment.booking.status = "paid"
-            payment.booking.save()
+            # Paiement complété et réservation payée, ou rien si les dates sont prises
+            try:
+                payment.approve(request.user)
+            except DjangoValidationError as exc:
+                return Response({"error": exc.messages[0]}, status=400)
             
             print(f"✅ Paiement {payment.transaction_id} approuvé par {request.user}")
             
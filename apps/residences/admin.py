@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from django.contrib import admin
-from .models import Residence, ResidenceImage, Availability
+from .models import Residence, ResidenceCluster, ResidenceImage, Availability
 
 
 class ResidenceImageInline(admin.TabularInline):
@@ -25,3 +25,10 @@ class ResidenceAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Availability)
+
+
+@admin.register(ResidenceCluster)
+class ResidenceClusterAdmin(admin.ModelAdmin):
+    list_display = ("cell", "precision", "count", "min_price", "max_price", "updated_at")
+    list_filter = ("precision",)
+    search_fields = ("cell",)
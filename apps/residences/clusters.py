@@ -0,0 +1,155 @@
+# apps/residences/clusters.py
+"""
+Clusters de résidences pour la carte.
+
+ResidenceCluster stocke, pour chaque précision geohash de CLUSTER_PRECISIONS
+et chaque cellule, le nombre de résidences actives, leur centroïde et leur
+fourchette de prix. Residence.save()/delete() ne recalculent que les cellules
+de l'ancienne et de la nouvelle position.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q
+from rest_framework import serializers
+
+from .geo import covering_cells, parse_bbox
+from .models import Residence, ResidenceCluster
+
+
+CLUSTER_PRECISIONS = range(1, 8)
+
+# Niveau de zoom de la carte (0-20) -> précision geohash des clusters
+ZOOM_PRECISIONS = [(2, 1), (5, 2), (7, 3), (10, 4), (12, 5), (15, 6)]
+
+
+def precision_for_zoom(zoom):
+    for max_zoom, precision in ZOOM_PRECISIONS:
+        if zoom <= max_zoom:
+            return precision
+    return CLUSTER_PRECISIONS[-1]
+
+
+def _cell_range(cell):
+    # '~' est après tout l'alphabet geohash : [cell, cell~) = préfixe cell
+    return Q(geohash__gte=cell, geohash__lt=cell + '~')
+
+
+def refresh_clusters(geohashes):
+    """Recalcule les clusters contenant ces positions (une requête par cellule)"""
+    cells = {
+        geohash[:precision]
+        for geohash in geohashes if geohash
+        for precision in CLUSTER_PRECISIONS
+    }
+
+    with transaction.atomic():
+        for cell in sorted(cells):
+            stats = Residence.objects.filter(_cell_range(cell), is_active=True).aggregate(
+                count=Count('id'),
+                latitude=Avg('latitude'),
+                longitude=Avg('longitude'),
+                min_price=Min('price_per_night'),
+                max_price=Max('price_per_night'),
+            )
+            if not stats['count']:
+                ResidenceCluster.objects.filter(precision=len(cell), cell=cell).delete()
+                continue
+
+            ResidenceCluster.objects.update_or_create(
+                precision=len(cell),
+                cell=cell,
+                defaults={
+                    'count': stats['count'],
+                    'latitude': stats['latitude'],
+                    'longitude': stats['longitude'],
+                    'min_price': stats['min_price'],
+                    'max_price': stats['max_price'],
+                },
+            )
+
+
+def aggregate_clusters(rows):
+    """
+    Args:
+        rows: itérable de (geohash, latitude, longitude, prix)
+
+    Returns:
+        dict: {cellule: {count, latitude, longitude, min_price, max_price}}
+    """
+    clusters = defaultdict(lambda: {
+        'count': 0, 'latitude': 0.0, 'longitude': 0.0, 'min_price': None, 'max_price': None,
+    })
+    for geohash, latitude, longitude, price in rows:
+        if not geohash:
+            continue
+        for precision in CLUSTER_PRECISIONS:
+            cluster = clusters[geohash[:precision]]
+            cluster['count'] += 1
+            cluster['latitude'] += float(latitude)
+            cluster['longitude'] += float(longitude)
+            if cluster['min_price'] is None or price < cluster['min_price']:
+                cluster['min_price'] = price
+            if cluster['max_price'] is None or price > cluster['max_price']:
+                cluster['max_price'] = price
+
+    for cluster in clusters.values():
+        cluster['latitude'] /= cluster['count']
+        cluster['longitude'] /= cluster['count']
+    return clusters
+
+
+def rebuild_clusters(residence_model=Residence, cluster_model=ResidenceCluster):
+    """Reconstruit tous les clusters (modèles historiques acceptés pour les migrations)"""
+    rows = residence_model.objects.filter(is_active=True).exclude(geohash='').values_list(
+        'geohash', 'latitude', 'longitude', 'price_per_night'
+    )
+    clusters = aggregate_clusters(rows.iterator())
+
+    with transaction.atomic():
+        cluster_model.objects.all().delete()
+        cluster_model.objects.bulk_create(
+            [
+                cluster_model(precision=len(cell), cell=cell, **values)
+                for cell, values in clusters.items()
+            ],
+            batch_size=500,
+        )
+    return len(clusters)
+
+
+def clusters_payload(query_params):
+    """
+    Clusters visibles pour ?zoom= (0-20) et ?bbox=min_lng,min_lat,max_lng,max_lat.
+    Sans bbox, tous les clusters de la précision demandée.
+    """
+    try:
+        zoom = int(query_params.get('zoom', 10))
+    except ValueError:
+        raise serializers.ValidationError({'zoom': "Entier attendu"})
+    precision = precision_for_zoom(max(0, min(zoom, 20)))
+
+    clusters = ResidenceCluster.objects.filter(precision=precision)
+
+    bbox = query_params.get('bbox')
+    if bbox:
+        visible = Q()
+        for cell in {cell[:precision] for cell in covering_cells(*parse_bbox(bbox))}:
+            visible |= Q(cell__gte=cell, cell__lt=cell + '~')
+        clusters = clusters.filter(visible)
+
+    return {
+        'precision': precision,
+        'clusters': [
+            {
+                'cell': cluster.cell,
+                'count': cluster.count,
+                'latitude': round(cluster.latitude, 6),
+                'longitude': round(cluster.longitude, 6),
+                'min_price': cluster.min_price,
+                'max_price': cluster.max_price,
+            }
+            for cluster in clusters
+        ],
+    }
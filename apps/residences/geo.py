@@ -0,0 +1,173 @@
+# apps/residences/geo.py
+"""
+Recherche géographique des résidences.
+
+Chaque résidence stocke le geohash de sa position (Residence.geohash, indexé).
+Une zone (rayon ou rectangle de carte) est couverte par quelques cellules
+geohash, chacune interrogée comme un intervalle sur l'index ; les bornes
+exactes de latitude / longitude puis la distance (haversine calculée par la
+base) affinent le résultat.
+"""
+
+import math
+
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+from rest_framework import serializers
+
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+EARTH_RADIUS_KM = 6371.0088
+
+DEFAULT_RADIUS_KM = 5
+MAX_RADIUS_KM = 50
+
+# Nombre maximum de cellules pour couvrir une zone
+MAX_CELLS = 16
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Geohash (base 32) d'un point"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(hauteur, largeur) en degrés d'une cellule geohash"""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def covering_cells(min_lat, min_lng, max_lat, max_lng):
+    """
+    Cellules geohash couvrant le rectangle, à la précision la plus fine
+    qui reste sous MAX_CELLS cellules.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = cell_size(precision)
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        columns = math.floor(max_lng / lng_step) - math.floor(min_lng / lng_step) + 1
+        if rows * columns <= MAX_CELLS:
+            break
+
+    cells = set()
+    for row in range(rows):
+        latitude = min(min_lat + row * lat_step, max_lat)
+        for column in range(columns):
+            longitude = min(min_lng + column * lng_step, max_lng)
+            cells.add(geohash_encode(latitude, longitude, precision))
+    return sorted(cells)
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    """Rectangle (min_lat, min_lng, max_lat, max_lng) englobant un cercle"""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    lng_delta = min(lat_delta / cos_lat, 180.0)
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lng_delta, 180.0),
+    )
+
+
+def filter_bbox(queryset, min_lat, min_lng, max_lat, max_lng):
+    """Résidences situées dans le rectangle, via l'index geohash"""
+    cells = Q()
+    for cell in covering_cells(min_lat, min_lng, max_lat, max_lng):
+        # '~' est après tout l'alphabet geohash : [cell, cell~) = préfixe cell
+        cells |= Q(geohash__gte=cell, geohash__lt=cell + '~')
+
+    return queryset.filter(
+        cells,
+        latitude__gte=min_lat,
+        latitude__lte=max_lat,
+        longitude__gte=min_lng,
+        longitude__lte=max_lng,
+    )
+
+
+def haversine_km(latitude, longitude):
+    """Expression ORM : distance (km) entre la résidence et le point donné"""
+    lat = math.radians(latitude)
+    d_lat = Radians(F('latitude')) - lat
+    d_lng = Radians(F('longitude')) - math.radians(longitude)
+    a = (
+        Power(Sin(d_lat / 2), 2)
+        + Cos(Radians(F('latitude'))) * math.cos(lat) * Power(Sin(d_lng / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
+
+
+def _float_param(query_params, name, low, high):
+    try:
+        value = float(query_params[name])
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({name: "Nombre invalide"})
+    if not math.isfinite(value) or not low <= value <= high:
+        raise serializers.ValidationError({name: f"Doit être compris entre {low} et {high}"})
+    return value
+
+
+def parse_bbox(value):
+    """
+    ?bbox=min_lng,min_lat,max_lng,max_lat -> (min_lat, min_lng, max_lat, max_lng)
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    except ValueError:
+        raise serializers.ValidationError({'bbox': "Format attendu : min_lng,min_lat,max_lng,max_lat"})
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180):
+        raise serializers.ValidationError({'bbox': "Rectangle invalide"})
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def filter_location(queryset, query_params):
+    """
+    Applique ?lat=&lng=&radius= (km) ou ?bbox=min_lng,min_lat,max_lng,max_lat.
+
+    Avec un rayon, les résultats sont annotés de distance_km et triés du plus
+    proche au plus éloigné.
+    """
+    bbox = query_params.get('bbox')
+    if bbox:
+        queryset = filter_bbox(queryset, *parse_bbox(bbox))
+
+    if 'lat' in query_params or 'lng' in query_params:
+        latitude = _float_param(query_params, 'lat', -90, 90)
+        longitude = _float_param(query_params, 'lng', -180, 180)
+        radius = (
+            _float_param(query_params, 'radius', 0, MAX_RADIUS_KM)
+            if 'radius' in query_params else DEFAULT_RADIUS_KM
+        )
+        queryset = (
+            filter_bbox(queryset, *radius_bbox(latitude, longitude, radius))
+            .annotate(distance_km=haversine_km(latitude, longitude))
+            .filter(distance_km__lte=radius)
+            .order_by('distance_km')
+        )
+
+    return queryset
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.residences.clusters import rebuild_clusters
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les clusters de résidences (carte) à partir des résidences actives"
+
+    def handle(self, *args, **options):
+        cells = rebuild_clusters()
+        self.stdout.write(self.style.SUCCESS(f"{cells} cellule(s) reconstruite(s)"))
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-17 23:05
+
+from django.db import migrations, models
+
+
+def populate_geohash(apps, schema_editor):
+    from apps.residences.geo import geohash_encode
+
+    Residence = apps.get_model('residences', 'Residence')
+    residences = list(
+        Residence.objects.filter(latitude__isnull=False, longitude__isnull=False)
+        .only('id', 'latitude', 'longitude')
+    )
+    for residence in residences:
+        residence.geohash = geohash_encode(residence.latitude, residence.longitude)
+    Residence.objects.bulk_update(residences, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residences', '0003_residenceimage_platform_fee_percentage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='residence',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, verbose_name='geohash'),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-17 23:40
+
+from django.db import migrations, models
+
+
+def populate_clusters(apps, schema_editor):
+    from apps.residences.clusters import rebuild_clusters
+
+    rebuild_clusters(
+        apps.get_model('residences', 'Residence'),
+        apps.get_model('residences', 'ResidenceCluster'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residences', '0004_residence_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResidenceCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('precision', models.PositiveSmallIntegerField(verbose_name='précision')),
+                ('cell', models.CharField(max_length=12, verbose_name='cellule geohash')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='nombre de résidences')),
+                ('latitude', models.FloatField(verbose_name='latitude du centroïde')),
+                ('longitude', models.FloatField(verbose_name='longitude du centroïde')),
+                ('min_price', models.DecimalField(decimal_places=0, max_digits=10, verbose_name='prix minimum (FCFA)')),
+                ('max_price', models.DecimalField(decimal_places=0, max_digits=10, verbose_name='prix maximum (FCFA)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='dernière mise à jour')),
+            ],
+            options={
+                'verbose_name': 'cluster de résidences',
+                'verbose_name_plural': 'clusters de résidences',
+                'ordering': ['precision', 'cell'],
+                'unique_together': {('precision', 'cell')},
+            },
+        ),
+        migrations.RunPython(populate_clusters, migrations.RunPython.noop),
+    ]
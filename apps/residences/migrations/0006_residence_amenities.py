@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-18 00:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Ordre des bits de Residence.AMENITY_FIELDS au moment de la migration
+AMENITY_FIELDS = [
+    'has_wifi', 'has_ac', 'has_tv', 'has_kitchen', 'has_parking',
+    'has_pool', 'has_security', 'has_generator', 'allow_pets', 'allow_smoking',
+]
+
+
+def populate_amenities(apps, schema_editor):
+    Residence = apps.get_model('residences', 'Residence')
+    mask = sum(
+        (
+            models.Case(
+                models.When(**{field: True}, then=models.Value(1 << index)),
+                default=models.Value(0),
+            )
+            for index, field in enumerate(AMENITY_FIELDS)
+        ),
+        models.Value(0),
+    )
+    Residence.objects.update(amenities=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residences', '0005_residencecluster'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='residence',
+            name='amenities',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='équipements (masque)'),
+        ),
+        migrations.RunPython(populate_amenities, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='residence',
+            index=models.Index(fields=['city', 'price_per_night', 'amenities'], name='residences__city_1e8d6f_idx'),
+        ),
+    ]
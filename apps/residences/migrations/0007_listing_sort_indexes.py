@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 00:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residences', '0006_residence_amenities'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='residence',
+            index=models.Index(fields=['price_per_night', 'id'], name='residences__price_p_91b964_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='residence',
+            index=models.Index(fields=['rating_average', 'id'], name='residences__rating__cd6dde_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='residence',
+            index=models.Index(fields=['created_at', 'id'], name='residences__created_c7337b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='residence',
+            index=models.Index(fields=['bookings_count', 'id'], name='residences__booking_108721_idx'),
+        ),
+    ]
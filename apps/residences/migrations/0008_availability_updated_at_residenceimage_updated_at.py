@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residences', '0007_listing_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availability',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='dernière modification'),
+        ),
+        migrations.AddField(
+            model_name='residenceimage',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='dernière modification'),
+        ),
+    ]
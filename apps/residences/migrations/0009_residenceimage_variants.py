@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residences', '0008_availability_updated_at_residenceimage_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='residenceimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='déclinaisons'),
+        ),
+    ]
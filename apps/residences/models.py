@@ -3,6 +3,7 @@ from django.db import models
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 
 class Residence(models.Model):
@@ -55,6 +56,8 @@ class Residence(models.Model):
         null=True,
         blank=True
     )
+    # Geohash de (latitude, longitude), indexé pour la recherche par zone (geo.py)
+    geohash = models.CharField('geohash', max_length=12, blank=True, db_index=True, editable=False)
     
     # Caractéristiques
     bedrooms = models.PositiveIntegerField('nombre de chambres', default=1)
@@ -90,6 +93,9 @@ class Residence(models.Model):
     # Règles
     allow_pets = models.BooleanField('Animaux autorisés', default=False)
     allow_smoking = models.BooleanField('Fumeur autorisé', default=False)
+    
+    # Masque des équipements ci-dessus (voir AMENITY_FIELDS), maintenu par save()
+    amenities = models.PositiveIntegerField('équipements (masque)', default=0, editable=False)
     min_nights = models.PositiveIntegerField('nombre minimum de nuits', default=1)
     
     # Statut
@@ -116,15 +122,166 @@ class Residence(models.Model):
         verbose_name = 'résidence'
         verbose_name_plural = 'résidences'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['city', 'price_per_night', 'amenities']),
+            # Tris paginés par curseur (clé de tri, id)
+            models.Index(fields=['price_per_night', 'id']),
+            models.Index(fields=['rating_average', 'id']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['bookings_count', 'id']),
+        ]
     
+    # ?amenities=wifi,ac -> bit de chaque équipement dans `amenities` (ne pas réordonner)
+    AMENITY_FIELDS = {
+        'wifi': 'has_wifi',
+        'ac': 'has_ac',
+        'tv': 'has_tv',
+        'kitchen': 'has_kitchen',
+        'parking': 'has_parking',
+        'pool': 'has_pool',
+        'security': 'has_security',
+        'generator': 'has_generator',
+        'pets': 'allow_pets',
+        'smoking': 'allow_smoking',
+    }
+
+    @classmethod
+    def amenity_mask(cls, names):
+        """Masque des équipements nommés (noms inconnus ignorés)"""
+        return sum(
+            1 << index
+            for index, name in enumerate(cls.AMENITY_FIELDS)
+            if name in names
+        )
+
+    def get_amenities_mask(self):
+        return sum(
+            1 << index
+            for index, field in enumerate(self.AMENITY_FIELDS.values())
+            if getattr(self, field)
+        )
+    
+    def sync_bookings_owner(self):
+        """Met à jour listing_owner des réservations et les statistiques concernées"""
+        previous_owners = set(
+            self.bookings.exclude(listing_owner_id=self.owner_id)
+            .values_list('listing_owner_id', flat=True).order_by().distinct()
+        )
+        if not previous_owners:
+            return
+
+        self.bookings.exclude(listing_owner_id=self.owner_id).update(listing_owner_id=self.owner_id)
+
+        from apps.bookings.stats import rebuild_owner_stats, invalidate_owner_stats
+        owner_ids = [owner_id for owner_id in previous_owners if owner_id] + [self.owner_id]
+        rebuild_owner_stats(owner_ids=owner_ids)
+        for owner_id in owner_ids:
+            invalidate_owner_stats(owner_id)
+
     def __str__(self):
         return f"{self.title} - {self.get_city_display()}"
     
-    def get_total_price(self, nights):
-        """Calcule le prix total pour un nombre de nuits donné"""
+    # Champs agrégés dans ResidenceCluster
+    CLUSTER_FIELDS = ('geohash', 'latitude', 'longitude', 'price_per_night', 'is_active')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Position chargée, pour mettre à jour les clusters au prochain save()
+        if all(field in instance.__dict__ for field in cls.CLUSTER_FIELDS):
+            instance._loaded_cluster_state = instance.get_cluster_state()
+        return instance
+
+    def get_cluster_state(self):
+        return tuple(getattr(self, field) for field in self.CLUSTER_FIELDS)
+
+    def refresh_clusters(self):
+        """Recalcule les clusters de l'ancienne et de la nouvelle position si besoin"""
+        loaded = getattr(self, '_loaded_cluster_state', None)
+        state = self.get_cluster_state()
+        if loaded == state:
+            return
+
+        from .clusters import refresh_clusters
+        refresh_clusters([self.geohash, loaded[0] if loaded else ''])
+        self._loaded_cluster_state = state
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+
+        from .geo import geohash_encode
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geohash_encode(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        self.amenities = self.get_amenities_mask()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'geohash', 'amenities'}
+
+        super().save(*args, **kwargs)
+
+        # Répercuter un changement de propriétaire sur les réservations
+        if not adding:
+            self.sync_bookings_owner()
+
+        from apps.bookings.stats import invalidate_owner_stats
+        invalidate_owner_stats(self.owner_id)
+
+        from apps.core.facets import RESIDENCE_FACETS
+        RESIDENCE_FACETS.invalidate()
+
+        self.refresh_clusters()
+
+    def delete(self, *args, **kwargs):
+        geohash = self.geohash
+        result = super().delete(*args, **kwargs)
+
+        from .clusters import refresh_clusters
+        refresh_clusters([geohash])
+
+        from apps.core.facets import RESIDENCE_FACETS
+        RESIDENCE_FACETS.invalidate()
+        return result
+    
+    def get_total_price(self, nights, start_date=None):
+        """
+        Calcule le prix total pour un nombre de nuits donné.
+        Avec start_date, applique les prix personnalisés et les règles tarifaires.
+        """
+        if start_date is not None:
+            from datetime import timedelta
+            from apps.bookings.pricing import quote_stay
+            end_date = start_date + timedelta(days=nights)
+            return quote_stay(self, start_date, end_date)["total_price"]
         return (self.price_per_night * nights) + self.cleaning_fee
 
 
+class ResidenceCluster(models.Model):
+    """
+    Agrégat des résidences actives d'une cellule geohash, pour la carte.
+    Maintenu par Residence.save()/delete(), reconstruit par
+    `manage.py rebuild_residence_clusters`.
+    """
+
+    precision = models.PositiveSmallIntegerField('précision')
+    cell = models.CharField('cellule geohash', max_length=12)
+    count = models.PositiveIntegerField('nombre de résidences', default=0)
+    latitude = models.FloatField('latitude du centroïde')
+    longitude = models.FloatField('longitude du centroïde')
+    min_price = models.DecimalField('prix minimum (FCFA)', max_digits=10, decimal_places=0)
+    max_price = models.DecimalField('prix maximum (FCFA)', max_digits=10, decimal_places=0)
+    updated_at = models.DateTimeField('dernière mise à jour', auto_now=True)
+
+    class Meta:
+        verbose_name = 'cluster de résidences'
+        verbose_name_plural = 'clusters de résidences'
+        unique_together = ['precision', 'cell']
+        ordering = ['precision', 'cell']
+
+    def __str__(self):
+        return f"{self.cell} ({self.count})"
+
+
 class ResidenceImage(models.Model):
     """Images des résidences"""
     
@@ -135,11 +292,14 @@ class ResidenceImage(models.Model):
         verbose_name='résidence'
     )
     image = models.ImageField('image', upload_to='residences/')
+    # Déclinaisons WebP/JPEG par largeur (apps.core.images)
+    variants = models.JSONField('déclinaisons', default=dict, blank=True, editable=False)
     caption = models.CharField('légende', max_length=200, blank=True)
     is_primary = models.BooleanField('image principale', default=False)
     order = models.PositiveIntegerField('ordre', default=0)
     
     created_at = models.DateTimeField('date d\'ajout', auto_now_add=True)
+    updated_at = models.DateTimeField('dernière modification', auto_now=True)
     
     platform_fee_percentage = models.DecimalField(
         max_digits=5,
@@ -156,6 +316,9 @@ class ResidenceImage(models.Model):
         return f"Image de {self.residence.title}"
     
     def save(self, *args, **kwargs):
+        from apps.core.images import sync_variants
+        sync_variants(self, 'image')
+        
         # Si c'est marqué comme image principale, retirer le flag des autres
         if self.is_primary:
             ResidenceImage.objects.filter(
@@ -163,6 +326,16 @@ class ResidenceImage(models.Model):
                 is_primary=True
             ).exclude(id=self.id).update(is_primary=False)
         super().save(*args, **kwargs)
+        self.touch_residence()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.touch_residence()
+        return result
+    
+    def touch_residence(self):
+        """Les images font partie de la résidence : sa date de modification (ETag) change"""
+        Residence.objects.filter(pk=self.residence_id).update(updated_at=timezone.now())
 
 
 
@@ -185,6 +358,7 @@ class Availability(models.Model):
         blank=True,
         help_text='Laisser vide pour utiliser le prix par défaut'
     )
+    updated_at = models.DateTimeField('dernière modification', auto_now=True)
     
     class Meta:
         verbose_name = 'disponibilité'
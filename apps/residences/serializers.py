@@ -1,9 +1,14 @@
 from .models import Residence, ResidenceImage, Availability
+from django.db.models import OuterRef, Subquery
 from rest_framework import serializers
 from apps.accounts.serializers import OwnerPublicSerializer
+from apps.core.images import bulk_add_images, smallest_variant
+from apps.core.serializers import ImageVariantsField, SparseFieldsetMixin, media_url
 
 
 class ResidenceImageSerializer(serializers.ModelSerializer):
+    variants = ImageVariantsField()
+
     class Meta:
         model = ResidenceImage
         fields = "__all__"
@@ -15,8 +20,10 @@ class AvailabilitySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class ResidenceSerializer(serializers.ModelSerializer):
+class ResidenceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     owner = OwnerPublicSerializer(read_only=True) 
+    # Présent uniquement pour une recherche par rayon (?lat=&lng=)
+    distance_km = serializers.FloatField(read_only=True)
 
     images = ResidenceImageSerializer(many=True, read_only=True)
     uploaded_images = serializers.ListField(
@@ -34,11 +41,67 @@ class ResidenceSerializer(serializers.ModelSerializer):
         uploaded_images = validated_data.pop("uploaded_images", [])
 
         residence = Residence.objects.create(**validated_data)
-
-        for image in uploaded_images:
-            ResidenceImage.objects.create(
-                residence=residence,
-                image=image
-            )
+        bulk_add_images(residence.images, uploaded_images)
 
         return residence
+
+
+class ResidenceCardSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Carte de résidence pour les listes (grille, carte).
+    Le queryset doit être annoté de `thumbnail_path` et `thumbnail_variants` (voir card_queryset).
+    """
+
+    thumbnail = serializers.SerializerMethodField()
+    distance_km = serializers.FloatField(read_only=True)
+
+    # Colonnes chargées par .only() (champs de la carte + clés de tri)
+    ONLY_FIELDS = [
+        "id", "title", "type", "city", "neighborhood", "latitude", "longitude",
+        "bedrooms", "bathrooms", "capacity",
+        "has_wifi", "has_ac", "has_pool", "has_parking",
+        "price_per_night", "rating_average", "reviews_count",
+        "bookings_count", "created_at",
+    ]
+
+    class Meta:
+        model = Residence
+        fields = [
+            "id",
+            "title",
+            "type",
+            "city",
+            "neighborhood",
+            "latitude",
+            "longitude",
+            "bedrooms",
+            "bathrooms",
+            "capacity",
+            "has_wifi",
+            "has_ac",
+            "has_pool",
+            "has_parking",
+            "price_per_night",
+            "rating_average",
+            "reviews_count",
+            "thumbnail",
+            "distance_km",
+        ]
+        read_only_fields = fields
+
+    @classmethod
+    def card_queryset(cls, queryset):
+        """Colonnes de la carte + chemin de l'image principale, en une requête"""
+        first_image = ResidenceImage.objects.filter(
+            residence=OuterRef('pk')
+        ).order_by('-is_primary', 'order', 'id')
+        return queryset.only(*cls.ONLY_FIELDS).annotate(
+            thumbnail_path=Subquery(first_image.values('image')[:1]),
+            thumbnail_variants=Subquery(first_image.values('variants')[:1]),
+        )
+
+    def get_thumbnail(self, obj):
+        # Plus petite déclinaison si elle est générée, sinon l'original
+        path = smallest_variant(getattr(obj, "thumbnail_variants", None))
+        return media_url(self.context.get("request"), path or getattr(obj, "thumbnail_path", None))
+
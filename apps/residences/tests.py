@@ -1,3 +1,189 @@
+import json
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache, caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bookings.tests import make_booking, make_residence, make_user
+
+from apps.core.facets import RESIDENCE_FACETS
+
+from .models import Availability, Residence
+
+
+def cursor(data):
+    return urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        owner = make_user('owner', 'proprietaire')
+        for price in (10000, 20000, 30000):
+            make_residence(owner, price_per_night=Decimal(price))
+        self.api = APIClient()
+
+    def test_pages_follow_cursor(self):
+        first = self.api.get('/api/residences/', {'ordering': 'price', 'page_size': 2}).json()
+        second = self.api.get(first['next']).json()
+
+        prices = [item['price_per_night'] for item in first['results'] + second['results']]
+        self.assertEqual([Decimal(price) for price in prices], [10000, 20000, 30000])
+
+    def test_tampered_cursor_value_is_not_found(self):
+        for ordering, value in (('price', 'notanumber'), ('price', 'NaN'), ('created_at', 'hier'), ('price', None)):
+            with self.subTest(ordering=ordering, value=value):
+                response = self.api.get('/api/residences/', {
+                    'ordering': ordering, 'cursor': cursor({'v': value, 'i': 1}),
+                })
+                self.assertEqual(response.status_code, 404)
+
+    def test_malformed_cursor_is_not_found(self):
+        for token in ('!!!', cursor([1, 2]), cursor({'v': 1, 'i': 'x'})):
+            with self.subTest(token=token):
+                response = self.api.get('/api/residences/', {'ordering': 'price', 'cursor': token})
+                self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.owner = make_user('owner', 'proprietaire', wave_number='0700000000')
+        self.residence = make_residence(self.owner)
+        self.api = APIClient()
+
+    def test_owner_profile_change_refreshes_detail(self):
+        url = f'/api/residences/{self.residence.pk}/'
+        first = self.api.get(url)
+
+        self.owner.wave_number = '0799999999'
+        self.owner.save()
+
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.json()['owner']['wave_number'], '0799999999')
+
+    def test_login_keeps_detail_cached(self):
+        url = f'/api/residences/{self.residence.pk}/'
+        self.api.get(url)
+
+        self.owner.save(update_fields=['last_login'])
+
+        self.assertEqual(self.api.get(url)['X-Cache'], 'HIT')
+
+    def test_cached_list_needs_no_query(self):
+        first = self.api.get('/api/residences/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            response = self.api.get('/api/residences/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response['ETag'], first['ETag'])
+
+    def test_cached_list_keeps_requester_origin(self):
+        make_residence(self.owner, title='Autre villa')
+        self.api.get('/api/residences/', {'page_size': 1}, HTTP_HOST='internal.local')
+
+        response = self.api.get('/api/residences/', {'page_size': 1}, HTTP_HOST='zando.example', secure=True)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertTrue(response.json()['next'].startswith('https://zando.example/'))
+
+    def test_list_revalidation(self):
+        etag = self.api.get('/api/residences/')['ETag']
+
+        self.assertEqual(self.api.get('/api/residences/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        make_residence(self.owner, title='Autre villa')
+        self.assertEqual(self.api.get('/api/residences/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AvailabilityFilterTests(TestCase):
+    """?start_date=&end_date= : biens libres sur la période, en requêtes constantes"""
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.owner = make_user('owner', 'proprietaire')
+        self.client_user = make_user('client')
+        self.free = make_residence(self.owner, title='Libre')
+        self.api = APIClient()
+        self.start = timezone.now().date() + timedelta(days=10)
+        self.period = {'start_date': self.start.isoformat(), 'end_date': (self.start + timedelta(days=3)).isoformat()}
+
+    def available_titles(self):
+        caches['responses'].clear()
+        response = self.api.get('/api/residences/', self.period)
+        return sorted(item['title'] for item in response.json()['results'])
+
+    def test_unavailable_residences_are_excluded(self):
+        make_booking(self.client_user, make_residence(self.owner, title='Réservée'), days_from_now=11, nights=1)
+        make_booking(self.client_user, make_residence(self.owner, title='Annulée'), status='cancelled')
+        make_booking(self.client_user, make_residence(self.owner, title='Après'), days_from_now=13)
+        Availability.objects.create(
+            residence=make_residence(self.owner, title='Fermée'), date=self.start + timedelta(days=2), is_available=False,
+        )
+        make_residence(self.owner, title='Séjour trop court', min_nights=4)
+
+        self.assertEqual(self.available_titles(), ['Annulée', 'Après', 'Libre'])
+
+    def test_query_count_does_not_grow_with_listings(self):
+        make_booking(self.client_user, make_residence(self.owner, title='Réservée'))
+        with CaptureQueriesContext(connection) as few:
+            self.available_titles()
+
+        for index in range(5):
+            residence = make_residence(self.owner, title=f'Villa {index}')
+            if index % 2:
+                make_booking(self.client_user, residence)
+        with CaptureQueriesContext(connection) as many:
+            titles = self.available_titles()
+
+        self.assertEqual(len(titles), 4)
+        self.assertEqual(len(many), len(few))
+
+
+class FacetCountTests(TestCase):
+    """Comptes par facette : une requête, plus une par facette à choix filtrée"""
+
+    def setUp(self):
+        cache.clear()
+        owner = make_user('owner', 'proprietaire')
+        (self.city, _), (self.other_city, _) = Residence.CITY_CHOICES[:2]
+        (self.type, _), (self.other_type, _) = Residence.TYPE_CHOICES[:2]
+        make_residence(owner, city=self.city, type=self.type, has_pool=True)
+        make_residence(owner, city=self.city, type=self.other_type)
+        make_residence(owner, city=self.other_city, type=self.type, has_pool=True)
+
+    def counts(self, **params):
+        return RESIDENCE_FACETS.counts(Residence.objects.filter(is_active=True), params)
+
+    def count_of(self, counts, facet, value):
+        return next(item['count'] for item in counts[facet] if item['value'] == value)
+
+    def test_unfiltered_counts_are_cached(self):
+        with self.assertNumQueries(1):
+            counts = self.counts()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.counts(), counts)
+        self.assertEqual(self.count_of(counts, 'city', self.city), 2)
+        self.assertEqual(self.count_of(counts, 'amenities', 'has_pool'), 2)
+
+    def test_filtered_choice_facet_keeps_other_choices(self):
+        with self.assertNumQueries(3):
+            counts = self.counts(city=self.city, type=self.type)
+
+        # city est compté sous le seul filtre type, et inversement
+        self.assertEqual(self.count_of(counts, 'city', self.other_city), 1)
+        self.assertEqual(self.count_of(counts, 'type', self.other_type), 1)
+        self.assertEqual(self.count_of(counts, 'amenities', 'has_pool'), 1)
 
-# Create your tests here.
+    def test_boolean_facet_adds_no_query(self):
+        with self.assertNumQueries(1):
+            counts = self.counts(has_pool='1')
+        self.assertEqual(self.count_of(counts, 'city', self.other_city), 1)
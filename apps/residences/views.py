@@ -3,22 +3,53 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, F, OuterRef
+
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.response_cache import RESIDENCE_RESPONSES, cache_response
 
 from .models import Residence, ResidenceImage, Availability
-from .serializers import ResidenceSerializer, ResidenceImageSerializer, AvailabilitySerializer
+from .serializers import (
+    AvailabilitySerializer,
+    ResidenceCardSerializer,
+    ResidenceImageSerializer,
+    ResidenceSerializer,
+)
 
 
-class ResidenceViewSet(viewsets.ModelViewSet):
+class ResidenceViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Residence.objects.all()
     serializer_class = ResidenceSerializer
+    pagination_class = KeysetPagination
+    cache_control = {'public': True, 'max_age': 60}
+    # Profil public du propriétaire (numéros de paiement) imbriqué dans le détail
+    detail_related_last_modified = ('owner__updated_at',)
+    
+    # ?ordering=price | -price | -rating | -created_at | -bookings_count
+    sort_fields = {
+        'price': 'price_per_night',
+        'rating': 'rating_average',
+        'created_at': 'created_at',
+        'bookings_count': 'bookings_count',
+        'relevance': 'search_rank',
+        'distance': 'distance_km',
+    }
+    # Par défaut : distance (?lat=&lng=), pertinence (?q=), sinon les plus récentes
+    default_ordering = ('distance', '-relevance', '-created_at')
     
     def get_permissions(self):
         # ✅ Public pour voir, connexion pour créer/modifier
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'calendar', 'clusters']:
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
     
+    def get_serializer_class(self):
+        # Listes publiques : cartes légères ; détail et ?owner=me : sérialiseur complet
+        if self.action == 'list' and self.request.query_params.get('owner') != 'me':
+            return ResidenceCardSerializer
+        return ResidenceSerializer
+    
     def get_queryset(self):
         qs = Residence.objects.filter(is_active=True)  # ✅ Afficher seulement les actives par défaut
         
@@ -31,8 +62,60 @@ class ResidenceViewSet(viewsets.ModelViewSet):
         if owner_id:
             qs = qs.filter(owner_id=owner_id)
         
+        # Disponibilité sur une période : ?start_date=...&end_date=...
+        from apps.bookings.filters import get_requested_period, exclude_booked
+        period = get_requested_period(self.request.query_params)
+        if period:
+            start_date, end_date = period
+            blocked_days = Availability.objects.filter(
+                residence=OuterRef('pk'),
+                date__gte=start_date,
+                date__lt=end_date,
+                is_available=False,
+            )
+            qs = exclude_booked(qs, start_date, end_date).filter(
+                ~Exists(blocked_days),
+                min_nights__lte=(end_date - start_date).days,
+            )
+        
+        # Recherche plein texte : ?q=villa piscine assinie (triée par pertinence)
+        from apps.core.search import search
+        qs = search(qs, self.request.query_params.get('q'))
+        
+        # Équipements : ?amenities=wifi,ac,generator (tous requis, un seul ET binaire)
+        amenities = self.request.query_params.get('amenities')
+        if amenities:
+            mask = Residence.amenity_mask(amenities.split(','))
+            if mask:
+                qs = qs.alias(amenity_match=F('amenities').bitand(mask)).filter(amenity_match=mask)
+        
+        # Zone géographique : ?lat=&lng=&radius= (km) ou ?bbox=min_lng,min_lat,max_lng,max_lat
+        from .geo import filter_location
+        qs = filter_location(qs, self.request.query_params)
+        
+        # Facettes : ?city=abidjan,bouake&type=villa&has_pool=1
+        from apps.core.facets import RESIDENCE_FACETS
+        self.facet_base = qs
+        qs = RESIDENCE_FACETS.filter(qs, self.request.query_params)
+        
+        # Liste publique : colonnes des cartes et image principale seulement
+        if self.action == 'list':
+            qs = ResidenceCardSerializer.card_queryset(qs)
+        
         return qs
     
+    @cache_response(RESIDENCE_RESPONSES)
+    def list(self, request, *args, **kwargs):
+        # ?facets=1 : résultats + comptes par facette
+        if request.query_params.get('facets') in ('1', 'true'):
+            from apps.core.facets import faceted_list, RESIDENCE_FACETS
+            return faceted_list(self, RESIDENCE_FACETS)
+        return super().list(request, *args, **kwargs)
+    
+    @cache_response(RESIDENCE_RESPONSES)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         # ✅ Vérifier que l'utilisateur peut créer des RÉSIDENCES
         if not self.request.user.can_create_residences():
@@ -50,8 +133,31 @@ class ResidenceViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
         if instance.owner != self.request.user and not self.request.user.is_staff:
             raise permissions.PermissionDenied("Permission refusée")
+        # Bien déjà réservé : désactivé, l'historique des réservations est conservé
+        if instance.bookings.exists():
+            instance.is_active = False
+            instance.save(update_fields=['is_active', 'updated_at'])
+            return
         instance.delete()
     
+    @action(detail=True, methods=['get'])
+    def calendar(self, request, pk=None):
+        """
+        Dates indisponibles (plages fusionnées), avec ETag
+        GET /api/residences/{id}/calendar/?days=90&bitmask=1
+        """
+        from apps.bookings.calendars import calendar_response
+        return calendar_response(request, self.get_object())
+    
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        """
+        Clusters de résidences actives pour la carte (précalculés)
+        GET /api/residences/clusters/?zoom=11&bbox=min_lng,min_lat,max_lng,max_lat
+        """
+        from .clusters import clusters_payload
+        return Response(clusters_payload(request.query_params))
+    
     @action(detail=False, methods=['get'])
     def my_stats(self, request):
         if not request.user.is_authenticated:
@@ -67,37 +173,20 @@ class ResidenceViewSet(viewsets.ModelViewSet):
                 "active_bookings": 0,
             })
         
-        residences = Residence.objects.filter(owner=request.user)
-        
-        from apps.bookings.models import Booking
-        residence_ct = ContentType.objects.get_for_model(Residence)
-        my_residence_ids = list(residences.values_list('id', flat=True))
-        
-        stats = {
-            "total_residences": residences.count(),
-            "available": residences.filter(is_active=True).count(),
-            "unavailable": residences.filter(is_active=False).count(),
-            "total_bookings": Booking.objects.filter(
-                content_type=residence_ct,
-                object_id__in=my_residence_ids
-            ).count(),
-            "active_bookings": Booking.objects.filter(
-                content_type=residence_ct,
-                object_id__in=my_residence_ids,
-                status='confirmed'
-            ).count(),
-        }
+        from apps.bookings.stats import owner_listing_stats
+        stats = owner_listing_stats(request.user, Residence, 'residence')
         
         return Response(stats)
 
 
-class ResidenceImageViewSet(viewsets.ModelViewSet):
+class ResidenceImageViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ResidenceImage.objects.all()
     serializer_class = ResidenceImageSerializer
     permission_classes = [permissions.AllowAny]  # ✅ Images publiques
+    cache_control = {'public': True, 'max_age': 3600}
 
 
-class AvailabilityViewSet(viewsets.ModelViewSet):
+class AvailabilityViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Availability.objects.all()
     serializer_class = AvailabilitySerializer
     permission_classes = [permissions.AllowAny]  # ✅ Disponibilités publiques
\ No newline at end of file
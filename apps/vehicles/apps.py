@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class VehiclesConfig(AppConfig):
     name = 'apps.vehicles'
+
+    def ready(self):
+        from apps.core.search import install_search_indexes
+        post_migrate.connect(install_search_indexes, sender=self)
+
+        from apps.core.response_cache import connect_response_caches
+        connect_response_caches(self)
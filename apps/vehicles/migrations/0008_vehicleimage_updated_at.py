@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0007_listing_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicleimage',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
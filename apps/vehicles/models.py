@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from django.utils.text import slugify
 
 
@@ -113,6 +114,13 @@ class Vehicle(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Tris paginés par curseur (clé de tri, id)
+            models.Index(fields=['price_per_day', 'id']),
+            models.Index(fields=['created_at', 'id']),
+        ]
+
     # ======================
     # SAVE METHOD
     # ======================
@@ -135,8 +143,43 @@ class Vehicle(models.Model):
                 f"{self.brand}-{self.model}-{self.year}-{self.plate_number}"
             )
 
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
+        # Répercuter un changement de propriétaire sur les réservations
+        if not adding:
+            self.sync_bookings_owner()
+
+        from apps.bookings.stats import invalidate_owner_stats
+        invalidate_owner_stats(self.owner_id)
+
+        from apps.core.facets import VEHICLE_FACETS
+        VEHICLE_FACETS.invalidate()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+
+        from apps.core.facets import VEHICLE_FACETS
+        VEHICLE_FACETS.invalidate()
+        return result
+
+    def sync_bookings_owner(self):
+        """Met à jour listing_owner des réservations et les statistiques concernées"""
+        previous_owners = set(
+            self.bookings.exclude(listing_owner_id=self.owner_id)
+            .values_list('listing_owner_id', flat=True).order_by().distinct()
+        )
+        if not previous_owners:
+            return
+
+        self.bookings.exclude(listing_owner_id=self.owner_id).update(listing_owner_id=self.owner_id)
+
+        from apps.bookings.stats import rebuild_owner_stats, invalidate_owner_stats
+        owner_ids = [owner_id for owner_id in previous_owners if owner_id] + [self.owner_id]
+        rebuild_owner_stats(owner_ids=owner_ids)
+        for owner_id in owner_ids:
+            invalidate_owner_stats(owner_id)
+
     def __str__(self):
         return f"{self.brand} {self.model} ({self.year})"
 
@@ -149,16 +192,22 @@ class VehicleImage(models.Model):
     )
 
     image = models.ImageField(upload_to='vehicles/')
+    # Déclinaisons WebP/JPEG par largeur (apps.core.images)
+    variants = models.JSONField(default=dict, blank=True, editable=False)
     caption = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['order', '-is_primary']
 
     def save(self, *args, **kwargs):
+        from apps.core.images import sync_variants
+        sync_variants(self, 'image')
+
         if self.is_primary:
             VehicleImage.objects.filter(
                 vehicle=self.vehicle,
@@ -166,6 +215,16 @@ class VehicleImage(models.Model):
             ).exclude(id=self.id).update(is_primary=False)
 
         super().save(*args, **kwargs)
+        self.touch_vehicle()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.touch_vehicle()
+        return result
+
+    def touch_vehicle(self):
+        """Les images font partie du véhicule : sa date de modification (ETag) change"""
+        Vehicle.objects.filter(pk=self.vehicle_id).update(updated_at=timezone.now())
 
     def __str__(self):
         return f"Image de {self.vehicle.brand} {self.vehicle.model}"
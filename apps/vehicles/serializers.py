@@ -1,6 +1,9 @@
+from django.db.models import OuterRef, Subquery
 from rest_framework import serializers
 from .models import Vehicle, VehicleImage
 from apps.accounts.serializers import OwnerPublicSerializer
+from apps.core.images import bulk_add_images, smallest_variant
+from apps.core.serializers import ImageVariantsField, SparseFieldsetMixin, media_url
 
 
 
@@ -9,6 +12,8 @@ from apps.accounts.serializers import OwnerPublicSerializer
 # ===============================
 
 class VehicleImageSerializer(serializers.ModelSerializer):
+    variants = ImageVariantsField()
+
     class Meta:
         model = VehicleImage
         fields = "__all__"
@@ -19,7 +24,7 @@ class VehicleImageSerializer(serializers.ModelSerializer):
 # VEHICLE SERIALIZER
 # ===============================
 
-class VehicleSerializer(serializers.ModelSerializer):
+class VehicleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 
 
     owner = OwnerPublicSerializer(read_only=True)  
@@ -53,21 +58,14 @@ class VehicleSerializer(serializers.ModelSerializer):
     # ===============================
 
     def create(self, validated_data):
-        request = self.context["request"]
         uploaded_images = validated_data.pop("uploaded_images", [])
 
         vehicle = Vehicle.objects.create(
             **validated_data
         )
 
-        # Création des images
-        for index, image in enumerate(uploaded_images):
-            VehicleImage.objects.create(
-                vehicle=vehicle,
-                image=image,
-                order=index,
-                is_primary=(index == 0)  # première image = principale
-            )
+        # Création des images (première image = principale)
+        bulk_add_images(vehicle.images, uploaded_images, primary_index=0)
 
         return vehicle
 
@@ -84,10 +82,64 @@ class VehicleSerializer(serializers.ModelSerializer):
         instance.save()
 
         # Ajouter nouvelles images si envoyées
-        for image in uploaded_images:
-            VehicleImage.objects.create(
-                vehicle=instance,
-                image=image
-            )
+        bulk_add_images(instance.images, uploaded_images)
 
         return instance
+
+
+# ===============================
+# CARTE (LISTES)
+# ===============================
+
+class VehicleCardSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Carte de véhicule pour les listes.
+    Le queryset doit être annoté de `thumbnail_path` et `thumbnail_variants` (voir card_queryset).
+    """
+
+    thumbnail = serializers.SerializerMethodField()
+
+    # Colonnes chargées par .only() (champs de la carte + clés de tri)
+    ONLY_FIELDS = [
+        "id", "title", "brand", "model", "year", "type", "transmission",
+        "fuel_type", "seats", "city", "price_per_day", "final_price_per_day",
+        "driver_available", "slug", "created_at",
+    ]
+
+    class Meta:
+        model = Vehicle
+        fields = [
+            "id",
+            "title",
+            "brand",
+            "model",
+            "year",
+            "type",
+            "transmission",
+            "fuel_type",
+            "seats",
+            "city",
+            "price_per_day",
+            "final_price_per_day",
+            "driver_available",
+            "slug",
+            "thumbnail",
+        ]
+        read_only_fields = fields
+
+    @classmethod
+    def card_queryset(cls, queryset):
+        """Colonnes de la carte + chemin de l'image principale, en une requête"""
+        first_image = VehicleImage.objects.filter(
+            vehicle=OuterRef('pk')
+        ).order_by('-is_primary', 'order', 'id')
+        return queryset.only(*cls.ONLY_FIELDS).annotate(
+            thumbnail_path=Subquery(first_image.values('image')[:1]),
+            thumbnail_variants=Subquery(first_image.values('variants')[:1]),
+        )
+
+    def get_thumbnail(self, obj):
+        # Plus petite déclinaison si elle est générée, sinon l'original
+        path = smallest_variant(getattr(obj, "thumbnail_variants", None))
+        return media_url(self.context.get("request"), path or getattr(obj, "thumbnail_path", None))
+
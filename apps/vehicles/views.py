@@ -3,24 +3,46 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.contrib.contenttypes.models import ContentType
 from rest_framework.parsers import MultiPartParser, FormParser
 
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import KeysetPagination
+from apps.core.response_cache import VEHICLE_RESPONSES, cache_response
+
 from .models import Vehicle, VehicleImage
-from .serializers import VehicleSerializer, VehicleImageSerializer
+from .serializers import VehicleCardSerializer, VehicleSerializer, VehicleImageSerializer
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
     parser_classes = (MultiPartParser, FormParser)
+    pagination_class = KeysetPagination
+    cache_control = {'public': True, 'max_age': 60}
+    # Profil public du propriétaire (numéros de paiement) imbriqué dans le détail
+    detail_related_last_modified = ('owner__updated_at',)
+
+    # ?ordering=price | -price | -created_at
+    sort_fields = {
+        'price': 'price_per_day',
+        'created_at': 'created_at',
+        'relevance': 'search_rank',
+    }
+    # Par défaut : pertinence (?q=), sinon les plus récents
+    default_ordering = ('-relevance', '-created_at')
 
     def get_permissions(self):
         # ✅ Public pour voir, connexion pour créer/modifier
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'calendar']:
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
     
+    def get_serializer_class(self):
+        # Listes publiques : cartes légères ; détail et ?owner=me : sérialiseur complet
+        if self.action == 'list' and self.request.query_params.get('owner') != 'me':
+            return VehicleCardSerializer
+        return VehicleSerializer
+    
     def get_queryset(self):
         qs = Vehicle.objects.filter(is_active=True)  # ✅ Afficher seulement les actifs par défaut
         
@@ -33,8 +55,39 @@ class VehicleViewSet(viewsets.ModelViewSet):
         if owner_id:
             qs = qs.filter(owner_id=owner_id)
         
+        # Disponibilité sur une période : ?start_date=...&end_date=...
+        from apps.bookings.filters import get_requested_period, exclude_booked
+        period = get_requested_period(self.request.query_params)
+        if period:
+            qs = exclude_booked(qs, *period)
+        
+        # Recherche plein texte : ?q=villa piscine assinie (triée par pertinence)
+        from apps.core.search import search
+        qs = search(qs, self.request.query_params.get('q'))
+        
+        # Facettes : ?city=abidjan&type=suv,berline&transmission=automatique
+        from apps.core.facets import VEHICLE_FACETS
+        self.facet_base = qs
+        qs = VEHICLE_FACETS.filter(qs, self.request.query_params)
+        
+        # Liste publique : colonnes des cartes et image principale seulement
+        if self.action == 'list':
+            qs = VehicleCardSerializer.card_queryset(qs)
+        
         return qs
     
+    @cache_response(VEHICLE_RESPONSES)
+    def list(self, request, *args, **kwargs):
+        # ?facets=1 : résultats + comptes par facette
+        if request.query_params.get('facets') in ('1', 'true'):
+            from apps.core.facets import faceted_list, VEHICLE_FACETS
+            return faceted_list(self, VEHICLE_FACETS)
+        return super().list(request, *args, **kwargs)
+    
+    @cache_response(VEHICLE_RESPONSES)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         # ✅ Vérifier que l'utilisateur peut créer des VÉHICULES
         if not self.request.user.can_create_vehicles():
@@ -52,8 +105,22 @@ class VehicleViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
         if instance.owner != self.request.user and not self.request.user.is_staff:
             raise permissions.PermissionDenied("Permission refusée")
+        # Bien déjà réservé : désactivé, l'historique des réservations est conservé
+        if instance.bookings.exists():
+            instance.is_active = False
+            instance.save(update_fields=['is_active', 'updated_at'])
+            return
         instance.delete()
     
+    @action(detail=True, methods=['get'])
+    def calendar(self, request, pk=None):
+        """
+        Dates indisponibles (plages fusionnées), avec ETag
+        GET /api/vehicles/{id}/calendar/?days=90&bitmask=1
+        """
+        from apps.bookings.calendars import calendar_response
+        return calendar_response(request, self.get_object())
+    
     @action(detail=False, methods=['get'])
     def my_stats(self, request):
         if not request.user.is_authenticated:
@@ -69,31 +136,14 @@ class VehicleViewSet(viewsets.ModelViewSet):
                 "active_bookings": 0,
             })
         
-        vehicles = Vehicle.objects.filter(owner=request.user)
-        
-        from apps.bookings.models import Booking
-        vehicle_ct = ContentType.objects.get_for_model(Vehicle)
-        my_vehicle_ids = list(vehicles.values_list('id', flat=True))
-        
-        stats = {
-            "total_vehicles": vehicles.count(),
-            "available": vehicles.filter(is_active=True).count(),
-            "unavailable": vehicles.filter(is_active=False).count(),
-            "total_bookings": Booking.objects.filter(
-                content_type=vehicle_ct,
-                object_id__in=my_vehicle_ids
-            ).count(),
-            "active_bookings": Booking.objects.filter(
-                content_type=vehicle_ct,
-                object_id__in=my_vehicle_ids,
-                status='confirmed'
-            ).count(),
-        }
+        from apps.bookings.stats import owner_listing_stats
+        stats = owner_listing_stats(request.user, Vehicle, 'vehicle')
         
         return Response(stats)
 
 
-class VehicleImageViewSet(viewsets.ModelViewSet):
+class VehicleImageViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = VehicleImage.objects.all()
     serializer_class = VehicleImageSerializer
-    permission_classes = [permissions.AllowAny]  # ✅ Images publiques
\ No newline at end of file
+    permission_classes = [permissions.AllowAny]  # ✅ Images publiques
+    cache_control = {'public': True, 'max_age': 3600}
\ No newline at end of file
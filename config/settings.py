@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     'corsheaders',
     
     # Applications locales
+    'apps.core',
     'apps.accounts',
     'apps.residences',
     'apps.vehicles',
@@ -93,6 +94,19 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # SQLite ignore select_for_update : BEGIN IMMEDIATE prend le verrou
+        # d'écriture dès l'ouverture de la transaction, ce qui sérialise les
+        # réservations simultanées (BookingSerializer.create_locked) au lieu
+        # de faire échouer l'une d'elles sur « database is locked ».
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # Base de test sur disque : la base en mémoire partagée entre threads
+        # refuse les écritures concurrentes au lieu de les faire attendre
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -138,6 +152,29 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Fichiers envoyés rangés sous l'empreinte de leur contenu (doublons partagés),
+# fichiers sans référence supprimés par collect_media_garbage après ce délai (heures)
+STORAGES = {
+    "default": {"BACKEND": "apps.core.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+MEDIA_GC_MIN_AGE = 24
+
+# Envoi des fichiers media : 'nginx' (X-Accel-Redirect vers la location interne
+# MEDIA_ACCEL_PREFIX), 'sendfile' (X-Sendfile) ou vide (Django, développement)
+MEDIA_ACCEL = os.environ.get('MEDIA_ACCEL') or None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Largeurs des déclinaisons d'images (WebP et JPEG, apps.core.images)
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+
+# Originaux réduits à cette taille par le worker, dans un pool de processus
+IMAGE_UPLOAD_MAX_DIMENSION = 2560
+IMAGE_PROCESSING_WORKERS = os.cpu_count() or 1
+
+# Uploads écrits au fil de l'eau dans un fichier temporaire (jamais en mémoire)
+FILE_UPLOAD_HANDLERS = ["django.core.files.uploadhandler.TemporaryFileUploadHandler"]
+
 # Fichiers statiques
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -192,3 +229,40 @@ PAYDUNYA_MODE = os.getenv("PAYDUNYA_MODE", "test")
 # Commission plateforme (10%)
 PLATFORM_COMMISSION_RATE = 0.10
 
+
+# Caches applicatifs (en secondes, 0 pour désactiver)
+BOOKING_CALENDAR_CACHE_TIMEOUT = 300
+OWNER_STATS_CACHE_TIMEOUT = 30
+PRICING_RULES_CACHE_TIMEOUT = 3600
+FACETS_CACHE_TIMEOUT = 300
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Backend des caches : locmem, file ou redis. locmem est propre à chaque
+# processus : une invalidation (réservation, bien ou événement modifié)
+# n'y atteint que le worker qui l'a faite. Avec plusieurs workers gunicorn,
+# utiliser file ou redis (avertissement core.W001 sinon, hors DEBUG).
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / "cache")),
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+    },
+}
+
+# default : calendriers, statistiques propriétaire, règles tarifaires, facettes ;
+# responses : réponses publiques (annonces, événements)
+RESPONSE_CACHE_ALIAS = "responses"
+CACHES = {
+    alias: {**CACHE_BACKENDS[CACHE_BACKEND], "KEY_PREFIX": alias}
+    for alias in ("default", RESPONSE_CACHE_ALIAS)
+}
+
+# Durée de validité des jetons de devis (POST /api/bookings/quote/), en secondes
+QUOTE_TOKEN_MAX_AGE = 15 * 60
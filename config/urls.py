@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from apps.core.views import MediaView, ResponseCacheStatsView
 
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -19,8 +20,9 @@ urlpatterns = [
     path("api/token/refresh/", TokenRefreshView.as_view()),
     path('api/auth/', include('apps.accounts.urls')), 
     path("api/events/", include("apps.events.urls")),
+    path("api/cache/stats/", ResponseCacheStatsView.as_view()),
 
-
+    # Fichiers media (X-Accel-Redirect / X-Sendfile selon MEDIA_ACCEL)
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:name>", MediaView.as_view()),
 ]
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
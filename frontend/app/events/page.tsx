@@ -3,6 +3,7 @@
 import { useEffect, useState } from "react";
 import { motion } from "framer-motion";
 import Link from "next/link";
+import { fetchAllPages } from "@/lib/api";
 import { 
   Calendar, 
   MapPin, 
@@ -47,12 +48,7 @@ export default function EventsPage() {
     try {
       setLoading(true);
       const API_URL = process.env.NEXT_PUBLIC_API_URL || 'https://zando-backend.onrender.com';
-      const res = await fetch(`${API_URL}/api/events/`);
-      
-      if (!res.ok) throw new Error('Erreur de chargement');
-      
-      const data = await res.json();
-      setEvents(data);
+      setEvents(await fetchAllPages<Event>(`${API_URL}/api/events/?page_size=100`));
     } catch (err) {
       console.error('Erreur fetch événements:', err);
     } finally {
@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from "react";
 import { motion, AnimatePresence } from "framer-motion";
-import api from "@/lib/api";
+import api, { getAllPages } from "@/lib/api";
 import { 
   Calendar, 
   User, 
@@ -62,8 +62,7 @@ export default function OwnerBookingsPage() {
   const fetchBookings = async () => {
     try {
       setLoading(true);
-      const res = await api.get("bookings/received/");
-      setBookings(res.data);
+      setBookings(await getAllPages<Booking>("bookings/received/?page_size=100"));
     } catch (err) {
       console.error("Erreur:", err);
     } finally {
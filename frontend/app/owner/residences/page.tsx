@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import Link from "next/link";
-import api from "@/lib/api";
+import api, { getAllPages } from "@/lib/api";
 
 interface Residence {
   id: number;
@@ -30,8 +30,7 @@ export default function OwnerResidencesPage() {
   const fetchMyResidences = async () => {
     try {
       setLoading(true);
-      const res = await api.get("residences/?owner=me");
-      setResidences(res.data);
+      setResidences(await getAllPages<Residence>("residences/?owner=me&page_size=100"));
     } catch (err) {
       console.error("Erreur:", err);
     } finally {
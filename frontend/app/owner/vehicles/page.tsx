@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import Link from "next/link";
-import api from "@/lib/api";
+import api, { getAllPages } from "@/lib/api";
 
 interface Vehicle {
   id: number;
@@ -30,8 +30,7 @@ export default function OwnerVehiclesPage() {
     try {
       setLoading(true);
       // ✅ Filtre "owner=me" pour récupérer seulement MES véhicules
-      const res = await api.get("vehicles/?owner=me");
-      setVehicles(res.data);
+      setVehicles(await getAllPages<Vehicle>("vehicles/?owner=me&page_size=100"));
     } catch (err) {
       console.error("Erreur:", err);
     } finally {
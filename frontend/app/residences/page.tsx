@@ -1,7 +1,7 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import api from "@/lib/api";
+import { getAllPages } from "@/lib/api";
 import ResidenceCard from "@/components/ResidenceCard";
 import SearchBar from "@/components/SearchBar";
 import FilterSidebar from "@/components/FilterSidebar";
@@ -12,7 +12,7 @@ import { Search, SlidersHorizontal, X, MapPin, Home, Star } from "lucide-react";
 export interface Residence {
   id: number;
   title: string;
-  description: string;
+  description?: string;
   city: string;
   neighborhood: string;
   type: string;
@@ -22,7 +22,8 @@ export interface Residence {
   capacity: number;
   rating_average: number;
   reviews_count: number;
-  images: Array<{ image: string; is_primary: boolean }>;
+  images?: Array<{ image: string; is_primary: boolean }>;
+  thumbnail?: string | null;
   has_wifi: boolean;
   has_ac: boolean;
   has_pool: boolean;
@@ -57,9 +58,9 @@ export default function ResidencesPage() {
 
   const fetchResidences = async () => {
     try {
-      const res = await api.get("residences/");
-      setResidences(res.data);
-      setFilteredResidences(res.data);
+      const items = await getAllPages<Residence>("residences/?page_size=100");
+      setResidences(items);
+      setFilteredResidences(items);
     } catch (err) {
       console.error("Erreur fetch:", err);
     } finally {
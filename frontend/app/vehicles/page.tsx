@@ -2,6 +2,7 @@
 
 import { useEffect, useState } from "react";
 import VehicleCard from "@/components/VehicleCard";
+import { fetchAllPages } from "@/lib/api";
 import { Car, Users, Shield, Zap, Star, TrendingUp, Search, SlidersHorizontal } from "lucide-react";
 
 /* ================= TYPES ================= */
@@ -17,7 +18,7 @@ interface Vehicle {
   seats: number;
   transmission: string;
   fuel_type: string;
-  images: Array<{ image: string; is_primary?: boolean }>;
+  thumbnail?: string | null;
 }
 
 /* ================= COMPONENT ================= */
@@ -42,11 +43,7 @@ export default function VehiclesPage() {
       setError(null);
 
       const API_URL = process.env.NEXT_PUBLIC_API_URL || 'https://zando-backend.onrender.com';
-      const res = await fetch(`${API_URL}/api/vehicles/`);
-      
-      if (!res.ok) throw new Error('Erreur de chargement');
-      
-      const data = await res.json();
+      const data = await fetchAllPages<Vehicle>(`${API_URL}/api/vehicles/?page_size=100`);
       console.log('Véhicules chargés:', data.length);
       
       setVehicles(data);
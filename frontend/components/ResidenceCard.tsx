@@ -14,6 +14,7 @@ interface ResidenceCardProps {
     rating_average: number;
     reviews_count: number;
     images?: Array<{ image: string; is_primary: boolean }>;
+    thumbnail?: string | null;
     has_wifi: boolean;
     has_ac: boolean;
     has_pool: boolean;
@@ -24,7 +25,8 @@ interface ResidenceCardProps {
 export default function ResidenceCard({ residence }: ResidenceCardProps) {
   const router = useRouter();
 
-  const primaryImage = residence.images?.find((img) => img.is_primary)?.image 
+  const primaryImage = residence.thumbnail
+    || residence.images?.find((img) => img.is_primary)?.image 
     || residence.images?.[0]?.image 
     || "/placeholder-residence.jpg";
 
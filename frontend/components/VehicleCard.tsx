@@ -13,11 +13,14 @@ interface Vehicle {
   seats: number;
   transmission: string;
   fuel_type: string;
-  images: Array<{ image: string; is_primary?: boolean }>;
+  images?: Array<{ image: string; is_primary?: boolean }>;
+  thumbnail?: string | null;
 }
 
 export default function VehicleCard({ vehicle }: { vehicle: Vehicle }) {
+  // Listes publiques : `thumbnail` (VehicleCardSerializer) ; détail : `images`
   const primaryImage =
+    vehicle.thumbnail ||
     vehicle.images?.find((i) => i.is_primary)?.image ||
     vehicle.images?.[0]?.image ||
     "https://via.placeholder.com/600x400?text=Vehicle";
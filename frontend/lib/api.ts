@@ -78,4 +78,40 @@ api.interceptors.response.use(
   }
 );
 
+// ===============================
+// PAGINATION PAR CURSEUR
+// ===============================
+// Les listes renvoient { next, previous, results } : on suit `next`
+// jusqu'à la dernière page (une réponse tableau est renvoyée telle quelle).
+
+type Page<T> = T[] | { next: string | null; results: T[] };
+
+async function collectPages<T>(url: string, load: (url: string) => Promise<Page<T>>): Promise<T[]> {
+  const items: T[] = [];
+  let next: string | null = url;
+
+  while (next) {
+    const data: Page<T> = await load(next);
+    if (Array.isArray(data)) return [...items, ...data];
+    items.push(...data.results);
+    next = data.next;
+  }
+
+  return items;
+}
+
+// Toutes les pages d'une liste, via l'instance authentifiée
+export function getAllPages<T>(url: string): Promise<T[]> {
+  return collectPages<T>(url, async (next) => (await api.get(next)).data);
+}
+
+// Toutes les pages d'une liste publique, sans jeton (fetch)
+export function fetchAllPages<T>(url: string): Promise<T[]> {
+  return collectPages<T>(url, async (next) => {
+    const res = await fetch(next);
+    if (!res.ok) throw new Error('Erreur de chargement');
+    return res.json();
+  });
+}
+
 export default api;
\ No newline at end of file